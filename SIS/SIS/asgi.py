@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SIS.settings')
 
 application = get_asgi_application()
+
+# Compile the templates now rather than on this process's first requests
+if getattr(settings, 'TEMPLATE_WARMUP', False):
+    from core.template_warmup import warm_templates
+
+    warm_templates()
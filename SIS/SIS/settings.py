@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +70,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'notifications.context_processors.unread_notifications',
             ],
         },
     },
@@ -80,10 +82,30 @@ WSGI_APPLICATION = 'SIS.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Run on every new SQLite connection. WAL lets readers carry on while a writer commits;
+# synchronous=NORMAL is safe with WAL (a power cut can lose the last commits, not corrupt);
+# busy_timeout (ms) has a writer wait for the lock instead of failing; mmap_size and
+# cache_size (negative = KiB) keep hot pages in memory. Writes that still time out are
+# retried by core.sqlite.retry_on_locked.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # SIS_DATABASE_PATH points at another file, e.g. a synthetic institution for benchmarks
+        'NAME': os.environ.get('SIS_DATABASE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            'init_command': '; '.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            # Take the write lock at BEGIN, where busy_timeout waits for it. A deferred transaction
+            # that reads first and then writes fails with "database is locked" without waiting.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -140,3 +162,67 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Files served only through views that check permissions (core.storage.PrivateStorage);
+# keep it outside MEDIA_ROOT and out of the web server's reach
+PRIVATE_MEDIA_ROOT = os.path.join(BASE_DIR, 'private_media')
+
+# Background attendance exports (lecturer.export_jobs).
+# Set ATTENDANCE_EXPORT_IN_PROCESS = False to leave jobs for `manage.py process_export_jobs --watch`.
+ATTENDANCE_EXPORT_IN_PROCESS = True
+ATTENDANCE_EXPORT_WORKERS = 2
+# Finished exports (and their files) older than this are deleted by `manage.py expire_export_jobs`
+ATTENDANCE_EXPORT_RETENTION_DAYS = 7
+
+# Student.latest_activity write-behind (core.activity): touches closer than GRANULARITY
+# seconds are coalesced and pending ones are flushed in one UPDATE every FLUSH_INTERVAL seconds.
+STUDENT_ACTIVITY_GRANULARITY = 60
+STUDENT_ACTIVITY_FLUSH_INTERVAL = 30
+
+# Login accepts email or IC number, resolved with one indexed query (accounts.backends)
+AUTHENTICATION_BACKENDS = ['accounts.backends.EmailOrICBackend']
+
+# Password hashing processes for bulk student imports run by `manage.py import_students` and
+# `manage.py process_import_jobs` (adminportal.student_import); None = one per CPU
+STUDENT_IMPORT_WORKERS = None
+# Imports uploaded in the admin portal run as background jobs (adminportal.import_jobs) on one
+# in-process thread, hashing without a process pool. Set STUDENT_IMPORT_IN_PROCESS = False to
+# leave them for `manage.py process_import_jobs --watch`.
+STUDENT_IMPORT_IN_PROCESS = True
+
+# Live notification stream (notifications.stream), served only to requests coming in over
+# ASGI (e.g. `uvicorn SIS.asgi:application`). LocalBroker only reaches clients on the same
+# process; run a single ASGI worker or plug in a shared broker with the same interface.
+NOTIFICATION_BROKER = 'notifications.broker.LocalBroker'
+NOTIFICATION_STREAM_KEEPALIVE = 25
+# Under WSGI the topbar polls notifications:unread_count this often (seconds) instead; 0 = never
+NOTIFICATION_POLL_INTERVAL = 30
+
+# Read notifications older than this move to the archive table (manage.py archive_notifications)
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Per-request query counting and @query_budget checks (core.query_budget). Over-budget views
+# are logged; the test runner below turns QUERY_BUDGET_RAISE on so they fail the test instead.
+QUERY_BUDGET_ENABLED = DEBUG
+QUERY_BUDGET_RAISE = False
+TEST_RUNNER = 'core.test_runner.QueryBudgetTestRunner'
+QUERY_BUDGET_REPEAT_THRESHOLD = 5
+
+# Cached dashboard fragments (core.fragments) are keyed on data versions and also expire after
+# this many seconds. Run more than one process? Give them a shared CACHES backend (memcached,
+# Redis) so a version bumped in one is seen by all.
+FRAGMENT_CACHE_TIMEOUT = 300
+
+# Compile every template when a server process starts (core.template_warmup). Off here, where
+# runserver reloads anyway; SIS.settings_production turns it on.
+TEMPLATE_WARMUP = False
+
+# Profile picture derivatives (core.thumbnails): resized on this many background threads after an
+# upload, and served under DEBUG with a Cache-Control max-age of THUMBNAIL_CACHE_SECONDS (in
+# production the web server sets it, see SIS.settings_production).
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_CACHE_SECONDS = 60 * 60 * 24 * 365
+
+# Writes that hit "database is locked" after busy_timeout (core.sqlite.retry_on_locked) are
+# retried this many times, backing off from SQLITE_RETRY_DELAY seconds.
+SQLITE_WRITE_RETRIES = 3
+SQLITE_RETRY_DELAY = 0.05
@@ -0,0 +1,59 @@
+"""
+Production settings for SIS: DJANGO_SETTINGS_MODULE=SIS.settings_production.
+
+Everything in SIS.settings, minus the debug-only overhead: DEBUG off (no
+connection.queries log, no template debug data), no per-request query counting,
+and an explicitly cached template loader whose cache every server process fills
+at start-up (TEMPLATE_WARMUP) instead of on its first requests.
+
+Set SIS_SECRET_KEY and SIS_ALLOWED_HOSTS (comma separated) in the environment.
+
+Django serves neither STATIC_URL nor MEDIA_URL with DEBUG off; the web server in
+front of it does. Profile picture derivatives (MEDIA_URL .../derived/, see
+core.thumbnails) never change content, so give them the header the development
+route adds, e.g. for nginx:
+
+    location ~ ^/media/(.+/)?derived/ {
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
+
+PRIVATE_MEDIA_ROOT (attendance exports and student import uploads, core.storage)
+must never be served by the web server: Django hands those files out after
+checking who asks.
+Run `manage.py expire_export_jobs` daily to delete old exports.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('SIS_SECRET_KEY', '')
+
+ALLOWED_HOSTS = [host for host in os.environ.get('SIS_ALLOWED_HOSTS', 'localhost').split(',') if host]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        # APP_DIRS can't be combined with explicit loaders; app_directories.Loader replaces it
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'debug': False,
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Compile every template when a WSGI/ASGI process starts (core.template_warmup)
+TEMPLATE_WARMUP = True
+
+# SIS.settings derives this from its own DEBUG
+QUERY_BUDGET_ENABLED = False
@@ -1,9 +1,13 @@
-from django.urls import path, include
+import re
+
+from django.urls import path, include, re_path
 from django.views.generic import RedirectView
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.conf.urls.static import static
+from core.thumbnails import DERIVED_DIR
+from core.views import derived_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,9 +19,17 @@ urlpatterns = [
     path('lecturer/', include('lecturer.urls', namespace='lecturer')),
     path('adminportal/', include('adminportal.urls')),
     path('dashboard/', include('dashboard.urls', namespace='dashboard')),
+    path('notifications/', include('notifications.urls', namespace='notifications')),
     path('logout/', auth_views.LogoutView.as_view(next_page='accounts:login'), name='logout'),
     path('accounts/', include('django.contrib.auth.urls')),
 ]
 
 if settings.DEBUG:
+    urlpatterns += [
+        # Thumbnail derivatives, with cache headers; ahead of the plain media route below
+        re_path(
+            rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>(?:.+/)?{DERIVED_DIR}/[^/]+)$',
+            derived_media, name='derived_media',
+        ),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SIS.settings')
 
 application = get_wsgi_application()
+
+# Compile the templates now rather than on this process's first requests
+if getattr(settings, 'TEMPLATE_WARMUP', False):
+    from core.template_warmup import warm_templates
+
+    warm_templates()
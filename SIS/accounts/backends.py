@@ -0,0 +1,54 @@
+# accounts/backends.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+UserModel = get_user_model()
+
+
+def find_user_by_identifier(identifier):
+    """
+    Look a user up by email or IC number, ignoring case, with one query.
+    Comparing LOWER(column) lets SQLite use the functional indexes on both columns
+    (iexact compiles to LIKE, which can't use an index).
+    """
+    key = (identifier or '').strip().lower()
+    if not key:
+        return None
+    return (
+        UserModel._default_manager
+        .alias(email_lower=Lower('email'), ic_lower=Lower('identity_card_number'))
+        .filter(Q(email_lower=key) | Q(ic_lower=key))
+        .first()
+    )
+
+
+class EmailOrICBackend(ModelBackend):
+    """
+    Authenticate with either an email address or an IC number as the username,
+    resolving the user once and checking the password once.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = find_user_by_identifier(username)
+        if user is None:
+            # Hash anyway so unknown identifiers take as long as wrong passwords
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        # Join in the unread notification counter the topbar badge shows on every page
+        # (notifications.unread.get_unread_count), rather than query it separately
+        try:
+            user = UserModel._default_manager.select_related('unread_counter').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
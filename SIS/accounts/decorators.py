@@ -1,11 +1,14 @@
+from functools import wraps
+
 from django.http import HttpResponseForbidden
 from django.contrib.auth.decorators import login_required
 
-def role_required(role):
+def role_required(*roles):
     def decorator(view_func):
         @login_required
+        @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
-            if request.user.role != role:
+            if request.user.role not in roles:
                 return HttpResponseForbidden("You are not authorized to view this page.")
             return view_func(request, *args, **kwargs)
         return _wrapped_view
@@ -0,0 +1,90 @@
+import time
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounts.models import CustomUser
+
+PASSWORD = 'benchmark-pass'
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_login(identifier):
+    """What unified_login did before EmailOrICBackend: iexact OR lookup, then authenticate by email."""
+    try:
+        user_obj = CustomUser.objects.get(Q(email__iexact=identifier) | Q(identity_card_number__iexact=identifier))
+    except CustomUser.DoesNotExist:
+        return None
+    return ModelBackend().authenticate(None, username=user_obj.email, password=PASSWORD)
+
+
+def _backend_login(identifier):
+    return authenticate(None, username=identifier, password=PASSWORD)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare queries and latency of the old unified_login lookup with EmailOrICBackend, "
+        "against synthetic users created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument(
+            '--real-hasher', action='store_true',
+            help="Keep the configured password hasher; by default a fast one isolates the lookup cost.",
+        )
+
+    def handle(self, *args, **options):
+        hashers = None if options['real_hasher'] else ['django.contrib.auth.hashers.MD5PasswordHasher']
+        try:
+            with transaction.atomic():
+                if hashers:
+                    with override_settings(PASSWORD_HASHERS=hashers):
+                        self._run(options)
+                else:
+                    self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, options):
+        password = make_password(PASSWORD)
+        CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    email=f'bench.user{i}@example.com',
+                    identity_card_number=f'BENCH-{i:07d}',
+                    full_name=f'Bench User {i}',
+                    password=password,
+                )
+                for i in range(options['users'])
+            ],
+            batch_size=2000,
+        )
+        step = max(options['users'] // options['logins'], 1)
+        # Mix emails and IC numbers, in the wrong case, as people type them
+        identifiers = [
+            f'Bench.User{i}@Example.com' if n % 2 else f'bench-{i:07d}'
+            for n, i in enumerate(range(0, options['users'], step))
+        ][:options['logins']]
+
+        self.stdout.write(f"{options['users']} users, {len(identifiers)} logins")
+        for label, login in (('legacy lookup', _legacy_login), ('EmailOrICBackend', _backend_login)):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                failures = sum(login(identifier) is None for identifier in identifiers)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:>17}: {len(queries) / len(identifiers):.1f} queries/login, "
+                f"{elapsed / len(identifiers) * 1000:7.2f} ms/login, {failures} failed"
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the user full-text search index from accounts_customuser (after bulk loads or restores)."
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} users."))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_remove_customuser_first_name_and_more'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', 'full_name', 'id'], name='accounts_user_role_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['department', 'role', 'full_name', 'id'], name='accounts_user_dept_name_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:18
+
+import accounts.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SEARCH_FIELDS = ('full_name', 'short_name', 'email', 'identity_card_number')
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE accounts_user_search USING fts5("
+            "full_name, short_name, email, identity_card_number, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(
+            "INSERT INTO accounts_user_search (rowid, full_name, short_name, email, identity_card_number) "
+            "SELECT id, full_name, COALESCE(short_name, ''), email, identity_card_number FROM accounts_customuser"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for field in SEARCH_FIELDS:
+            schema_editor.execute(
+                f'CREATE INDEX accounts_user_{field}_trgm ON accounts_customuser USING gin ({field} gin_trgm_ops)'
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS accounts_user_search')
+    elif vendor == 'postgresql':
+        for field in SEARCH_FIELDS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS accounts_user_{field}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_customuser_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchEntry',
+            fields=[
+                ('user', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('full_name', models.TextField()),
+                ('short_name', models.TextField()),
+                ('email', models.TextField()),
+                ('identity_card_number', models.TextField()),
+                ('document', accounts.models.SearchDocumentField(db_column='accounts_user_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'accounts_user_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
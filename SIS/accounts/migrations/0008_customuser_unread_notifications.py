@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_notifications(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Notification = apps.get_model('notifications', 'Notification')
+    unread = Subquery(
+        Notification.objects.filter(lecturer=OuterRef('pk'), is_read=False)
+        .order_by().values('lecturer').annotate(total=Count('id')).values('total')
+    )
+    CustomUser.objects.update(unread_notifications=Coalesce(unread, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_login_lookup_indexes'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_customuser_unread_notifications'),
+        # The counts are copied to notifications.UnreadCounter before the column goes
+        ('notifications', '0003_unread_counter'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='customuser',
+            name='unread_notifications',
+        ),
+    ]
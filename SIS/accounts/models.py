@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.db import models
+from django.db.models import Lookup
+from django.db.models.functions import Lower
 from core.models import Department
 from django.utils import timezone
 
@@ -77,6 +79,16 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
     objects = CustomUserManager()
 
+    class Meta:
+        # Keyset pagination of the admin lists seeks on (full_name, id) within a role
+        indexes = [
+            models.Index(fields=['role', 'full_name', 'id'], name='accounts_user_role_name_idx'),
+            models.Index(fields=['department', 'role', 'full_name', 'id'], name='accounts_user_dept_name_idx'),
+            # Case-insensitive login lookups (accounts.backends)
+            models.Index(Lower('email'), name='accounts_user_email_lower_idx'),
+            models.Index(Lower('identity_card_number'), name='accounts_user_ic_lower_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} ({self.identity_card_number}) - {self.email} [{self.role}]"
 
@@ -115,3 +127,39 @@ class Student(CustomUser):
         proxy = True
         verbose_name = 'Student'
         verbose_name_plural = 'Students'
+
+# Full-text search index over users (see accounts/search.py)
+class SearchDocumentField(models.TextField):
+    """
+    The FTS5 hidden column that carries the table's own name. It only exists to be
+    matched against: UserSearchEntry.objects.filter(document__match='"ali"*').
+    """
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+class UserSearchEntry(models.Model):
+    """
+    Read-only view of the accounts_user_search FTS5 table, whose rowid is the user id.
+    The table is created by migration on SQLite and written only by accounts.search.
+    """
+    user = models.OneToOneField(
+        CustomUser, primary_key=True, db_column='rowid',
+        on_delete=models.DO_NOTHING, related_name='search_entry'
+    )
+    full_name = models.TextField()
+    short_name = models.TextField()
+    email = models.TextField()
+    identity_card_number = models.TextField()
+    document = SearchDocumentField(db_column='accounts_user_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'accounts_user_search'
@@ -0,0 +1,87 @@
+# accounts/search.py
+import re
+
+from django.db import connection
+from django.db.models import F, Q, Value
+
+SEARCH_TABLE = 'accounts_user_search'
+SEARCH_FIELDS = ('full_name', 'short_name', 'email', 'identity_card_number')
+
+# Single characters match most of the table and make bm25 ranking cost a full scan
+_TOKEN_RE = re.compile(r'\w{2,}')
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word of two or more characters must
+    prefix-match some indexed column. Quoting each token keeps user input from being read as FTS syntax.
+    """
+    return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(text or ''))
+
+
+def search_users(queryset, text, prefix=''):
+    """
+    Narrow a queryset to users matching `text`, annotated with `search_rank`
+    (lower is better) so callers can order or keyset-paginate on (search_rank, pk).
+    `prefix` is the lookup path to the user, e.g. 'user__' for a Lecturer queryset.
+
+    On SQLite this joins the FTS5 index and ranks with bm25. Other databases fall back
+    to icontains on the same fields, which trigram indexes keep fast on PostgreSQL.
+    """
+    if connection.vendor == 'sqlite':
+        match = fts_query(text)
+        if not match:
+            return queryset.annotate(search_rank=Value(0.0)).none()
+        return queryset.filter(**{f'{prefix}search_entry__document__match': match}).annotate(
+            search_rank=F(f'{prefix}search_entry__rank')
+        )
+
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{prefix}{field}__icontains': text})
+    return queryset.filter(condition).annotate(
+        search_rank=-TrigramWordSimilarity(text, f'{prefix}full_name')
+    )
+
+
+def index_users(users):
+    """(Re)write the index rows for the given users; a no-op off SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    users = list(users)
+    if not users:
+        return
+    unindex_users([user.pk for user in users])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, {", ".join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s)',
+            [[user.pk] + [getattr(user, field) or '' for field in SEARCH_FIELDS] for user in users],
+        )
+
+
+def unindex_users(user_ids):
+    if connection.vendor != 'sqlite':
+        return
+    user_ids = list(user_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(user_ids), 500):
+            batch = user_ids[start:start + 500]
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(batch))})', batch
+            )
+
+
+def rebuild_search_index():
+    """Repopulate the whole index from accounts_customuser and optimize it; returns the row count."""
+    if connection.vendor != 'sqlite':
+        return 0
+    columns = ', '.join(SEARCH_FIELDS)
+    values = ', '.join(f"COALESCE({field}, '')" for field in SEARCH_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(f'INSERT INTO {SEARCH_TABLE} (rowid, {columns}) SELECT id, {values} FROM accounts_customuser')
+        count = cursor.rowcount
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return count
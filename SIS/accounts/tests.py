@@ -1,3 +1,124 @@
-from django.test import TestCase
+from django.contrib.auth import authenticate
+from django.db.models import Count
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from core.models import Lecturer
+from core.sqlite import query_plan
+from .models import CustomUser, Lecturer as LecturerUser, Student as StudentUser
+from .search import fts_query, rebuild_search_index, search_users
+
+
+class UserSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ali = CustomUser.objects.create(
+            email="ali.hassan@example.com",
+            identity_card_number="900101-14-5678",
+            full_name="Ali Hassan",
+            role=CustomUser.Role.STUDENT,
+        )
+        cls.alice = CustomUser.objects.create(
+            email="alice@example.com",
+            identity_card_number="920202-10-1111",
+            full_name="Alice Tan",
+            role=CustomUser.Role.STUDENT,
+        )
+        cls.lecturer = CustomUser.objects.create(
+            email="hassan.lect@example.com",
+            identity_card_number="800303-08-2222",
+            full_name="Dr Hassan Omar",
+            role=CustomUser.Role.LECTURER,
+        )
+
+    def search(self, text, queryset=None):
+        queryset = queryset if queryset is not None else CustomUser.objects.all()
+        return list(search_users(queryset, text).order_by('search_rank', 'id'))
+
+    def test_matches_name_email_and_ic_by_prefix(self):
+        self.assertEqual(set(self.search("ali")), {self.ali, self.alice})
+        self.assertEqual(self.search("ali has"), [self.ali])
+        self.assertEqual(self.search("hassan.lect"), [self.lecturer])
+        self.assertEqual(self.search("900101"), [self.ali])
+        self.assertEqual(self.search("nobody"), [])
+
+    def test_filters_compose_with_the_search(self):
+        students = CustomUser.objects.filter(role=CustomUser.Role.STUDENT)
+        self.assertEqual(self.search("hassan", students), [self.ali])
+        lecturers = search_users(Lecturer.objects.all(), "hassan", prefix='user__')
+        self.assertEqual([lecturer.user for lecturer in lecturers], [self.lecturer])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.alice.full_name = "Alice Wong"
+        self.alice.save()
+        self.assertEqual(self.search("wong"), [self.alice])
+        self.assertEqual(self.search("tan"), [])
+
+        self.alice.delete()
+        self.assertEqual(self.search("alice"), [])
+
+    def test_rebuild_restores_missing_rows(self):
+        CustomUser.objects.filter(pk=self.ali.pk).update(full_name="Ali Rahman")  # bypasses signals
+        self.assertEqual(self.search("rahman"), [])
+        self.assertEqual(rebuild_search_index(), 3)
+        self.assertEqual(self.search("rahman"), [self.ali])
+
+    def test_query_syntax_is_neutralised(self):
+        self.assertEqual(fts_query('ali" OR NEAR(x'), '"ali"* "OR"* "NEAR"*')
+        self.assertEqual(fts_query(' - * a '), '')
+        self.assertEqual(self.search('*'), [])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmailOrICBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="siti@example.com",
+            password="s3cret-pass",
+            identity_card_number="010203-04-0506",
+            full_name="Siti Aminah",
+            role=CustomUser.Role.STUDENT,
+        )
+
+    def test_email_or_ic_in_any_case(self):
+        for identifier in ("siti@example.com", "SITI@Example.COM", "010203-04-0506", " 010203-04-0506 "):
+            with self.subTest(identifier=identifier):
+                self.assertEqual(authenticate(None, username=identifier, password="s3cret-pass"), self.user)
+
+    def test_rejects_bad_password_unknown_user_and_inactive(self):
+        self.assertIsNone(authenticate(None, username="siti@example.com", password="wrong"))
+        self.assertIsNone(authenticate(None, username="nobody@example.com", password="s3cret-pass"))
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(authenticate(None, username="siti@example.com", password="s3cret-pass"))
+
+    def test_one_indexed_lookup(self):
+        with CaptureQueriesContext(connection) as queries:
+            authenticate(None, username="SITI@example.com", password="s3cret-pass")
+        self.assertEqual(len(queries), 1)
+        plan = ' '.join(query_plan(queries[0]['sql']))
+        self.assertIn('accounts_user_email_lower_idx', plan)
+        self.assertIn('accounts_user_ic_lower_idx', plan)
+
+    def test_unified_login_redirects_to_dashboard(self):
+        response = self.client.post(
+            reverse('accounts:login'), {'identifier': '010203-04-0506', 'password': 's3cret-pass'}
+        )
+        self.assertRedirects(response, reverse('dashboard:main_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.user.pk)
+
+
+class RoleIndexTests(TestCase):
+    def test_role_filters_and_counts_use_the_role_index(self):
+        for queryset in (
+            StudentUser.objects.all(),
+            LecturerUser.objects.order_by('full_name', 'id'),
+            CustomUser.objects.filter(role=CustomUser.Role.STUDENT).values('id'),
+            CustomUser.objects.order_by().values('role').annotate(total=Count('id')),  # core.counters
+        ):
+            plan = ' '.join(query_plan(queryset))
+            with self.subTest(sql=str(queryset.query)):
+                self.assertIn('accounts_user_role_name_idx', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
@@ -3,7 +3,6 @@ from django.contrib.auth import authenticate, login
 from django.contrib import messages
 from .forms import UnifiedLoginForm
 from .models import CustomUser
-from django.db.models import Q
 
 def unified_login(request):
     if request.method == 'POST':
@@ -12,16 +11,8 @@ def unified_login(request):
             identifier = form.cleaned_data['identifier']
             password = form.cleaned_data['password']
 
-            user = None
-
-            # Try to get user by email or IC (case-insensitive)
-            try:
-                user_obj = CustomUser.objects.get(Q(email__iexact=identifier) | Q(identity_card_number__iexact=identifier))
-                # Authenticate always using email (username field)
-                user = authenticate(request, username=user_obj.email, password=password)
-            except CustomUser.DoesNotExist:
-                # No such user
-                user = None
+            # EmailOrICBackend accepts either the email or the IC number (case-insensitive)
+            user = authenticate(request, username=identifier, password=password)
 
             if user is not None and user.is_active:
                 login(request, user)
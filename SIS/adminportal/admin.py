@@ -1,5 +1,6 @@
 from django.contrib import admin
 from accounts.models import Lecturer, Student
+from .models import StudentImportJob
 
 @admin.register(Lecturer)
 class LecturerAdmin(admin.ModelAdmin):
@@ -12,3 +13,8 @@ class StudentAdmin(admin.ModelAdmin):
     list_display = ['email', 'full_name', 'short_name']
     search_fields = ['email', 'full_name', 'short_name']
     ordering = ['full_name', 'short_name']
+
+@admin.register(StudentImportJob)
+class StudentImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'filename', 'requested_by', 'dry_run', 'status', 'students_created', 'created_at', 'finished_at')
+    list_filter = ('status', 'dry_run')
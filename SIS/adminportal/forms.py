@@ -1,6 +1,7 @@
 from django import forms
 from accounts.models import CustomUser
 from core.models import Department, Student, Course, Subject, ClassGroup, Lecturer
+from .student_import import ImportFileError, check_import_filename
 
 # ---------- LECTURER CREATION FORM ----------
 class LecturerCreationForm(forms.ModelForm):
@@ -204,3 +205,29 @@ class AddStudentForm(forms.Form):
         required=False,
         label="Date of Birth"
     )
+
+
+# ---------- Bulk Student Import ----------
+class StudentImportForm(forms.Form):
+    file = forms.FileField(
+        label="Student File",
+        help_text="CSV or XLSX with columns full_name, email, identity_card_number and optionally "
+                  "short_name, password, department, class_group, phone_number, date_of_birth, address.",
+        widget=forms.ClearableFileInput(attrs={
+            'accept': '.csv,.xlsx',
+            'class': 'w-full px-4 py-3 rounded-lg bg-white/5 text-white border border-white/20 focus:ring-2 focus:ring-blue-500 focus:outline-none transition'
+        })
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Validate only",
+        help_text="Check every row and report errors without creating anyone."
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        try:
+            check_import_filename(upload.name)
+        except ImportFileError as exc:
+            raise forms.ValidationError(str(exc))
+        return upload
@@ -0,0 +1,71 @@
+# adminportal/import_jobs.py
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import StudentImportJob
+from .student_import import import_students, iter_import_rows
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # One import at a time: concurrent jobs could each accept the same email
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='student-import')
+    return _executor
+
+
+def enqueue_import_job(job):
+    """
+    Hand the job to the in-process worker thread once the creating transaction commits.
+    With STUDENT_IMPORT_IN_PROCESS = False jobs stay pending for
+    `manage.py process_import_jobs` to pick up in a separate worker process.
+    """
+    if getattr(settings, 'STUDENT_IMPORT_IN_PROCESS', True):
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.pk))
+
+
+def _run_in_thread(job_id):
+    try:
+        # Hash passwords in this thread: no process pool forked from a web worker
+        run_import_job(job_id, workers=0)
+    finally:
+        # Worker threads get their own connection; don't leave it open between jobs
+        connection.close()
+
+
+def run_import_job(job_id, workers=None):
+    """
+    Import the students in a pending job's file; `workers` is passed on to
+    import_students (0 hashes passwords in-process). The uploaded file is deleted
+    afterwards. Returns the job, or None when another worker already claimed it.
+    """
+    claimed = StudentImportJob.objects.filter(
+        pk=job_id, status=StudentImportJob.Status.PENDING
+    ).update(status=StudentImportJob.Status.RUNNING, started_at=timezone.now())
+    if not claimed:
+        return None
+
+    job = StudentImportJob.objects.get(pk=job_id)
+    try:
+        with job.file.open('rb') as fh:
+            result = import_students(iter_import_rows(fh, job.filename), workers=workers, dry_run=job.dry_run)
+    except Exception as exc:
+        job.status = StudentImportJob.Status.FAILED
+        job.error = str(exc)
+    else:
+        job.status = StudentImportJob.Status.DONE
+        job.students_created = result.created
+        job.enrollments_created = result.enrollments
+        job.row_errors = [error._asdict() for error in result.errors]
+    finally:
+        job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'error', 'file', 'students_created', 'enrollments_created', 'row_errors', 'finished_at',
+    ])
+    return job
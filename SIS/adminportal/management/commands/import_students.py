@@ -0,0 +1,48 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adminportal.student_import import IMPORT_BATCH_SIZE, ImportFileError, import_students, iter_import_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create students (with profiles and class group enrollments) from a CSV or XLSX file. "
+        "Invalid rows are skipped and reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--dry-run', action='store_true', help="Validate every row without writing anything.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Password hashing processes (default: STUDENT_IMPORT_WORKERS, else one per CPU; 0 hashes in-process).",
+        )
+        parser.add_argument('--errors', metavar='CSV', help="Write rejected rows to this CSV file.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as fh:
+                result = import_students(
+                    iter_import_rows(fh, options['path']),
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as fh:
+                writer = csv.writer(fh)
+                writer.writerow(['Line', 'Email / IC', 'Problem'])
+                writer.writerows(result.errors)
+        else:
+            for error in result.errors:
+                self.stderr.write(f"line {error.line} ({error.identifier}): {error.message}")
+
+        verb = "would be created" if options['dry_run'] else "created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.created} students {verb}, {result.enrollments} enrollments, {len(result.errors)} rows rejected."
+        ))
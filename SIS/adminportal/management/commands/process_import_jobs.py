@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from adminportal.import_jobs import run_import_job
+from adminportal.models import StudentImportJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Run pending student import jobs queued from the admin portal (use --watch to keep polling "
+        "as a worker process). Passwords are hashed in a process pool, as with import_students."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help="Keep polling for new jobs.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --watch.")
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Password hashing processes (default: STUDENT_IMPORT_WORKERS, else one per CPU; 0 hashes in-process).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            pending = StudentImportJob.objects.filter(
+                status=StudentImportJob.Status.PENDING
+            ).order_by('created_at').values_list('pk', flat=True)
+            for job_id in list(pending):
+                job = run_import_job(job_id, workers=options['workers'])
+                if job is not None:
+                    self.stdout.write(
+                        f"Import job {job.pk}: {job.status}, {job.students_created} students, "
+                        f"{len(job.row_errors)} rows rejected"
+                    )
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
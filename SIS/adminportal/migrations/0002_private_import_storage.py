@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:48
+
+import adminportal.models
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminportal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentimportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=core.storage.PrivateStorage(), upload_to=adminportal.models.import_upload_to),
+        ),
+    ]
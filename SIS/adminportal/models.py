@@ -0,0 +1,46 @@
+# adminportal/models.py
+import os
+
+from django.conf import settings
+from django.db import models
+
+from core.storage import private_storage, random_name
+
+
+def import_upload_to(instance, filename):
+    # The original name is kept in StudentImportJob.filename; on disk it mustn't be guessable
+    return random_name('imports', os.path.splitext(filename)[1].lstrip('.').lower() or 'dat')
+
+
+# ---------- Student Import Job ----------
+class StudentImportJob(models.Model):
+    """
+    A bulk student import uploaded through the admin portal and run by a background
+    worker (see adminportal.import_jobs) rather than inside the upload request.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='student_import_jobs')
+    # Private storage, deleted once the job has run: the file can hold plain-text passwords
+    file = models.FileField(upload_to=import_upload_to, storage=private_storage, blank=True)
+    filename = models.CharField(max_length=255)
+    dry_run = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    students_created = models.PositiveIntegerField(default=0)
+    enrollments_created = models.PositiveIntegerField(default=0)
+    # Rejected rows as {'line', 'identifier', 'message'} dicts (student_import.RowError)
+    row_errors = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Student import {self.filename} [{self.status}]"
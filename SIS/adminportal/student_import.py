@@ -0,0 +1,302 @@
+# adminportal/student_import.py
+import csv
+import io
+import os
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.module_loading import import_string
+
+from accounts.models import CustomUser
+from accounts.search import index_users
+from core import counters
+from core.fragments import bump_enrollment_versions
+from core.models import ClassGroup, Department, Enrollment, Student, Subject
+
+IMPORT_COLUMNS = [
+    'full_name', 'short_name', 'email', 'identity_card_number', 'password',
+    'department', 'class_group', 'phone_number', 'date_of_birth', 'address',
+]
+REQUIRED_COLUMNS = ('full_name', 'email', 'identity_card_number')
+DEFAULT_PASSWORD = 'password123'  # same default as CustomUserManager.create_user
+IMPORT_BATCH_SIZE = 500
+IMPORT_EXTENSIONS = ('.csv', '.xlsx', '.xlsm')
+
+RowError = namedtuple('RowError', ['line', 'identifier', 'message'])
+StudentImportResult = namedtuple('StudentImportResult', ['created', 'enrollments', 'errors'])
+
+
+class ImportFileError(Exception):
+    """The file as a whole can't be read (unknown format, missing columns, no openpyxl)."""
+
+
+# ---------- Reading ----------
+
+def _normalise_header(header):
+    return [str(name or '').strip().lower().replace(' ', '_') for name in header]
+
+
+def _check_header(header):
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ImportFileError(f"Missing required column(s): {', '.join(missing)}")
+
+
+def _iter_csv(fh):
+    reader = csv.reader(io.TextIOWrapper(fh, encoding='utf-8-sig', newline=''))
+    header = _normalise_header(next(reader, []))
+    _check_header(header)
+    for line, values in enumerate(reader, start=2):
+        if any(value.strip() for value in values):
+            yield line, dict(zip(header, values))
+
+
+def _iter_xlsx(fh):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("Reading .xlsx files needs openpyxl (pip install openpyxl); upload a CSV instead.")
+    sheet = load_workbook(fh, read_only=True, data_only=True).active
+    rows = sheet.iter_rows(values_only=True)
+    header = _normalise_header(next(rows, []))
+    _check_header(header)
+    for line, values in enumerate(rows, start=2):
+        if any(value not in (None, '') for value in values):
+            yield line, dict(zip(header, values))
+
+
+def check_import_filename(filename):
+    """Raise ImportFileError unless iter_import_rows can read a file with this name."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in IMPORT_EXTENSIONS:
+        raise ImportFileError(f"Unsupported file type '{extension}'; use .csv or .xlsx.")
+    return extension
+
+
+def iter_import_rows(fh, filename):
+    """Yield (line number, {column: value}) from a CSV or XLSX file without loading it whole."""
+    if check_import_filename(filename) == '.csv':
+        return _iter_csv(fh)
+    return _iter_xlsx(fh)
+
+
+# ---------- Validation ----------
+
+class _RowInvalid(Exception):
+    pass
+
+
+class _Lookups:
+    """Departments, class groups and their course subjects, loaded once per import."""
+
+    def __init__(self):
+        self.departments = {name.lower(): pk for pk, name in Department.objects.values_list('id', 'name')}
+        self.class_groups = defaultdict(list)
+        for group in ClassGroup.objects.only('id', 'name', 'course_id', 'department_id'):
+            self.class_groups[group.name.lower()].append(group)
+        self.subjects = defaultdict(list)
+        for subject_id, course_id in Subject.objects.values_list('id', 'course_id'):
+            self.subjects[course_id].append(subject_id)
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # spreadsheet cells turn IC and phone numbers into floats
+    return str(value).strip()
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise _RowInvalid(f"date_of_birth '{value}' is not a YYYY-MM-DD date.")
+
+
+def _clean_row(raw, lookups):
+    row = {name: _text(raw.get(name)) for name in IMPORT_COLUMNS if name != 'date_of_birth'}
+    for name in REQUIRED_COLUMNS:
+        if not row[name]:
+            raise _RowInvalid(f"{name} is required.")
+    row['email'] = CustomUser.objects.normalize_email(row['email'])
+    try:
+        validate_email(row['email'])
+    except ValidationError:
+        raise _RowInvalid(f"'{row['email']}' is not a valid email address.")
+    for name in ('full_name', 'short_name', 'identity_card_number', 'phone_number'):
+        max_length = CustomUser._meta.get_field(name).max_length
+        if len(row[name]) > max_length:
+            raise _RowInvalid(f"{name} is longer than {max_length} characters.")
+    row['date_of_birth'] = _parse_date(raw.get('date_of_birth'))
+
+    row['department_id'] = None
+    if row['department']:
+        row['department_id'] = lookups.departments.get(row['department'].lower())
+        if row['department_id'] is None:
+            raise _RowInvalid(f"Unknown department '{row['department']}'.")
+
+    row['class_group_obj'] = None
+    if row['class_group']:
+        groups = lookups.class_groups.get(row['class_group'].lower(), [])
+        if row['department_id']:
+            groups = [group for group in groups if group.department_id == row['department_id']] or groups
+        if not groups:
+            raise _RowInvalid(f"Unknown class group '{row['class_group']}'.")
+        if len(groups) > 1:
+            raise _RowInvalid(f"Class group '{row['class_group']}' is ambiguous; add the department column.")
+        row['class_group_obj'] = groups[0]
+        row['department_id'] = row['department_id'] or groups[0].department_id
+    return row
+
+
+def _existing_identifiers(rows):
+    """Emails and IC numbers from `rows` that already belong to a user, in one query."""
+    emails = [row['email'].lower() for row in rows]
+    ics = [row['identity_card_number'].lower() for row in rows]
+    existing = (
+        CustomUser.objects.annotate(email_lower=Lower('email'), ic_lower=Lower('identity_card_number'))
+        .filter(Q(email_lower__in=emails) | Q(ic_lower__in=ics))
+        .values_list('email_lower', 'ic_lower')
+    )
+    taken_emails, taken_ics = set(), set()
+    for email, ic in existing:
+        taken_emails.add(email)
+        taken_ics.add(ic)
+    return taken_emails, taken_ics
+
+
+# ---------- Hashing ----------
+
+def _encode_password(args):
+    # Runs in a worker process: import the hasher class directly so Django settings aren't needed
+    hasher_path, password = args
+    hasher = import_string(hasher_path)()
+    return hasher.encode(password, hasher.salt())
+
+
+def _hasher_path():
+    hasher = get_hasher()
+    return f'{type(hasher).__module__}.{type(hasher).__qualname__}'
+
+
+# ---------- Writing ----------
+
+def _create_batch(rows, hash_passwords, lookups):
+    hasher_path = _hasher_path()
+    hashes = hash_passwords([(hasher_path, row['password'] or DEFAULT_PASSWORD) for row in rows])
+
+    with transaction.atomic():
+        users = CustomUser.objects.bulk_create([
+            CustomUser(
+                email=row['email'],
+                identity_card_number=row['identity_card_number'],
+                full_name=row['full_name'],
+                short_name=row['short_name'] or row['full_name'].split(' ')[0],
+                role=CustomUser.Role.STUDENT,
+                phone_number=row['phone_number'] or None,
+                address=row['address'] or None,
+                department_id=row['department_id'],
+                password=password_hash,
+            )
+            for row, password_hash in zip(rows, hashes)
+        ])
+        # bulk_create skips post_save, so do what the user signals would have done
+        students = Student.objects.bulk_create([
+            Student(
+                user=user,
+                class_group=row['class_group_obj'],
+                phone_number=row['phone_number'] or None,
+                address=row['address'] or None,
+                date_of_birth=row['date_of_birth'],
+            )
+            for user, row in zip(users, rows)
+        ])
+        enrollments = Enrollment.objects.bulk_create([
+            Enrollment(student=student, subject_id=subject_id, class_group=row['class_group_obj'])
+            for student, row in zip(students, rows)
+            if row['class_group_obj']
+            for subject_id in lookups.subjects[row['class_group_obj'].course_id]
+        ])
+        index_users(users)
+        # The new students' lecturers see them on their dashboard rosters
+        bump_enrollment_versions(enrollment.pk for enrollment in enrollments)
+        counters.adjust_counter(counters.USERS, len(users))
+        counters.adjust_counter(counters.role_counter(CustomUser.Role.STUDENT), len(users))
+    return len(users), len(enrollments)
+
+
+def import_students(rows, batch_size=IMPORT_BATCH_SIZE, workers=None, dry_run=False):
+    """
+    Validate and create students from (line, {column: value}) rows, as produced by
+    iter_import_rows(). Rows are handled batch_size at a time: each batch is validated
+    against the file so far and the database with one query, passwords are hashed in
+    a process pool, and users, Student profiles and enrollments (every subject of the
+    row's class group course) are written with bulk_create. Invalid rows are skipped
+    and reported; with dry_run nothing is written.
+    """
+    workers = getattr(settings, 'STUDENT_IMPORT_WORKERS', None) if workers is None else workers
+    lookups = _Lookups()
+    seen_emails, seen_ics = set(), set()
+    created = enrolled = 0
+    errors = []
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+    if executor:
+        def hash_passwords(items):
+            return list(executor.map(_encode_password, items, chunksize=16))
+    else:
+        def hash_passwords(items):
+            return [_encode_password(item) for item in items]
+
+    try:
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            valid, batch_errors = [], []
+            for line, raw in batch:
+                try:
+                    valid.append((line, _clean_row(raw, lookups)))
+                except _RowInvalid as exc:
+                    identifier = _text(raw.get('email')) or _text(raw.get('identity_card_number'))
+                    batch_errors.append(RowError(line, identifier, str(exc)))
+
+            taken_emails, taken_ics = _existing_identifiers([row for _line, row in valid]) if valid else (set(), set())
+            accepted = []
+            for line, row in valid:
+                email, ic = row['email'].lower(), row['identity_card_number'].lower()
+                if email in taken_emails or email in seen_emails:
+                    batch_errors.append(RowError(line, row['email'], "A user with this email already exists."))
+                elif ic in taken_ics or ic in seen_ics:
+                    batch_errors.append(RowError(line, row['email'], "A user with this IC number already exists."))
+                else:
+                    seen_emails.add(email)
+                    seen_ics.add(ic)
+                    accepted.append(row)
+            errors.extend(sorted(batch_errors))
+
+            if accepted and not dry_run:
+                batch_created, batch_enrolled = _create_batch(accepted, hash_passwords, lookups)
+                created += batch_created
+                enrolled += batch_enrolled
+            elif dry_run:
+                created += len(accepted)
+    finally:
+        if executor:
+            executor.shutdown()
+    return StudentImportResult(created, enrolled, errors)
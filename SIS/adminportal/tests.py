@@ -1,3 +1,319 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import os
+import tempfile
+from unittest import mock
+from urllib.parse import parse_qs
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from accounts.search import search_users
+from core.counters import get_counters, role_counter
+from core.models import ClassGroup, Course, Department, Enrollment, Lecturer, Student, Subject
+from core.pagination import keyset_paginate
+from .import_jobs import run_import_job
+from .models import StudentImportJob
+from .student_import import import_students, iter_import_rows
+
+
+class StreamingExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Computing")
+        cls.admin = CustomUser.objects.create(
+            email="admin@example.com",
+            identity_card_number="IC-ADMIN",
+            full_name="Admin User",
+            role=CustomUser.Role.ADMIN,
+        )
+        for i in range(5):
+            CustomUser.objects.create(
+                email=f"student{i}@example.com",
+                identity_card_number=f"IC-{i}",
+                full_name=f"Student {i}",
+                role=CustomUser.Role.STUDENT,
+                department=cls.department,
+            )
+        lecturer_user = CustomUser.objects.create(
+            email="lecturer@example.com",
+            identity_card_number="IC-LECT",
+            full_name="Lecturer One",
+            role=CustomUser.Role.LECTURER,
+        )
+        course = Course.objects.create(name="Computer Science", code="CS", department=cls.department)
+        group = ClassGroup.objects.create(name="CS-A", department=cls.department, course=course, classroom="B-101")
+        group.lecturers.add(Lecturer.objects.get(user=lecturer_user))
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def read_rows(self, response, gzipped=False):
+        body = b''.join(response.streaming_content)
+        if gzipped:
+            body = gzip.decompress(body)
+        return list(csv.reader(body.decode('utf-8').splitlines()))
+
+    def test_export_students_streams_every_row(self):
+        response = self.client.get(reverse('adminportal:export_students'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="students.csv"')
+        rows = self.read_rows(response)
+        self.assertEqual(rows[0][:2], ['Name', 'Email'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][:3], ['Student 0', 'student0@example.com', 'Computing'])
+
+    def test_gzip_is_opt_in(self):
+        response = self.client.get(
+            reverse('adminportal:export_students'), {'gzip': '1'}, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(self.read_rows(response, gzipped=True)), 6)
+
+    def test_export_courses_and_lecturers(self):
+        courses = self.read_rows(self.client.get(reverse('adminportal:export_courses')))
+        self.assertEqual(courses[1], ['Computer Science', 'CS', 'Lecturer One', 'B-101'])
+        lecturers = self.read_rows(self.client.get(reverse('adminportal:export_lecturers')))
+        self.assertEqual(lecturers[1][0], 'Lecturer One')
+        self.assertEqual(lecturers[1][-1], 'Computer Science')
+
+    def test_exports_are_admin_only(self):
+        student = CustomUser.objects.get(email="student0@example.com")
+        for name in ('export_students', 'export_lecturers'):
+            with self.subTest(name):
+                self.client.logout()
+                response = self.client.get(reverse(f'adminportal:{name}'))
+                self.assertEqual(response.status_code, 302)
+                self.assertFalse(response.streaming)
+                self.client.force_login(student)
+                self.assertEqual(self.client.get(reverse(f'adminportal:{name}')).status_code, 403)
+
+    def test_lecturer_list_is_admin_only_and_within_budget(self):
+        # The test runner raises on an over-budget view, so rendering is the budget check
+        response = self.client.get(reverse('adminportal:lecturer_list'))
+        self.assertContains(response, "Lecturer One")
+
+        self.client.force_login(CustomUser.objects.get(email="lecturer@example.com"))
+        self.assertEqual(self.client.get(reverse('adminportal:lecturer_list')).status_code, 403)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.computing = Department.objects.create(name="Computing")
+        cls.business = Department.objects.create(name="Business")
+        cls.admin = CustomUser.objects.create(
+            email="admin@example.com",
+            identity_card_number="IC-ADMIN",
+            full_name="Admin User",
+            role=CustomUser.Role.ADMIN,
+        )
+        # Duplicate names make the id tie-breaker matter
+        for i, name in enumerate(["Aisyah", "Badrul", "Badrul", "Chong", "Devi", "Badrul", "Ewan"]):
+            CustomUser.objects.create(
+                email=f"student{i}@example.com",
+                identity_card_number=f"IC-{i}",
+                full_name=name,
+                role=CustomUser.Role.STUDENT,
+                department=cls.computing if i % 2 == 0 else cls.business,
+            )
+        cls.students = CustomUser.objects.filter(role=CustomUser.Role.STUDENT)
+        cls.expected = list(cls.students.order_by('full_name', 'id').values_list('id', flat=True))
+
+    def test_walks_forward_and_back_without_gaps_or_repeats(self):
+        seen, pages, cursor = [], [], None
+        while True:
+            page = keyset_paginate(self.students, ('full_name', 'id'), after=cursor, per_page=3)
+            pages.append(page)
+            seen.extend(user.id for user in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 3)
+        self.assertFalse(pages[0].has_previous)
+
+        back = keyset_paginate(self.students, ('full_name', 'id'), before=pages[2].previous_cursor, per_page=3)
+        self.assertEqual([user.id for user in back], [user.id for user in pages[1]])
+        back = keyset_paginate(self.students, ('full_name', 'id'), before=back.previous_cursor, per_page=3)
+        self.assertEqual([user.id for user in back], self.expected[:3])
+        self.assertFalse(back.has_previous)
+
+    def test_deep_page_is_a_single_query(self):
+        cursor = keyset_paginate(self.students, ('full_name', 'id'), per_page=5).next_cursor
+        with self.assertNumQueries(1):
+            page = keyset_paginate(self.students, ('full_name', 'id'), after=cursor, per_page=5)
+        self.assertEqual([user.id for user in page], self.expected[5:])
+
+    def test_descending_keys(self):
+        expected = self.expected[::-1]
+        first = keyset_paginate(self.students, ('-full_name', '-id'), per_page=4)
+        self.assertEqual([user.id for user in first], expected[:4])
+        second = keyset_paginate(self.students, ('-full_name', '-id'), after=first.next_cursor, per_page=4)
+        self.assertEqual([user.id for user in second], expected[4:])
+        back = keyset_paginate(self.students, ('-full_name', '-id'), before=second.previous_cursor, per_page=4)
+        self.assertEqual([user.id for user in back], expected[:4])
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        page = keyset_paginate(self.students, ('full_name', 'id'), after='not-a-cursor!', per_page=3)
+        self.assertEqual([user.id for user in page], self.expected[:3])
+
+    @mock.patch('adminportal.views.LIST_PAGE_SIZE', 2)
+    def test_student_list_links_keep_filters(self):
+        self.client.force_login(self.admin)
+        computing = list(
+            self.students.filter(department=self.computing).order_by('full_name', 'id').values_list('id', flat=True)
+        )
+        context = self.client.get(reverse('adminportal:student_list'), {'department': self.computing.id}).context
+        self.assertEqual([user.id for user in context['students']], computing[:2])
+
+        params = parse_qs(context['page_links']['next'])
+        self.assertEqual(params['department'], [str(self.computing.id)])
+        context = self.client.get(reverse('adminportal:student_list'), params).context
+        self.assertEqual([user.id for user in context['students']], computing[2:4])
+        self.assertIn('department', parse_qs(context['page_links']['previous']))
+
+    def test_student_list_renders_within_its_query_budget(self):
+        course = Course.objects.create(name="Computer Science", code="CS", department=self.computing)
+        subject = Subject.objects.create(course=course, name="Programming", code="CS101")
+        group = ClassGroup.objects.create(name="CS-A", department=self.computing, course=course)
+        for user in self.students[:3]:
+            Enrollment.objects.create(student=Student.objects.get(user=user), subject=subject, class_group=group)
+        self.client.force_login(self.admin)
+        # Session, user, page, profiles, enrollments with class group and course, two filter lists
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('adminportal:student_list'))
+        self.assertContains(response, "Computer Science")
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class StudentImportTests(TestCase):
+    HEADER = "Full Name,Email,Identity Card Number,Password,Department,Class Group,Date Of Birth\n"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Computing")
+        course = Course.objects.create(name="Computer Science", code="CS", department=cls.department)
+        cls.subjects = [
+            Subject.objects.create(course=course, name="Programming", code="CS101"),
+            Subject.objects.create(course=course, name="Databases", code="CS102"),
+        ]
+        cls.group = ClassGroup.objects.create(name="CS-A", department=cls.department, course=course)
+        cls.admin = CustomUser.objects.create(
+            email="admin@example.com", identity_card_number="IC-ADMIN", full_name="Admin User",
+            role=CustomUser.Role.ADMIN,
+        )
+        CustomUser.objects.create(
+            email="taken@example.com", identity_card_number="IC-TAKEN", full_name="Already Here",
+            role=CustomUser.Role.STUDENT,
+        )
+
+    def rows(self, body):
+        return iter_import_rows(io.BytesIO((self.HEADER + body).encode('utf-8')), 'students.csv')
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        get_counters(role_counter(CustomUser.Role.STUDENT))  # make sure the counter row exists
+        result = import_students(self.rows(
+            "Aina Zain,aina@example.com,IC-1,secret-1,Computing,CS-A,2004-05-06\n"
+            "Bala Raj,BALA@Example.com,IC-2,,,CS-A,\n"
+            "Dup Email,aina@example.com,IC-3,,,,\n"
+            "Old Email,Taken@example.com,IC-4,,,,\n"
+            "No Dept,nodept@example.com,IC-5,,Physics,,\n"
+            "Bad Date,baddate@example.com,IC-6,,,,06/05/2004\n"
+            ",noname@example.com,IC-7,,,,\n"
+        ), workers=0, batch_size=3)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.enrollments, 4)
+        self.assertEqual([error.line for error in result.errors], [4, 5, 6, 7, 8])
+        self.assertIn("already exists", result.errors[0].message)
+        self.assertIn("already exists", result.errors[1].message)
+
+        aina = CustomUser.objects.get(email="aina@example.com")
+        self.assertTrue(aina.check_password("secret-1"))
+        self.assertEqual(aina.department, self.department)
+        profile = Student.objects.get(user=aina)
+        self.assertEqual(profile.class_group, self.group)
+        self.assertEqual(str(profile.date_of_birth), "2004-05-06")
+        self.assertEqual(Enrollment.objects.filter(student=profile).count(), len(self.subjects))
+
+        bala = CustomUser.objects.get(identity_card_number="IC-2")
+        self.assertTrue(bala.check_password("password123"))
+        self.assertEqual(bala.department, self.department)  # taken from the class group
+        self.assertEqual(list(search_users(CustomUser.objects.all(), "bala")), [bala])
+        self.assertEqual(get_counters(role_counter(CustomUser.Role.STUDENT))[role_counter(CustomUser.Role.STUDENT)], 3)
+
+    def test_process_pool_hashing(self):
+        body = "".join(f"Student {i},s{i}@example.com,IC-P{i},pw-{i},,,\n" for i in range(6))
+        result = import_students(self.rows(body), workers=2)
+        self.assertEqual(result.created, 6)
+        self.assertTrue(CustomUser.objects.get(email="s5@example.com").check_password("pw-5"))
+
+    def test_dry_run_writes_nothing(self):
+        before = CustomUser.objects.count()
+        result = import_students(self.rows("Aina Zain,aina@example.com,IC-1,,,,\n"), workers=0, dry_run=True)
+        self.assertEqual((result.created, result.errors), (1, []))
+        self.assertEqual(CustomUser.objects.count(), before)
+
+    def test_command_writes_error_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source, report = os.path.join(tmp, 'intake.csv'), os.path.join(tmp, 'errors.csv')
+            with open(source, 'w', encoding='utf-8') as fh:
+                fh.write(self.HEADER + "Aina Zain,aina@example.com,IC-1,,,,\nOld,taken@example.com,IC-9,,,,\n")
+            call_command('import_students', source, workers=0, errors=report, stdout=io.StringIO())
+            with open(report, encoding='utf-8') as fh:
+                rows = list(csv.reader(fh))
+        self.assertEqual(rows[1][:2], ['3', 'taken@example.com'])
+        self.assertTrue(CustomUser.objects.filter(email="aina@example.com").exists())
+
+    def test_upload_queues_a_background_job(self):
+        self.client.force_login(self.admin)
+        upload = SimpleUploadedFile('intake.csv', (self.HEADER + (
+            "Aina Zain,aina@example.com,IC-1,,,CS-A,\n"
+            "Old,taken@example.com,IC-9,,,,\n"
+        )).encode())
+        with tempfile.TemporaryDirectory() as private_root, override_settings(PRIVATE_MEDIA_ROOT=private_root):
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post(reverse('adminportal:import_students'), {'file': upload})
+            self.assertRedirects(response, reverse('adminportal:import_students'), fetch_redirect_response=False)
+            self.assertEqual(len(callbacks), 1)
+            # Nothing is imported inside the request
+            self.assertFalse(CustomUser.objects.filter(email="aina@example.com").exists())
+
+            job = StudentImportJob.objects.get()
+            # Outside MEDIA_ROOT, under a name that isn't the upload's
+            self.assertEqual(job.filename, 'intake.csv')
+            self.assertNotIn('intake', job.file.name)
+            self.assertTrue(os.path.exists(os.path.join(private_root, job.file.name)))
+            status_url = reverse('adminportal:import_job_status', args=[job.pk])
+            self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+            self.assertEqual(run_import_job(job.pk, workers=0).status, StudentImportJob.Status.DONE)
+            self.assertIsNone(run_import_job(job.pk, workers=0))  # already claimed
+            payload = self.client.get(status_url).json()
+            self.assertEqual((payload['students_created'], payload['rows_rejected']), (1, 1))
+            self.assertEqual(os.listdir(os.path.join(private_root, 'imports')), [])  # passwords don't linger
+
+        self.assertEqual(Enrollment.objects.filter(student__user__email="aina@example.com").count(), 2)
+        page = self.client.get(reverse('adminportal:import_job_detail', args=[job.pk])).content.decode()
+        self.assertIn("taken@example.com", page)
+
+    def test_upload_rejects_unreadable_files(self):
+        self.client.force_login(self.admin)
+        upload = SimpleUploadedFile('intake.txt', b'nope')
+        response = self.client.post(reverse('adminportal:import_students'), {'file': upload})
+        self.assertIn('file', response.context['form'].errors)
+        self.assertFalse(StudentImportJob.objects.exists())
+
+        with tempfile.TemporaryDirectory() as private_root, override_settings(PRIVATE_MEDIA_ROOT=private_root):
+            job = StudentImportJob.objects.create(
+                requested_by=self.admin, file=SimpleUploadedFile('bad.csv', b'name\nx\n'), filename='bad.csv',
+            )
+            call_command('process_import_jobs', workers=0, stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, StudentImportJob.Status.FAILED)
+        self.assertIn("Missing required column", job.error)
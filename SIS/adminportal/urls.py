@@ -21,6 +21,9 @@ urlpatterns = [
     # Student management pages
     path('students/', views.student_list, name='student_list'),
     path('students/add/', views.add_student, name='add_student'),
+    path('students/import/', views.import_students, name='import_students'),
+    path('students/import/<int:job_id>/', views.import_job_detail, name='import_job_detail'),
+    path('students/import/<int:job_id>/status/', views.import_job_status, name='import_job_status'),
 
     #Enroll students in courses
     path('students/<int:pk>/enroll/', views.enroll_student, name='enroll_student'),
@@ -1,38 +1,59 @@
+from django.db.models import Prefetch
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth import authenticate, login
 from django.contrib import messages
-from django.db.models import Q
 from accounts.decorators import role_required
 from accounts.models import CustomUser
+from accounts.search import search_users
 from .forms import (
      LecturerCreationForm, StudentUpdateForm, 
      StudentProfileUpdateForm, CourseForm, DepartmentForm
 )
 from core.models import Department, Course, Lecturer, Student, Enrollment
-import csv
-from django.http import HttpResponse
-from .forms import AddStudentForm
+from core.csv_export import EXPORT_CHUNK_SIZE, streaming_csv_response, wants_gzip
+from core.pagination import keyset_paginate, page_querystrings
+from core.query_budget import query_budget
+from .forms import AddStudentForm, StudentImportForm
+from .import_jobs import enqueue_import_job
+from .models import StudentImportJob
+
+LIST_PAGE_SIZE = 50
 
 
 
 # ----- LECTURERS -----
 
+@role_required(CustomUser.Role.ADMIN)
+@query_budget(queries=6, repeats=1)
 def lecturer_list(request):
     query = request.GET.get('q', '')
     department_id = request.GET.get('department')
-    lecturers = Lecturer.objects.select_related('user__department').prefetch_related('courses')
+    # Filtering on role lets SQLite walk accounts_user_role_name_idx in (full_name, id) order
+    lecturers = (
+        Lecturer.objects.filter(user__role=CustomUser.Role.LECTURER)
+        .select_related('user__department')
+        .prefetch_related('classgroups__course')
+    )
 
-    if query:
-        lecturers = lecturers.filter(
-            Q(user__first_name__icontains=query) |
-            Q(user__last_name__icontains=query) |
-            Q(user__email__icontains=query)
-        )
     if department_id:
         lecturers = lecturers.filter(user__department_id=department_id)
+    if query:
+        lecturers = search_users(lecturers, query, prefix='user__')
+        keys = ('search_rank', 'user_id')
+    else:
+        keys = ('user__full_name', 'user_id')
+
+    page = keyset_paginate(
+        lecturers, keys,
+        after=request.GET.get('after'), before=request.GET.get('before'), per_page=LIST_PAGE_SIZE,
+    )
     departments = Department.objects.all()
     return render(request, 'adminportal/lecturer_list.html', {
-        'lecturers': lecturers,
+        'lecturers': page,
+        'page': page,
+        'page_links': page_querystrings(request, page),
         'departments': departments,
     })
 
@@ -60,29 +81,47 @@ def add_lecturer(request):
 
 # ----- EXPORT LECTURERS -----
 
+@role_required(CustomUser.Role.ADMIN)
 def export_lecturers(request):
     # Use user__department, NOT department
-    lecturers = Lecturer.objects.select_related('user__department').prefetch_related('courses')
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="lecturers.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Name', 'Email', 'Phone', 'Department', 'Courses'])
-    for lecturer in lecturers:
-        user = lecturer.user
-        name = user.get_full_name()
-        email = user.email
-        phone = user.phone_number or "-"
-        department = user.department.name if user.department else "-"
-        courses = ', '.join([course.name for course in lecturer.courses.all()])
-        writer.writerow([name, email, phone, department, courses])
-
-    return response
+    lecturers = (
+        Lecturer.objects.select_related('user__department')
+        .prefetch_related('classgroups__course')
+        .order_by('id')
+    )
+
+    def rows():
+        for lecturer in lecturers.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            user = lecturer.user
+            courses = sorted({group.course.name for group in lecturer.classgroups.all()})
+            yield [
+                user.get_full_name(),
+                user.email,
+                user.phone_number or "-",
+                user.department.name if user.department else "-",
+                ', '.join(courses),
+            ]
+
+    return streaming_csv_response(
+        'lecturers.csv',
+        ['Name', 'Email', 'Phone', 'Department', 'Courses'],
+        rows(),
+        gzip=wants_gzip(request),
+    )
 # ----- STUDENTS -----
 @role_required(CustomUser.Role.ADMIN)
+@query_budget(queries=8, repeats=1)
 def student_list(request):
-    students = CustomUser.objects.filter(role=CustomUser.Role.STUDENT).select_related('department').order_by('first_name')
+    students = (
+        CustomUser.objects.filter(role=CustomUser.Role.STUDENT)
+        .select_related('department')
+        # Enrollments come with their class group and course joined in: one query, not three
+        .prefetch_related(Prefetch(
+            'student__enrollment_set', queryset=Enrollment.objects.select_related('class_group__course'),
+        ))
+    )
 
+    query = request.GET.get('q', '')
     department_id = request.GET.get('department')
     course_id = request.GET.get('course')
 
@@ -90,13 +129,26 @@ def student_list(request):
         students = students.filter(department_id=department_id)
 
     if course_id:
-        students = students.filter(student__enrollment__course_id=course_id).distinct()
+        students = students.filter(student__enrollment__class_group__course_id=course_id).distinct()
+
+    if query:
+        # Ranked matches first; keyset pagination works the same on (rank, id)
+        students = search_users(students, query)
+        keys = ('search_rank', 'id')
+    else:
+        keys = ('full_name', 'id')
 
+    page = keyset_paginate(
+        students, keys,
+        after=request.GET.get('after'), before=request.GET.get('before'), per_page=LIST_PAGE_SIZE,
+    )
     departments = Department.objects.all()
     courses = Course.objects.all()
 
     return render(request, 'adminportal/student_list.html', {
-        'students': students,
+        'students': page,
+        'page': page,
+        'page_links': page_querystrings(request, page),
         'departments': departments,
         'courses': courses,
     })
@@ -139,6 +191,60 @@ def add_student(request):
         form = AddStudentForm()
     return render(request, 'adminportal/add_student.html', {'form': form})
 
+# ----- BULK STUDENT IMPORT -----
+def _import_job_payload(job):
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'students_created': job.students_created,
+        'enrollments_created': job.enrollments_created,
+        'rows_rejected': len(job.row_errors),
+        'error': job.error,
+        'detail_url': reverse('adminportal:import_job_detail', args=[job.pk]),
+    }
+
+@role_required(CustomUser.Role.ADMIN)
+def import_students(request):
+    """
+    Upload a student file and list previous imports. The import itself (validation,
+    password hashing, bulk inserts) runs in a background worker; the page polls
+    import_job_status.
+    """
+    if request.method == "POST":
+        form = StudentImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            job = StudentImportJob.objects.create(
+                requested_by=request.user,
+                file=upload,
+                filename=upload.name,
+                dry_run=form.cleaned_data['dry_run'],
+            )
+            enqueue_import_job(job)
+            messages.success(request, "Import queued. The results will appear below shortly.")
+            return redirect('adminportal:import_students')
+    else:
+        form = StudentImportForm()
+    jobs = StudentImportJob.objects.select_related('requested_by')[:20]
+    return render(request, 'adminportal/import_students.html', {'form': form, 'jobs': jobs})
+
+@role_required(CustomUser.Role.ADMIN)
+def import_job_status(request, job_id):
+    """
+    Polling endpoint for an import job.
+    """
+    job = get_object_or_404(StudentImportJob, pk=job_id)
+    return JsonResponse(_import_job_payload(job))
+
+@role_required(CustomUser.Role.ADMIN)
+def import_job_detail(request, job_id):
+    """
+    The outcome of an import job, with every rejected row.
+    """
+    job = get_object_or_404(StudentImportJob.objects.select_related('requested_by'), pk=job_id)
+    return render(request, 'adminportal/import_job_detail.html', {'job': job})
+
+
 @role_required(CustomUser.Role.ADMIN)
 def student_detail(request, pk):
     user = get_object_or_404(CustomUser, pk=pk, role=CustomUser.Role.STUDENT)
@@ -192,25 +298,34 @@ def enroll_student(request, pk):
     })
 
     # ----- STUDENT EXPORT -----
+@role_required(CustomUser.Role.ADMIN)
 def export_students(request):
-    students = CustomUser.objects.filter(role=CustomUser.Role.STUDENT).select_related('department')
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=students.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Name', 'Email', 'Department', 'Date Joined', 'Registration Number', 'Phone Number'])
-    for student in students:
-        department_name = student.department.name if student.department else '-'
-        reg_no = getattr(getattr(student, 'student', None), 'registration_number', '-')
-        phone = getattr(student, 'phone_number', '-')
-        writer.writerow([
-            student.get_full_name(),
-            student.email,
-            department_name,
-            student.date_joined.strftime('%Y-%m-%d'),
-            reg_no,
-            phone,
-        ])
-    return response
+    students = (
+        CustomUser.objects.filter(role=CustomUser.Role.STUDENT)
+        .select_related('department', 'student')
+        .order_by('id')
+    )
+
+    def rows():
+        for student in students.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            department_name = student.department.name if student.department else '-'
+            reg_no = getattr(getattr(student, 'student', None), 'registration_number', '-')
+            phone = getattr(student, 'phone_number', '-')
+            yield [
+                student.get_full_name(),
+                student.email,
+                department_name,
+                student.date_joined.strftime('%Y-%m-%d') if student.date_joined else '-',
+                reg_no,
+                phone,
+            ]
+
+    return streaming_csv_response(
+        'students.csv',
+        ['Name', 'Email', 'Department', 'Date Joined', 'Registration Number', 'Phone Number'],
+        rows(),
+        gzip=wants_gzip(request),
+    )
 
 # ----- STAFF -----
 @role_required(CustomUser.Role.ADMIN)
@@ -284,18 +399,22 @@ def edit_course(request, pk):
 # ----- EXPORT COURSES -----
 @role_required(CustomUser.Role.ADMIN)
 def export_courses(request):
-    # Create the HttpResponse object with the appropriate CSV header.
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="courses.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Name', 'Code', 'Lecturers', 'Classroom'])
-
-    for course in Course.objects.all():
-        lecturers = ', '.join(str(l) for l in course.lecturers.all())
-        writer.writerow([course.name, course.code, lecturers, course.classroom])
-
-    return response
+    # Lecturers and classrooms now live on the course's class groups
+    courses = Course.objects.prefetch_related('classgroups__lecturers__user').order_by('id')
+
+    def rows():
+        for course in courses.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            groups = course.classgroups.all()
+            lecturers = ', '.join(sorted({str(l) for group in groups for l in group.lecturers.all()}))
+            classrooms = ', '.join(sorted({group.classroom for group in groups if group.classroom}))
+            yield [course.name, course.code, lecturers, classrooms]
+
+    return streaming_csv_response(
+        'courses.csv',
+        ['Name', 'Code', 'Lecturers', 'Classroom'],
+        rows(),
+        gzip=wants_gzip(request),
+    )
 
 # ----- DEPARTMENT MANAGEMENT -----
 @role_required(CustomUser.Role.ADMIN)
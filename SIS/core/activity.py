@@ -0,0 +1,116 @@
+# core/activity.py
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connection
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from .models import Student
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Write-behind buffer for Student.latest_activity.
+
+    Page views only record a timestamp in memory. Touches closer together than
+    STUDENT_ACTIVITY_GRANULARITY seconds are coalesced, and pending touches are written
+    with one batched UPDATE at most every STUDENT_ACTIVITY_FLUSH_INTERVAL seconds: after
+    a response has been sent when one is due, and otherwise from a timer the first
+    pending touch starts, so the last touches before a quiet spell are written too.
+    A worker that dies loses the touches still pending, at most one interval's worth,
+    which is fine for a "last seen" timestamp.
+    """
+
+    batch_size = 400
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._written = {}
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    @property
+    def granularity(self):
+        return getattr(settings, 'STUDENT_ACTIVITY_GRANULARITY', 60)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'STUDENT_ACTIVITY_FLUSH_INTERVAL', 30)
+
+    def touch(self, user_id, when=None):
+        when = when or timezone.now()
+        window = timedelta(seconds=self.granularity)
+        with self._lock:
+            last = self._pending.get(user_id) or self._written.get(user_id)
+            if last is not None and when - last < window:
+                return False
+            self._pending[user_id] = when
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+            return True
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush_if_due(self):
+        with self._lock:
+            due = bool(self._pending) and time.monotonic() - self._last_flush >= self.flush_interval
+        return self.flush() if due else 0
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Could not write pending student activity")
+        finally:
+            # The timer thread gets its own connection; don't leave it open
+            connection.close()
+
+    def flush(self):
+        """Write pending touches with one UPDATE per batch_size students; returns the number updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            # Only remember recent writes; older ones can't suppress a touch anyway
+            cutoff = timezone.now() - timedelta(seconds=self.granularity)
+            self._written = {uid: ts for uid, ts in self._written.items() if ts >= cutoff}
+            self._written.update(pending)
+        items = list(pending.items())
+        updated = 0
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            updated += Student.objects.filter(user_id__in=[user_id for user_id, _ts in batch]).update(
+                latest_activity=Case(
+                    *[When(user_id=user_id, then=Value(ts)) for user_id, ts in batch],
+                    output_field=DateTimeField(),
+                )
+            )
+        return updated
+
+
+activity_tracker = ActivityTracker()
+
+
+def touch_student_activity(user):
+    """Record that a student was active now, without writing to the database."""
+    return activity_tracker.touch(user.pk)
+
+
+def _flush_after_request(sender, **kwargs):
+    activity_tracker.flush_if_due()
+
+
+request_finished.connect(_flush_after_request, dispatch_uid='core.activity.flush_after_request')
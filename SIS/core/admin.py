@@ -1,8 +1,10 @@
 from django.contrib import admin
+from django.utils.html import format_html
+from .thumbnails import thumbnail_html
 from .models import (
     Lecturer, Student, Course, Subject, ClassGroup,
-    Enrollment, Grade, Attendance,
-    StudentAchievement, DisciplinaryAction, Department
+    Enrollment, Grade, Attendance, AttendanceSummary,
+    StudentAchievement, DisciplinaryAction, Department, Counter
 )
 
 # ---------- Lecturer ----------
@@ -14,10 +16,9 @@ class LecturerAdmin(admin.ModelAdmin):
 
     def profile_picture_display(self, obj):
         if obj.profile_picture:
-            from django.utils.html import format_html
             return format_html(
-                '<img src="{}" width="50" height="50" style="border-radius:50%;" />',
-                obj.profile_picture.url
+                '<span style="display:inline-block;width:50px;height:50px;border-radius:50%;overflow:hidden;">{}</span>',
+                thumbnail_html(obj.profile_picture, 50, alt=str(obj)),
             )
         return "-"
     profile_picture_display.short_description = 'Profile Picture'
@@ -30,10 +31,9 @@ class StudentAdmin(admin.ModelAdmin):
 
     def profile_picture_display(self, obj):
         if obj.profile_picture:
-            from django.utils.html import format_html
             return format_html(
-                '<img src="{}" width="50" height="50" style="border-radius:50%;" />',
-                obj.profile_picture.url
+                '<span style="display:inline-block;width:50px;height:50px;border-radius:50%;overflow:hidden;">{}</span>',
+                thumbnail_html(obj.profile_picture, 50, alt=str(obj)),
             )
         return "-"
     profile_picture_display.short_description = 'Profile Picture'
@@ -82,6 +82,12 @@ class AttendanceAdmin(admin.ModelAdmin):
     list_filter = ('date', 'session', 'status')
     search_fields = ('enrollment__student__user__first_name', 'enrollment__student__user__last_name')
 
+# ---------- Attendance Summary ----------
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('enrollment', 'total', 'present', 'absent', 'late', 'excused', 'last_marked')
+    readonly_fields = ('enrollment', 'total', 'present', 'absent', 'late', 'excused', 'last_marked')
+
 # ---------- Student Achievement ----------
 @admin.register(StudentAchievement)
 class StudentAchievementAdmin(admin.ModelAdmin):
@@ -98,3 +104,9 @@ class DisciplinaryActionAdmin(admin.ModelAdmin):
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
     list_display = ('name',)
+
+# ---------- Counter ----------
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'reconciled_at')
+    readonly_fields = ('name', 'value', 'reconciled_at')
@@ -0,0 +1,138 @@
+# core/attendance.py
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+
+from .fragments import INSTITUTION, bump_enrollment_versions, bump_versions
+from .models import Attendance, AttendanceSummary
+from .sqlite import retry_on_locked
+
+AttendanceSaveResult = namedtuple('AttendanceSaveResult', ['inserted', 'updated', 'unchanged'])
+
+SUMMARY_FIELDS = ['total', 'present', 'absent', 'late', 'excused', 'last_marked']
+
+
+def _summary_rows(attendance_qs):
+    """Group attendance by enrollment with one conditional-count row per enrollment."""
+    return (
+        attendance_qs.order_by()
+        .values('enrollment_id')
+        .annotate(
+            total=Count('id'),
+            present=Count('id', filter=Q(status='present')),
+            absent=Count('id', filter=Q(status='absent')),
+            late=Count('id', filter=Q(status='late')),
+            excused=Count('id', filter=Q(status='excused')),
+            last_marked=Max('date'),
+        )
+    )
+
+
+def refresh_attendance_summaries(enrollment_ids):
+    """
+    Recompute the AttendanceSummary rows for the given enrollments.
+
+    One grouped query over their attendance plus one upsert, whatever the number of
+    enrollments. Enrollments left without any attendance lose their summary row. The
+    dashboards showing these enrollments get new data versions.
+    """
+    enrollment_ids = set(enrollment_ids)
+    if not enrollment_ids:
+        return
+
+    summaries = [
+        AttendanceSummary(**row)
+        for row in _summary_rows(Attendance.objects.filter(enrollment_id__in=enrollment_ids))
+    ]
+    with transaction.atomic():
+        if summaries:
+            AttendanceSummary.objects.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=['enrollment'],
+                update_fields=SUMMARY_FIELDS,
+            )
+        empty = enrollment_ids - {summary.enrollment_id for summary in summaries}
+        if empty:
+            AttendanceSummary.objects.filter(enrollment_id__in=empty).delete()
+        bump_enrollment_versions(enrollment_ids)
+
+
+def rebuild_attendance_summaries(batch_size=1000):
+    """Throw away every AttendanceSummary and rebuild them from the Attendance table."""
+    with transaction.atomic():
+        AttendanceSummary.objects.all().delete()
+        batch = []
+        created = 0
+        for row in _summary_rows(Attendance.objects.all()).iterator(chunk_size=batch_size):
+            batch.append(AttendanceSummary(**row))
+            if len(batch) >= batch_size:
+                AttendanceSummary.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            AttendanceSummary.objects.bulk_create(batch)
+            created += len(batch)
+        bump_versions(INSTITUTION)
+    return created
+
+
+@retry_on_locked
+def bulk_save_attendance(marks, date, session):
+    """
+    Upsert attendance for a whole roster on one (date, session) in a single transaction.
+
+    `marks` maps enrollment id -> (status, description); a description of None keeps an
+    existing row's remarks. `session` must be one of Attendance.SESSION_CHOICES: bulk_create
+    doesn't run choices validation, so an unknown one would be stored as is. Existing rows are read with one
+    query and every new or changed row is written with one INSERT ... ON CONFLICT on the
+    (enrollment, date, session) unique key, so the query count does not grow with class size.
+    The summaries of the enrollments that changed are refreshed in the same transaction,
+    which is retried as a whole if it can't get the SQLite write lock.
+    """
+    if session not in dict(Attendance.SESSION_CHOICES):
+        raise ValueError(f"Unknown attendance session {session!r}.")
+    if not marks:
+        return AttendanceSaveResult(0, 0, 0)
+
+    inserted = updated = unchanged = 0
+    to_write = []
+
+    with transaction.atomic():
+        existing = {
+            att.enrollment_id: att
+            for att in Attendance.objects.filter(
+                enrollment_id__in=marks.keys(), date=date, session=session
+            ).only('id', 'enrollment_id', 'status', 'description')
+        }
+        for enrollment_id, (status, description) in marks.items():
+            att = existing.get(enrollment_id)
+            if description is None:
+                description = att.description if att is not None else None
+            description = description or ''
+            if att is None:
+                inserted += 1
+            elif att.status == status and (att.description or '') == description:
+                unchanged += 1
+                continue
+            else:
+                updated += 1
+            to_write.append(Attendance(
+                enrollment_id=enrollment_id,
+                date=date,
+                session=session,
+                status=status,
+                description=description,
+            ))
+
+        if to_write:
+            Attendance.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=['enrollment', 'date', 'session'],
+                update_fields=['status', 'description'],
+            )
+            refresh_attendance_summaries(att.enrollment_id for att in to_write)
+
+    return AttendanceSaveResult(inserted, updated, unchanged)
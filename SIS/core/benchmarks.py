@@ -0,0 +1,331 @@
+# core/benchmarks.py
+import json
+import logging
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+from functools import wraps
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.template.backends.django import DjangoTemplates, Template as BackendTemplate
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .models import Attendance, Course, Enrollment, Lecturer, Student
+from .query_budget import QueryRecorder
+from .template_warmup import warm_templates
+
+BENCHMARK_RESULTS = settings.BASE_DIR / 'benchmarks' / 'results.jsonl'
+
+Scenario = namedtuple('Scenario', ['name', 'role', 'url'])
+BenchmarkResult = namedtuple('BenchmarkResult', [
+    'name', 'status', 'median_ms', 'p95_ms', 'queries', 'db_ms', 'bytes', 'error',
+])
+
+
+def _url(name, *args, **params):
+    url = reverse(name, args=args)
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+class BenchmarkData:
+    """The users, course and date the scenarios run as and against, picked deterministically."""
+
+    def __init__(self):
+        self.admin = CustomUser.objects.filter(role=CustomUser.Role.ADMIN).order_by('id').first()
+        lecturer = (
+            Lecturer.objects.filter(classgroups__isnull=False).select_related('user').order_by('id').first()
+        )
+        self.lecturer = lecturer.user if lecturer else None
+        self.course = (
+            Course.objects.filter(classgroups__lecturers=lecturer).order_by('id').first() if lecturer else None
+        )
+        student = Student.objects.filter(enrollment__isnull=False).select_related('user').order_by('id').first()
+        self.student = student.user if student else None
+        self.student_course_id = (
+            Enrollment.objects.filter(student=student).values_list('class_group__course_id', flat=True).first()
+            if student else None
+        )
+        self.date = Attendance.objects.aggregate(last=Max('date'))['last'] or timezone.localdate()
+        self.search = self.student.full_name.split(' ')[0] if self.student else 'a'
+
+    def user_for(self, role):
+        return {'admin': self.admin, 'lecturer': self.lecturer, 'student': self.student}[role]
+
+    def dataset(self):
+        return {
+            'students': Student.objects.count(),
+            'enrollments': Enrollment.objects.count(),
+            'attendance': Attendance.objects.count(),
+        }
+
+
+SCENARIOS = [
+    Scenario('dashboard.admin', 'admin', lambda d: _url('dashboard:main_dashboard')),
+    Scenario('dashboard.lecturer', 'lecturer', lambda d: _url('dashboard:main_dashboard')),
+    Scenario('dashboard.student', 'student', lambda d: _url('dashboard:main_dashboard')),
+    Scenario('lecturer.take_attendance', 'lecturer', lambda d: _url(
+        'lecturer:attendance_list', date=d.date.isoformat(), session='morning')),
+    Scenario('lecturer.attendance_history.week', 'lecturer', lambda d: _url(
+        'lecturer:attendance_history', course=d.course.id, date=d.date.isoformat(), period='week')),
+    Scenario('lecturer.attendance_history.month', 'lecturer', lambda d: _url(
+        'lecturer:attendance_history', course=d.course.id, date=d.date.isoformat(), period='month')),
+    Scenario('lecturer.attendance_history_json.month', 'lecturer', lambda d: _url(
+        'lecturer:attendance_history_json', course=d.course.id, date=d.date.isoformat(), period='month')),
+    Scenario('lecturer.export_attendance', 'lecturer', lambda d: _url(
+        'lecturer:export_attendance', course=d.course.id, date=d.date.strftime('%d-%m-%Y'))),
+    Scenario('student.attendance_detail', 'student', lambda d: _url(
+        'student:attendance_detail', d.student_course_id)),
+    Scenario('notifications.list', 'student', lambda d: _url('notifications:list')),
+    Scenario('adminportal.student_list', 'admin', lambda d: _url('adminportal:student_list')),
+    Scenario('adminportal.student_list.search', 'admin', lambda d: _url('adminportal:student_list', q=d.search)),
+    Scenario('adminportal.lecturer_list', 'admin', lambda d: _url('adminportal:lecturer_list')),
+    Scenario('adminportal.export_students', 'admin', lambda d: _url('adminportal:export_students')),
+    Scenario('adminportal.export_lecturers', 'admin', lambda d: _url('adminportal:export_lecturers')),
+    Scenario('adminportal.export_courses', 'admin', lambda d: _url('adminportal:export_courses')),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _measure(client, url):
+    recorder = QueryRecorder()
+    started = time.perf_counter()
+    with connection.execute_wrapper(recorder):
+        response = client.get(url)
+        # Streaming exports do their work while being read
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+    elapsed = (time.perf_counter() - started) * 1000
+    return response.status_code, elapsed, recorder.report(), len(body)
+
+
+def run_benchmarks(repeat=5, only=None, data=None):
+    """
+    Time every scenario in-process with the test client: one warm-up request, then
+    `repeat` timed ones. A scenario that raises or has no data to run against is
+    reported with its error instead of stopping the suite.
+    """
+    data = data or BenchmarkData()
+    # Failures are reported in the results; don't also print every traceback
+    request_logger = logging.getLogger('django.request')
+    log_level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        return _run_scenarios(data, repeat, only)
+    finally:
+        request_logger.setLevel(log_level)
+
+
+def _run_scenarios(data, repeat, only):
+    clients = {}
+    results = []
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for scenario in SCENARIOS:
+            if only and not any(scenario.name.startswith(prefix) for prefix in only):
+                continue
+            try:
+                user = data.user_for(scenario.role)
+                if user is None:
+                    raise LookupError(f"no {scenario.role} with data to run as")
+                url = scenario.url(data)
+                if scenario.role not in clients:
+                    clients[scenario.role] = Client(raise_request_exception=True)
+                    clients[scenario.role].force_login(user)
+                client = clients[scenario.role]
+                _measure(client, url)
+                timings, queries, db_ms, size, status = [], 0, 0.0, 0, None
+                for _n in range(repeat):
+                    status, elapsed, report, size = _measure(client, url)
+                    timings.append(elapsed)
+                    queries, db_ms = report.count, report.time_ms
+            except Exception as exc:
+                results.append(BenchmarkResult(
+                    scenario.name, None, None, None, None, None, None, f"{type(exc).__name__}: {exc}"[:200],
+                ))
+                continue
+            results.append(BenchmarkResult(
+                scenario.name, status, round(statistics.median(timings), 2), round(percentile(timings, 0.95), 2),
+                queries, db_ms, size, None,
+            ))
+    return results
+
+
+# ---------- Template profiles ----------
+
+TemplateResult = namedtuple('TemplateResult', ['profile', 'page', 'first_ms', 'steady_ms', 'queries_logged'])
+
+# The pages whose rendering is compared across profiles, as (template, scenario)
+TEMPLATE_PAGES = [
+    ('dashboard/dashboard.html', 'dashboard.lecturer'),
+    ('lecturer/attendance_history.html', 'lecturer.attendance_history.week'),
+]
+
+
+def template_profiles():
+    """
+    Settings overrides per profile: `uncached` re-reads and re-parses every template,
+    `development` is SIS.settings as is, `production` takes SIS.settings_production's
+    template, DEBUG and query counting settings; `production+warmup` also compiles
+    every template before the first request, as the server processes do at start-up.
+    """
+    from SIS import settings_production as production
+
+    base = settings.TEMPLATES[0]
+    uncached = [{**base, 'APP_DIRS': False, 'OPTIONS': {**base['OPTIONS'], 'loaders': [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]}}]
+    production_settings = {
+        name: getattr(production, name) for name in ('DEBUG', 'TEMPLATES', 'QUERY_BUDGET_ENABLED')
+    }
+    return {
+        'uncached': {'TEMPLATES': uncached},
+        'development': {},
+        'production': production_settings,
+        'production+warmup': production_settings,
+    }
+
+
+class _TemplateTimer:
+    """
+    Total the time spent in the Django template backend's get_template() and
+    Template.render() (includes and extends load and render inside those), less the
+    queries lazy querysets run while rendering.
+    """
+
+    def __init__(self):
+        self.ms = 0.0
+        self.db_ms = 0.0
+        self._depth = 0
+
+    def _timed(self, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            if self._depth:
+                return func(*args, **kwargs)
+            self._depth += 1
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.ms += (time.perf_counter() - started) * 1000
+                self._depth -= 1
+        return timed
+
+    def _query(self, execute, sql, params, many, context):
+        if not self._depth:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+    def __enter__(self):
+        self._patches = ExitStack()
+        self._patches.enter_context(connection.execute_wrapper(self._query))
+        self._patches.enter_context(
+            mock.patch.object(DjangoTemplates, 'get_template', self._timed(DjangoTemplates.get_template))
+        )
+        self._patches.enter_context(
+            mock.patch.object(BackendTemplate, 'render', self._timed(BackendTemplate.render))
+        )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._patches.close()
+
+    def measure(self, client, url):
+        self.ms = self.db_ms = 0.0
+        _measure(client, url)
+        return self.ms - self.db_ms
+
+
+def run_template_benchmarks(repeat=20, data=None):
+    """
+    For each profile and page, the template time (loading, compiling and rendering,
+    without database time) of the first request on fresh template engines, which is what a new server process
+    serves, and the median of `repeat` steady-state requests after it; plus how many
+    queries the last request left in connection.queries. Dashboard fragments aren't
+    cached here, so the role partial is rendered every time.
+    """
+    data = data or BenchmarkData()
+    scenarios = {scenario.name: scenario for scenario in SCENARIOS}
+    results = []
+    with _TemplateTimer() as timer:
+        for profile, overrides in template_profiles().items():
+            for template, scenario_name in TEMPLATE_PAGES:
+                scenario = scenarios[scenario_name]
+                url = scenario.url(data)
+                # TEMPLATES changing gives fresh engines, with empty template caches
+                with override_settings(
+                    **overrides, FRAGMENT_CACHE_TIMEOUT=0, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                ):
+                    client = Client(raise_request_exception=True)
+                    client.force_login(data.user_for(scenario.role))
+                    if profile.endswith('+warmup'):
+                        warm_templates()
+                    first = timer.measure(client, url)
+                    steady = [timer.measure(client, url) for _n in range(repeat)]
+                    results.append(TemplateResult(
+                        profile, template, round(first, 2), round(statistics.median(steady), 2),
+                        len(connection.queries),
+                    ))
+    return results
+
+
+# ---------- Stored runs ----------
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def record_run(results, dataset, path=BENCHMARK_RESULTS, commit=None):
+    """Append one run to the JSON-lines results file and return it."""
+    run = {
+        'commit': commit or current_commit(),
+        'recorded_at': timezone.now().isoformat(),
+        'dataset': dataset,
+        'results': [result._asdict() for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as fh:
+        fh.write(json.dumps(run) + '\n')
+    return run
+
+
+def load_runs(path=BENCHMARK_RESULTS):
+    if not path.exists():
+        return []
+    with open(path) as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def baseline_run(runs, dataset, commit=None, exclude_commit=None):
+    """The latest stored run on the same dataset, from `commit` or else any commit but `exclude_commit`."""
+    for run in reversed(runs):
+        if run['dataset'] != dataset:
+            continue
+        if commit and not run['commit'].startswith(commit):
+            continue
+        if not commit and run['commit'] == exclude_commit:
+            continue
+        return run
+    return None
@@ -0,0 +1,56 @@
+# core/counters.py
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .fragments import TOTALS, bump_versions
+from .models import Counter, Course
+
+USERS = 'users'
+COURSES = 'courses'
+
+
+def role_counter(role):
+    return f'users:{role}'
+
+
+def adjust_counter(name, delta):
+    """
+    Atomically add delta to a counter. A counter that doesn't exist yet is left alone;
+    it is created with its real value the next time it is read or reconciled.
+    """
+    if delta:
+        Counter.objects.filter(name=name).update(value=F('value') + delta)
+        bump_versions(TOTALS)
+
+
+def reconcile_counters():
+    """Recompute every counter from real COUNT(*) queries and store the results."""
+    from accounts.models import CustomUser
+
+    values = {role_counter(role): 0 for role in CustomUser.Role.values}
+    values.update({
+        role_counter(row['role']): row['total']
+        for row in CustomUser.objects.order_by().values('role').annotate(total=Count('id'))
+    })
+    values[USERS] = sum(values.values())
+    values[COURSES] = Course.objects.count()
+
+    now = timezone.now()
+    with transaction.atomic():
+        Counter.objects.bulk_create(
+            [Counter(name=name, value=value, reconciled_at=now) for name, value in values.items()],
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['value', 'reconciled_at'],
+        )
+        bump_versions(TOTALS)
+    return values
+
+
+def get_counters(*names):
+    """Read counters with one indexed query, reconciling first if any are missing."""
+    values = dict(Counter.objects.filter(name__in=names).values_list('name', 'value'))
+    if len(values) < len(names):
+        values = reconcile_counters()
+    return {name: values[name] for name in names}
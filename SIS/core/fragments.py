@@ -0,0 +1,89 @@
+# core/fragments.py
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Enrollment
+
+# Data every dashboard shows: courses, subjects, class groups and who teaches them
+INSTITUTION = 'institution'
+# The admin dashboard's institution counters
+TOTALS = 'totals'
+
+
+def user_scope(user_id):
+    """One user's own data: profile, enrollments, attendance, grades, disciplinary actions."""
+    return f'user:{user_id}'
+
+
+def _version_key(scope):
+    return f'fragment-version:{scope}'
+
+
+def bump_versions(*scopes):
+    """
+    Give each scope a new data version once the current transaction commits, so every
+    fragment cached under the old one stops matching. Versions are random tokens rather
+    than counters: a version evicted from the cache can never come back as one an old
+    fragment was stored under.
+    """
+    scopes = set(scopes)
+    if not scopes:
+        return
+
+    def bump():
+        token = uuid.uuid4().hex[:12]
+        cache.set_many({_version_key(scope): token for scope in scopes}, timeout=None)
+
+    # Bumping before commit would let a request cache the old rows under the new version
+    transaction.on_commit(bump)
+
+
+def bump_enrollment_versions(enrollment_ids):
+    """Bump the students and the class group lecturers whose dashboards show these enrollments."""
+    enrollment_ids = set(enrollment_ids)
+    if not enrollment_ids:
+        return
+    rows = Enrollment.objects.filter(id__in=enrollment_ids).values_list(
+        'student__user_id', 'class_group__lecturers__user_id',
+    )
+    bump_versions(*{user_scope(user_id) for row in rows for user_id in row if user_id})
+
+
+def bump_student_versions(user_id):
+    """Bump a student and the class group lecturers whose dashboard rosters list them."""
+    lecturer_ids = Enrollment.objects.filter(student__user_id=user_id).values_list(
+        'class_group__lecturers__user_id', flat=True,
+    )
+    bump_versions(user_scope(user_id), *{user_scope(lecturer_id) for lecturer_id in lecturer_ids if lecturer_id})
+
+
+def data_versions(*scopes):
+    """The current version of each scope with one cache read; missing ones are started."""
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex[:12] for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def cached_fragment(name, scopes, render, vary=()):
+    """
+    Return the HTML `render()` produces, cached under `name`, the data versions of
+    `scopes` and any `vary` values. `render` is only called on a miss, so a hit runs no
+    queries at all; it may return None (nothing to show), which isn't cached.
+
+    Entries also expire after FRAGMENT_CACHE_TIMEOUT seconds, which bounds how stale
+    anything not covered by a version (relative times, say) can get.
+    """
+    key = ':'.join(['fragment', name, *data_versions(*scopes), *map(str, vary)])
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        if html is not None:
+            cache.set(key, html, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 300))
+    return html
@@ -0,0 +1,232 @@
+# core/loadtest.py
+import html
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .benchmarks import percentile
+from .models import Attendance, Course, Enrollment, Lecturer, Student
+from .synthetic import SYNTHETIC_PASSWORD
+
+Sample = namedtuple('Sample', ['flow', 'started', 'ms', 'error'])
+FlowStats = namedtuple('FlowStats', ['flow', 'requests', 'errors', 'p50_ms', 'p95_ms', 'p99_ms'])
+LoadTestReport = namedtuple('LoadTestReport', ['seconds', 'requests', 'throughput', 'flows', 'errors'])
+
+# Django's debug page puts "<ExceptionType> at /path" in the title and the message in .exception_value
+_DEBUG_TITLE = re.compile(r'<title>\s*(\w+)\s+at ')
+_DEBUG_VALUE = re.compile(r'<pre class="exception_value">(.*?)</pre>', re.S)
+
+
+class LoadTestError(Exception):
+    def __init__(self, kind):
+        super().__init__(kind)
+        self.kind = kind
+
+
+def _error_kind(exc):
+    """A short, groupable description: 'OperationalError: database is locked', 'HTTP 502', 'timeout'..."""
+    if isinstance(exc, LoadTestError):
+        return exc.kind
+    if isinstance(exc, HTTPError):
+        body = exc.read(1 << 20).decode('utf-8', 'replace')
+        title, value = _DEBUG_TITLE.search(body), _DEBUG_VALUE.search(body)
+        if title:
+            message = html.unescape(value.group(1)).strip().splitlines()[0] if value else ''
+            return f"{title.group(1)}: {message}"[:120]
+        return f"HTTP {exc.code}"
+    if isinstance(exc, URLError):
+        exc = exc.reason
+    return type(exc).__name__ if not isinstance(exc, str) else exc
+
+
+class VirtualUser:
+    """One logged-in browser session: its own cookie jar and CSRF token."""
+
+    def __init__(self, base_url, user, password, timeout, **plan):
+        self.base_url = base_url.rstrip('/')
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.plan = plan
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+
+    @property
+    def csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def request(self, path, data=None):
+        body = urlencode(data).encode() if data is not None else None
+        request = Request(self.base_url + path, data=body, headers={'X-CSRFToken': self.csrf_token})
+        with self.opener.open(request, timeout=self.timeout) as response:
+            response.read()
+            return response.geturl()
+
+    def login(self):
+        login_url = reverse('accounts:login')
+        self.request(login_url)  # sets the CSRF cookie
+        landed = self.request(login_url, {'identifier': self.user.email, 'password': self.password})
+        if landed.endswith(login_url):
+            raise LoadTestError(f"login failed for {self.user.email}")
+
+
+# ---------- Flows ----------
+
+def _take_attendance(vu, rng):
+    # What the 8am rush does: save a whole course roster for one session
+    statuses = {f"status_{pk}": rng.choice(('present', 'present', 'present', 'absent')) for pk in vu.plan['roster']}
+    vu.request(reverse('lecturer:attendance_list'), {
+        'date': vu.plan['today'].isoformat(),
+        'session': rng.choice(('morning', 'evening')),
+        'save_attendance': '1',
+        **statuses,
+    })
+
+
+def _history(vu, rng):
+    vu.request(reverse('lecturer:attendance_history') + '?' + urlencode({
+        'course': vu.plan['course_id'], 'date': vu.plan['last_marked'].isoformat(), 'period': 'week',
+    }))
+
+
+def _export(vu, rng):
+    vu.request(reverse('lecturer:export_attendance') + '?' + urlencode({
+        'course': vu.plan['course_id'], 'date': vu.plan['last_marked'].strftime('%d-%m-%Y'),
+    }))
+
+
+def _get(url_name, *args, **params):
+    def flow(vu, rng):
+        url = reverse(url_name, args=args)
+        vu.request(f"{url}?{urlencode(params)}" if params else url)
+    return flow
+
+
+def _attendance_detail(vu, rng):
+    vu.request(reverse('student:attendance_detail', args=[vu.plan['course_id']]))
+
+
+def _search(vu, rng):
+    vu.request(reverse('adminportal:student_list') + '?' + urlencode({'q': rng.choice(('ali', 'tan', 'siti', 'wong'))}))
+
+
+# role -> [(flow name, weight, flow)]
+FLOWS = {
+    CustomUser.Role.LECTURER: [
+        ('lecturer.take_attendance.post', 6, _take_attendance),
+        ('lecturer.dashboard', 2, _get('dashboard:main_dashboard')),
+        ('lecturer.attendance_history', 1, _history),
+        ('lecturer.export_attendance', 1, _export),
+    ],
+    CustomUser.Role.STUDENT: [
+        ('student.dashboard', 5, _get('dashboard:main_dashboard')),
+        ('student.attendance_detail', 3, _attendance_detail),
+        ('student.notifications', 2, _get('notifications:list')),
+    ],
+    CustomUser.Role.ADMIN: [
+        ('admin.dashboard', 2, _get('dashboard:main_dashboard')),
+        ('admin.student_list', 3, _get('adminportal:student_list')),
+        ('admin.student_search', 2, _search),
+        ('admin.export_students', 1, _get('adminportal:export_students')),
+    ],
+}
+
+
+def plan_virtual_users(base_url, students, lecturers, admins, password=SYNTHETIC_PASSWORD, timeout=60):
+    """
+    Pick real users from the database (the server's database) and what each will touch:
+    a lecturer's take_attendance roster and course, a student's course.
+    """
+    today = timezone.localdate()
+    last_marked = Attendance.objects.aggregate(last=Max('date'))['last'] or today
+    users = []
+    for lecturer in Lecturer.objects.filter(classgroups__isnull=False).distinct().select_related('user').order_by('id')[:lecturers]:
+        # The course take_attendance picks for this lecturer
+        course = Course.objects.filter(classgroups__lecturers=lecturer).distinct().first()
+        roster = list(Enrollment.objects.filter(class_group__course=course).values_list('id', flat=True))
+        users.append(VirtualUser(
+            base_url, lecturer.user, password, timeout,
+            course_id=course.id, roster=roster, today=today, last_marked=last_marked,
+        ))
+    for student in Student.objects.filter(enrollment__isnull=False).distinct().select_related('user').order_by('id')[:students]:
+        course_id = Enrollment.objects.filter(student=student).values_list('class_group__course_id', flat=True).first()
+        users.append(VirtualUser(base_url, student.user, password, timeout, course_id=course_id))
+    for admin in CustomUser.objects.filter(role=CustomUser.Role.ADMIN).order_by('id')[:admins]:
+        users.append(VirtualUser(base_url, admin, password, timeout))
+    return users
+
+
+def run_load_test(virtual_users, duration=60, seed=1):
+    """
+    Log every virtual user in, then have each one (on its own thread) run flows picked
+    by weight for its role, back to back, for `duration` seconds. Returns a LoadTestReport.
+    """
+    samples = []
+    samples_lock = threading.Lock()
+    errors = Counter()
+
+    def record(flow, started, error=None):
+        sample = Sample(flow, started, (time.perf_counter() - started) * 1000, error)
+        with samples_lock:
+            samples.append(sample)
+            if error:
+                errors[error] += 1
+
+    def login(vu):
+        started = time.perf_counter()
+        try:
+            vu.login()
+        except Exception as exc:
+            record('login', started, _error_kind(exc))
+            return False
+        record('login', started)
+        return True
+
+    with ThreadPoolExecutor(max_workers=max(1, len(virtual_users))) as pool:
+        logged_in = [vu for vu, ok in zip(virtual_users, pool.map(login, virtual_users)) if ok]
+
+    run_started = time.perf_counter()
+    deadline = run_started + duration
+
+    def worker(index, vu):
+        rng = random.Random(seed * 100003 + index)
+        names, weights, flows = zip(*FLOWS[vu.user.role])
+        while time.perf_counter() < deadline:
+            i = rng.choices(range(len(flows)), weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                flows[i](vu, rng)
+            except Exception as exc:
+                record(names[i], started, _error_kind(exc))
+            else:
+                record(names[i], started)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(logged_in))) as pool:
+        for future in [pool.submit(worker, i, vu) for i, vu in enumerate(logged_in)]:
+            future.result()
+    elapsed = time.perf_counter() - run_started
+
+    by_flow = defaultdict(list)
+    for sample in samples:
+        by_flow[sample.flow].append(sample)
+    flows = []
+    for flow, flow_samples in sorted(by_flow.items()):
+        timings = [sample.ms for sample in flow_samples]
+        flows.append(FlowStats(
+            flow, len(flow_samples), sum(1 for sample in flow_samples if sample.error),
+            round(percentile(timings, 0.50), 1), round(percentile(timings, 0.95), 1), round(percentile(timings, 0.99), 1),
+        ))
+    requests = sum(1 for sample in samples if sample.flow != 'login')
+    return LoadTestReport(round(elapsed, 2), requests, round(requests / elapsed, 2) if elapsed else 0, flows, errors)
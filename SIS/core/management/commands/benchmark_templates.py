@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import BenchmarkData, run_template_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare first-request and steady-state render time of the dashboard and attendance "
+        "history pages across template profiles: uncached loaders, development settings, "
+        "production settings, and production with the start-up template warm-up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        results = run_template_benchmarks(repeat=options['repeat'], data=BenchmarkData())
+        self.stdout.write("Milliseconds spent loading, compiling and rendering templates per request.")
+        self.stdout.write(f"{'profile':18} {'template':34} {'first ms':>9} {'steady ms':>10} {'queries logged':>15}")
+        for result in results:
+            self.stdout.write(
+                f"{result.profile:18} {result.page:34} {result.first_ms:>9.1f} {result.steady_ms:>10.1f} "
+                f"{result.queries_logged:>15}"
+            )
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import (
+    BENCHMARK_RESULTS, BenchmarkData, baseline_run, current_commit, load_runs, record_run, run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the major views and exports against the current database (see generate_institution), "
+        "store the run and compare it with an earlier commit's run on the same dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--only', nargs='*', help="Scenario name prefixes, e.g. lecturer. adminportal.export")
+        parser.add_argument('--results', type=Path, default=BENCHMARK_RESULTS)
+        parser.add_argument('--against', help="Commit to compare with (default: the latest run from another commit).")
+        parser.add_argument('--no-save', action='store_true')
+
+    def handle(self, *args, **options):
+        data = BenchmarkData()
+        dataset = data.dataset()
+        commit = current_commit()
+        self.stdout.write(
+            f"Commit {commit}; {dataset['students']} students, {dataset['enrollments']} enrollments, "
+            f"{dataset['attendance']} attendance rows; reference date {data.date}"
+        )
+        baseline = baseline_run(load_runs(options['results']), dataset, options['against'], exclude_commit=commit)
+        previous = {result['name']: result for result in baseline['results']} if baseline else {}
+
+        results = run_benchmarks(repeat=options['repeat'], only=options['only'], data=data)
+
+        header = f"{'scenario':42} {'status':>6} {'median ms':>10} {'p95 ms':>9} {'queries':>8} {'db ms':>8} {'KiB':>8}"
+        if baseline:
+            header += f"  vs {baseline['commit']}"
+        self.stdout.write(header)
+        for result in results:
+            if result.error:
+                self.stdout.write(self.style.ERROR(f"{result.name:42} {result.error}"))
+                continue
+            line = (
+                f"{result.name:42} {result.status:>6} {result.median_ms:>10.1f} {result.p95_ms:>9.1f} "
+                f"{result.queries:>8} {result.db_ms:>8.1f} {result.bytes / 1024:>8.1f}"
+            )
+            before = previous.get(result.name)
+            if before and before['median_ms']:
+                change = (result.median_ms - before['median_ms']) / before['median_ms'] * 100
+                line += f"  {change:+6.1f}% ({before['median_ms']:.1f} ms, {before['queries']} queries)"
+            self.stdout.write(line)
+
+        if not options['no_save']:
+            record_run(results, dataset, options['results'], commit)
+            self.stdout.write(f"Saved to {options['results']}")
@@ -0,0 +1,59 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import CustomUser
+from core.models import Department
+from core.synthetic import SYNTHETIC_PASSWORD, generate_institution
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with a deterministic synthetic institution for benchmarks. "
+        "Point SIS_DATABASE_PATH at a fresh file and run migrate first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--students', type=int, default=50000)
+        parser.add_argument('--days', type=int, default=365, help="Days of attendance, ending at --end-date.")
+        parser.add_argument('--end-date', type=date.fromisoformat, default=date(2025, 12, 12))
+        parser.add_argument('--departments', type=int, default=5)
+        parser.add_argument('--courses-per-department', type=int, default=4)
+        parser.add_argument('--subjects-per-course', type=int, default=4)
+        parser.add_argument('--group-size', type=int, default=40)
+        parser.add_argument('--meetings-per-week', type=int, default=1)
+        parser.add_argument('--notifications-per-user', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if Department.objects.exists() or CustomUser.objects.exists():
+            raise CommandError(
+                f"{connection.settings_dict['NAME']} already has data; generate into a fresh database "
+                "(SIS_DATABASE_PATH=/tmp/synthetic.sqlite3 python manage.py migrate)."
+            )
+        started = time.perf_counter()
+
+        def progress(message):
+            self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
+
+        result = generate_institution(
+            seed=options['seed'],
+            students=options['students'],
+            days=options['days'],
+            end_date=options['end_date'],
+            departments=options['departments'],
+            courses_per_department=options['courses_per_department'],
+            subjects_per_course=options['subjects_per_course'],
+            group_size=options['group_size'],
+            meetings_per_week=options['meetings_per_week'],
+            notifications_per_user=options['notifications_per_user'],
+            batch_size=options['batch_size'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{value} {name.replace('_', ' ')}" for name, value in result._asdict().items())
+        ))
+        self.stdout.write(f"Every user's password is '{SYNTHETIC_PASSWORD}'.")
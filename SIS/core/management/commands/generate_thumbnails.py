@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import CustomUser
+from core.models import Lecturer, Parent, Student
+from core.thumbnails import generate_derivatives
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the resized WebP/JPEG derivatives of every stored profile picture (new uploads get "
+        "theirs in the background); run once for pictures uploaded before thumbnails existed."
+    )
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in (CustomUser, Student, Lecturer, Parent):
+            names.update(model.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+                         .values_list('profile_picture', flat=True))
+
+        written = failed = 0
+        for name in sorted(names):
+            try:
+                written += len(generate_derivatives(name))
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"{name}: {exc}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} derivatives for {len(names) - failed} pictures ({failed} failed)."
+        ))
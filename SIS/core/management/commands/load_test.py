@@ -0,0 +1,94 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import plan_virtual_users, run_load_test
+from core.synthetic import SYNTHETIC_PASSWORD
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of student, lecturer and admin flows (attendance saves, dashboards, "
+        "history, exports) from concurrent logged-in sessions against a running server, and report "
+        "throughput, latency percentiles and error types. It writes attendance: use a copy of the "
+        "database (see generate_institution)."
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--url', help="Server to load, e.g. http://127.0.0.1:8000 (must use this database).")
+        target.add_argument('--serve', action='store_true', help="Start runserver on a free port for the run.")
+        parser.add_argument('--students', type=int, default=40)
+        parser.add_argument('--lecturers', type=int, default=20)
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=60, help="Seconds of load after logging in.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--password', default=SYNTHETIC_PASSWORD)
+        parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout in seconds.")
+
+    def handle(self, *args, **options):
+        server = None
+        base_url = options['url']
+        if options['serve']:
+            port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}'],
+                cwd=settings.BASE_DIR, env=os.environ.copy(),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            if not _wait_for_port(port):
+                server.terminate()
+                raise CommandError("runserver did not start.")
+            base_url = f'http://127.0.0.1:{port}'
+        try:
+            virtual_users = plan_virtual_users(
+                base_url, options['students'], options['lecturers'], options['admins'],
+                password=options['password'], timeout=options['timeout'],
+            )
+            if not virtual_users:
+                raise CommandError("No users with data to simulate; run generate_institution first.")
+            self.stdout.write(
+                f"{len(virtual_users)} concurrent sessions against {base_url} for {options['duration']:g}s"
+            )
+            report = run_load_test(virtual_users, duration=options['duration'], seed=options['seed'])
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+        self.stdout.write(
+            f"{report.requests} requests in {report.seconds}s: {report.throughput} requests/s"
+        )
+        self.stdout.write(f"{'flow':34} {'requests':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for flow in report.flows:
+            self.stdout.write(
+                f"{flow.flow:34} {flow.requests:>8} {flow.errors:>7} {flow.p50_ms:>9.1f} {flow.p95_ms:>9.1f} {flow.p99_ms:>9.1f}"
+            )
+        if report.errors:
+            self.stdout.write(self.style.ERROR("Errors:"))
+            for kind, count in report.errors.most_common():
+                self.stdout.write(f"  {count:>6}  {kind}")
+        else:
+            self.stdout.write(self.style.SUCCESS("No errors."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.attendance import rebuild_attendance_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-enrollment AttendanceSummary rollup from the Attendance table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = rebuild_attendance_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} attendance summaries."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the cached institution counters from the database (run periodically, e.g. from cron)."
+
+    def handle(self, *args, **options):
+        for name, value in sorted(reconcile_counters().items()):
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile every template. The server processes do this themselves at start-up when "
+        "TEMPLATE_WARMUP is on; run it before a deploy to catch templates that don't compile."
+    )
+
+    def handle(self, *args, **options):
+        result = warm_templates()
+        for name, message in result.errors:
+            self.stderr.write(self.style.ERROR(f"{name}: {message}"))
+        if result.errors:
+            raise CommandError(f"{len(result.errors)} of {result.templates + len(result.errors)} templates failed to compile.")
+        self.stdout.write(self.style.SUCCESS(f"Compiled {result.templates} templates in {result.seconds:.2f}s."))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_counter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'session', 'enrollment'], name='core_attendance_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['class_group', 'subject', 'student'], name='core_enrollment_group_idx'),
+        ),
+    ]
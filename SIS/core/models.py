@@ -124,10 +124,21 @@ class Enrollment(models.Model):
 
     class Meta:
         unique_together = ('student', 'subject', 'class_group')
+        indexes = [
+            # A class group's roster, optionally narrowed to one subject; carries student_id
+            # so rosters and notification fan-out don't touch the table
+            models.Index(fields=['class_group', 'subject', 'student'], name='core_enrollment_group_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} in {self.class_group} - {self.subject}"
 
+    @property
+    def attendance_percentage(self):
+        # Reads the rollup row; select_related('attendance_summary') to avoid a query per enrollment
+        summary = getattr(self, 'attendance_summary', None)
+        return summary.percentage if summary else 0
+
 # ---------- Attendance ----------
 class Attendance(models.Model):
     SESSION_CHOICES = [
@@ -147,11 +158,37 @@ class Attendance(models.Model):
     description = models.TextField(blank=True, null=True)
 
     class Meta:
+        # The unique constraint already serves lookups by enrollment and date range
         unique_together = ('enrollment', 'date', 'session')
+        indexes = [
+            # Date-first reads across enrollments: today's attendance, exports by period
+            models.Index(fields=['date', 'session', 'enrollment'], name='core_attendance_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.enrollment.student} - {self.enrollment.subject} - {self.date} [{self.session}] - {self.status.capitalize()}"
 
+# ---------- Attendance Summary ----------
+class AttendanceSummary(models.Model):
+    """
+    Per-enrollment attendance rollup, kept current by the attendance write paths
+    (see core.attendance) and rebuilt with `manage.py rebuild_attendance_summaries`.
+    """
+    enrollment = models.OneToOneField(Enrollment, on_delete=models.CASCADE, related_name='attendance_summary')
+    total = models.PositiveIntegerField(default=0)
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    last_marked = models.DateField(blank=True, null=True)
+
+    @property
+    def percentage(self):
+        return round(self.present / self.total * 100, 2) if self.total else 0
+
+    def __str__(self):
+        return f"{self.enrollment}: {self.present}/{self.total} present"
+
 # ---------- Grade ----------
 class Grade(models.Model):
     enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE)
@@ -180,3 +217,16 @@ class DisciplinaryAction(models.Model):
 
     def __str__(self):
         return f"{self.student}: {self.action} on {self.date}"
+
+# ---------- Counter ----------
+class Counter(models.Model):
+    """
+    Cached institution totals (see core.counters), adjusted by signals and
+    reconciled against real COUNT(*)s by `manage.py reconcile_counters`.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
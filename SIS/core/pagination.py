@@ -0,0 +1,136 @@
+# core/pagination.py
+import base64
+import datetime
+import json
+from operator import attrgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset, plus the cursors for its neighbours."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder rounds to milliseconds; a seek key needs the exact value
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    """Return the cursor's key values, or None for anything malformed or tampered with."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+
+def _flip(key):
+    return key[1:] if key.startswith('-') else f'-{key}'
+
+
+def _seek_filter(keys, values, forward):
+    """
+    "Row comes after (v1, v2, ...) in keys order" spelled out as nested ORs so the
+    index can be used; a '-' prefix makes that key compare descending.
+    """
+    condition = Q()
+    for i, key in enumerate(keys):
+        ascending = not key.startswith('-')
+        op = 'gt' if ascending == forward else 'lt'
+        clause = Q(**{f'{key.lstrip("-")}__{op}': values[i]})
+        for prev_key, prev_value in zip(keys[:i], values[:i]):
+            clause &= Q(**{prev_key.lstrip('-'): prev_value})
+        condition |= clause
+    return condition
+
+
+def keyset_paginate(queryset, keys, after=None, before=None, per_page=50):
+    """
+    Paginate `queryset` by seeking past the last row of the previous page instead of
+    using OFFSET, so every page costs one index range scan however deep it is.
+
+    `keys` are the ordering fields as for order_by() ('-created_at' for descending);
+    the last one must be unique (usually the primary key) so the order is total.
+    `after`/`before` are cursors from a previous page.
+    """
+    getters = [attrgetter(key.lstrip('-').replace('__', '.')) for key in keys]
+
+    def cursor_for(obj):
+        return encode_cursor(getter(obj) for getter in getters)
+
+    before_values = decode_cursor(before, len(keys))
+    after_values = None if before_values else decode_cursor(after, len(keys))
+
+    if before_values:
+        qs = queryset.filter(_seek_filter(keys, before_values, forward=False))
+        rows = list(qs.order_by(*[_flip(key) for key in keys])[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return KeysetPage(
+            rows,
+            next_cursor=cursor_for(rows[-1]) if rows else None,
+            previous_cursor=cursor_for(rows[0]) if rows and has_more else None,
+        )
+
+    qs = queryset
+    if after_values:
+        qs = qs.filter(_seek_filter(keys, after_values, forward=True))
+    rows = list(qs.order_by(*keys)[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    return KeysetPage(
+        rows,
+        next_cursor=cursor_for(rows[-1]) if rows and has_more else None,
+        previous_cursor=cursor_for(rows[0]) if rows and after_values else None,
+    )
+
+
+def page_querystrings(request, page):
+    """Querystrings for the next/previous links that keep every other GET filter intact."""
+    links = {}
+    for name, param, other, cursor in (
+        ('next', 'after', 'before', page.next_cursor),
+        ('previous', 'before', 'after', page.previous_cursor),
+    ):
+        if cursor is None:
+            links[name] = None
+            continue
+        params = request.GET.copy()
+        params.pop(other, None)
+        params[param] = cursor
+        links[name] = params.urlencode()
+    return links
@@ -0,0 +1,134 @@
+# core/query_budget.py
+import logging
+import re
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+QueryBudget = namedtuple('QueryBudget', ['queries', 'time_ms', 'repeats'])
+QueryReport = namedtuple('QueryReport', ['count', 'time_ms', 'shapes'])
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised instead of logging when QUERY_BUDGET_RAISE is on (the test runner)."""
+
+
+def query_budget(queries=None, time_ms=None, repeats=None):
+    """
+    Declare how much database work a view may do per request: at most `queries`
+    statements, `time_ms` milliseconds of database time, and `repeats` executions of
+    any one statement shape. QueryBudgetMiddleware checks the budget; without the
+    middleware the decorator does nothing.
+    """
+    budget = QueryBudget(queries, time_ms, repeats)
+
+    def decorator(view_func):
+        # Stored on the function; functools.wraps carries it through outer decorators
+        view_func.query_budget = budget
+        return view_func
+
+    return decorator
+
+
+# ---------- Fingerprinting ----------
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SAVEPOINT = re.compile(r'"s\d+_x\d+"')
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Reduce SQL to its shape, so the same query with different values compares equal."""
+    sql = _IN_LIST.sub('(%s, ...)', sql)
+    sql = _SAVEPOINT.sub('"sp"', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper that counts statements, database time and repeated shapes."""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+    def report(self):
+        return QueryReport(self.count, round(self.time * 1000, 2), self.shapes)
+
+
+# ---------- Middleware ----------
+
+class QueryBudgetMiddleware:
+    """
+    Count the queries and database time of every request (QUERY_BUDGET_ENABLED).
+
+    Each response gets a Server-Timing header with the totals. Statements run at
+    least QUERY_BUDGET_REPEAT_THRESHOLD times with the same shape are logged as a
+    likely N+1. Views decorated with @query_budget are checked against their budget;
+    going over is logged, or raised as QueryBudgetExceeded when QUERY_BUDGET_RAISE
+    is set. Queries a streaming response runs after the view returns aren't counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        report = recorder.report()
+        response['Server-Timing'] = f'db;dur={report.time_ms};desc="{report.count} queries"'
+        self.check(request, report)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+
+    def check(self, request, report):
+        threshold = getattr(settings, 'QUERY_BUDGET_REPEAT_THRESHOLD', 5)
+        for shape, n in report.shapes.most_common():
+            if n < threshold:
+                break
+            logger.warning("Possible N+1 on %s: %d x %s", request.path, n, shape)
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is None:
+            return
+        problems = []
+        if budget.queries is not None and report.count > budget.queries:
+            problems.append(f"{report.count} queries (budget {budget.queries})")
+        if budget.time_ms is not None and report.time_ms > budget.time_ms:
+            problems.append(f"{report.time_ms} ms in the database (budget {budget.time_ms} ms)")
+        if budget.repeats is not None:
+            problems.extend(
+                f"{n} x {shape} (budget {budget.repeats})"
+                for shape, n in report.shapes.most_common() if n > budget.repeats
+            )
+        if not problems:
+            return
+        message = f"{request.method} {request.path} is over its query budget: " + '; '.join(problems)
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
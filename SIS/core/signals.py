@@ -1,10 +1,16 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_init, post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.conf import settings
 from django.contrib.auth.signals import user_logged_in
-from django.utils import timezone
-from .models import Student, Lecturer
+from .models import (
+    Student, Lecturer, Parent, Attendance, Course, Subject, ClassGroup, Enrollment, Grade, DisciplinaryAction,
+)
+from . import counters, fragments
+from .thumbnails import schedule_derivatives
+from .attendance import refresh_attendance_summaries
+from .activity import touch_student_activity
 from accounts.models import CustomUser  # Adjust import if needed
+from accounts.search import SEARCH_FIELDS, index_users, unindex_users
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
@@ -27,11 +33,132 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
 @receiver(user_logged_in)
 def update_latest_activity(sender, request, user, **kwargs):
     """
-    Update the latest_activity timestamp for Student on user login.
+    Record the login as Student activity; the write-behind tracker batches the UPDATE.
     """
-    try:
-        student = Student.objects.get(user=user)
-        student.latest_activity = timezone.now()
-        student.save(update_fields=['latest_activity'])
-    except Student.DoesNotExist:
-        pass
+    if user.role == CustomUser.Role.STUDENT:
+        touch_student_activity(user)
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def refresh_enrollment_attendance_summary(sender, instance, **kwargs):
+    """
+    Keep the enrollment's AttendanceSummary current for single-row writes
+    (update_or_create, admin edits, deletes). Bulk saves refresh it themselves.
+    """
+    refresh_attendance_summaries([instance.enrollment_id])
+
+
+# ---------- Institution counters ----------
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_counted_role(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred role field doesn't cost a query
+    instance._counted_role = instance.__dict__.get('role')
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def count_saved_user(sender, instance, created, **kwargs):
+    """
+    Keep the user/role counters current; a role change moves the user between counters.
+    """
+    previous = getattr(instance, '_counted_role', None)
+    if created:
+        counters.adjust_counter(counters.USERS, 1)
+        counters.adjust_counter(counters.role_counter(instance.role), 1)
+    elif previous and previous != instance.role:
+        counters.adjust_counter(counters.role_counter(previous), -1)
+        counters.adjust_counter(counters.role_counter(instance.role), 1)
+    instance._counted_role = instance.role
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def count_deleted_user(sender, instance, **kwargs):
+    counters.adjust_counter(counters.USERS, -1)
+    counters.adjust_counter(counters.role_counter(instance.role), -1)
+
+@receiver(post_save, sender=Course)
+def count_saved_course(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust_counter(counters.COURSES, 1)
+
+@receiver(post_delete, sender=Course)
+def count_deleted_course(sender, instance, **kwargs):
+    counters.adjust_counter(counters.COURSES, -1)
+
+
+# ---------- User search index ----------
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def index_saved_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the user's search index row in step; saves that only touch other fields
+    (last_login on every sign-in, for one) skip the write.
+    """
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    index_users([instance])
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def unindex_deleted_user(sender, instance, **kwargs):
+    unindex_users([instance.pk])
+
+
+# ---------- Dashboard fragment versions ----------
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def bump_user_version(sender, instance, update_fields=None, **kwargs):
+    # The dashboard shows the user's own profile fields and last login; lecturers' rosters
+    # show their students' names and emails, but not when they last logged in
+    if instance.role == CustomUser.Role.STUDENT and not (update_fields and set(update_fields) <= {'last_login'}):
+        fragments.bump_student_versions(instance.pk)
+    else:
+        fragments.bump_versions(fragments.user_scope(instance.pk))
+
+@receiver(post_save, sender=Enrollment)
+@receiver(pre_delete, sender=Enrollment)
+def bump_enrollment_version(sender, instance, **kwargs):
+    # pre_delete: the row is still there to find the student and lecturers from
+    fragments.bump_enrollment_versions([instance.pk])
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def bump_grade_version(sender, instance, **kwargs):
+    fragments.bump_enrollment_versions([instance.enrollment_id])
+
+@receiver(post_save, sender=DisciplinaryAction)
+@receiver(post_delete, sender=DisciplinaryAction)
+def bump_disciplinary_version(sender, instance, **kwargs):
+    user_ids = Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True)
+    fragments.bump_versions(*(fragments.user_scope(user_id) for user_id in user_ids))
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=ClassGroup)
+@receiver(post_delete, sender=ClassGroup)
+@receiver(m2m_changed, sender=ClassGroup.lecturers.through)
+def bump_institution_version(sender, **kwargs):
+    fragments.bump_versions(fragments.INSTITUTION)
+
+
+# ---------- Profile picture thumbnails ----------
+
+PICTURE_MODELS = (settings.AUTH_USER_MODEL, Student, Lecturer, Parent)
+
+def remember_profile_picture(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred profile_picture doesn't cost a query
+    value = instance.__dict__.get('profile_picture')
+    instance._thumbnailed_picture = getattr(value, 'name', value)
+
+def thumbnail_new_profile_picture(sender, instance, **kwargs):
+    """Queue the derivatives of a newly uploaded profile picture."""
+    if 'profile_picture' not in instance.__dict__:
+        return
+    name = instance.profile_picture.name
+    if name and name != getattr(instance, '_thumbnailed_picture', None):
+        schedule_derivatives(name)
+    instance._thumbnailed_picture = name
+
+for picture_model in PICTURE_MODELS:
+    post_init.connect(remember_profile_picture, sender=picture_model)
+    post_save.connect(thumbnail_new_profile_picture, sender=picture_model)
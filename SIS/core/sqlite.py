@@ -0,0 +1,54 @@
+# core/sqlite.py
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+logger = logging.getLogger(__name__)
+
+
+def is_locked_error(exc):
+    """SQLITE_BUSY, as the sqlite3 module reports it."""
+    return isinstance(exc, OperationalError) and 'database is locked' in str(exc)
+
+
+def retry_on_locked(func):
+    """
+    Retry a write that failed with "database is locked" (another writer held the lock
+    for longer than busy_timeout) up to SQLITE_WRITE_RETRIES more times, with jittered
+    exponential backoff. Only an outermost transaction can be retried: inside a caller's
+    atomic block the whole block has been rolled back, so the error is raised as is.
+    The wrapped function must be safe to run again, as a single-transaction upsert is.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        retries = getattr(settings, 'SQLITE_WRITE_RETRIES', 3)
+        delay = getattr(settings, 'SQLITE_RETRY_DELAY', 0.05)
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if attempt >= retries or not is_locked_error(exc) or connection.in_atomic_block:
+                    raise
+                attempt += 1
+                logger.warning("%s: database is locked, retry %d of %d", func.__qualname__, attempt, retries)
+                time.sleep(delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+    return wrapper
+
+
+def query_plan(query, params=()):
+    """
+    The steps of SQLite's EXPLAIN QUERY PLAN, one string each, for a queryset or for
+    SQL already run (e.g. one captured by CaptureQueriesContext) and its params.
+    """
+    if hasattr(query, 'query'):
+        sql, params = query.query.sql_with_params()
+    else:
+        sql = query
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
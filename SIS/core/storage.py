@@ -0,0 +1,34 @@
+# core/storage.py
+import secrets
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+
+@deconstructible(path='core.storage.PrivateStorage')
+class PrivateStorage(FileSystemStorage):
+    """
+    Files nobody should fetch by URL: attendance exports, handed out by a view that
+    checks who's asking, and uploaded student imports. They live under
+    PRIVATE_MEDIA_ROOT, outside MEDIA_ROOT, so neither the development media route
+    nor the web server in front of Django ever serves them.
+    """
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.PRIVATE_MEDIA_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'PRIVATE_MEDIA_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+
+private_storage = PrivateStorage()
+
+
+def random_name(directory, extension):
+    """directory/<random>.extension: a name nobody can guess from the file's owner or contents."""
+    return f"{directory}/{secrets.token_urlsafe(16)}.{extension}"
@@ -0,0 +1,298 @@
+# core/synthetic.py
+import random
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from accounts.search import rebuild_search_index
+from notifications.models import Notification
+from notifications.unread import reconcile_unread_counts
+from . import counters
+from .attendance import rebuild_attendance_summaries
+from .models import (
+    Attendance, ClassGroup, Course, Department, Enrollment, Grade, Lecturer, Student, Subject
+)
+
+SYNTHETIC_PASSWORD = 'password123'  # same default as CustomUserManager.create_user
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.sis.test'
+
+GeneratedInstitution = namedtuple('GeneratedInstitution', [
+    'departments', 'courses', 'subjects', 'class_groups', 'lecturers', 'students',
+    'enrollments', 'attendance', 'grades', 'notifications',
+])
+
+DEPARTMENT_NAMES = [
+    'Computing', 'Business', 'Engineering', 'Design', 'Hospitality',
+    'Health Sciences', 'Accounting', 'Education', 'Media', 'Languages',
+]
+SUBJECT_TOPICS = [
+    'Fundamentals', 'Mathematics', 'Communication', 'Ethics', 'Project',
+    'Statistics', 'Management', 'Practicum', 'Research Methods', 'Workshop',
+]
+FIRST_NAMES = [
+    'Ahmad', 'Aisyah', 'Ali', 'Amirah', 'Arjun', 'Badrul', 'Chong', 'Daniel', 'Devi', 'Farah',
+    'Hafiz', 'Hui Min', 'Iman', 'Jia Wei', 'Kavitha', 'Lim', 'Mei Ling', 'Muthu', 'Nurul', 'Priya',
+    'Rajesh', 'Siti', 'Tan', 'Wei Jie', 'Yusuf', 'Zarina',
+]
+LAST_NAMES = [
+    'Abdullah', 'Chan', 'Hassan', 'Ibrahim', 'Ismail', 'Kumar', 'Lee', 'Lim', 'Ng', 'Omar',
+    'Rahman', 'Ramasamy', 'Tan', 'Wong', 'Yap', 'Zainal',
+]
+GRADES = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'D', 'F']
+NOTIFICATION_MESSAGES = [
+    "Attendance for {subject} has been updated.",
+    "New grade posted for {subject}.",
+    "Reminder: {subject} assignment is due this week.",
+    "Class for {subject} has moved to another room.",
+]
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _school_days(end_date, days):
+    start = end_date - timedelta(days=days - 1)
+    return [start + timedelta(days=i) for i in range(days) if (start + timedelta(days=i)).weekday() < 5]
+
+
+class _Generator:
+    def __init__(self, seed, end_date, batch_size, progress):
+        self.rng = random.Random(seed)
+        self.end_date = end_date
+        self.joined = timezone.make_aware(datetime.combine(end_date - timedelta(days=365), time(9)))
+        self.batch_size = batch_size
+        self.progress = progress or (lambda message: None)
+        self.password = make_password(SYNTHETIC_PASSWORD)
+        self.user_number = 0
+
+    def name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def users(self, role, count, department_ids):
+        users = []
+        for i in range(count):
+            self.user_number += 1
+            full_name = self.name()
+            users.append(CustomUser(
+                email=f"{role.lower()}{i + 1:05}@{SYNTHETIC_EMAIL_DOMAIN}",
+                identity_card_number=f"{900000 + self.user_number:06}-14-{self.rng.randrange(10000):04}",
+                full_name=full_name,
+                short_name=full_name.split(' ')[0],
+                role=role,
+                department_id=department_ids[i % len(department_ids)] if department_ids else None,
+                password=self.password,
+                date_joined=self.joined,
+                is_staff=role == CustomUser.Role.ADMIN,
+                is_superuser=role == CustomUser.Role.ADMIN,
+            ))
+        return CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def bulk(self, model, objects):
+        created = 0
+        for batch in _batched(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+
+def generate_institution(
+    seed=1, students=50000, days=365, end_date=date(2025, 12, 12), departments=5,
+    courses_per_department=4, subjects_per_course=4, group_size=40, meetings_per_week=1,
+    notifications_per_user=5, batch_size=5000, progress=None,
+):
+    """
+    Fill an empty database with a synthetic institution: departments, courses,
+    subjects, class groups with two lecturers each, students enrolled in every
+    subject of their course, `days` of morning and evening attendance (each subject
+    meets `meetings_per_week` weekdays a week), one grade per enrollment and
+    notifications. The same arguments always produce the same rows.
+
+    Everything is written with bulk_create, so the derived data that signals would
+    maintain (attendance summaries, search index, counters, unread counts) is rebuilt
+    at the end. Every user's password is SYNTHETIC_PASSWORD.
+    """
+    gen = _Generator(seed, end_date, batch_size, progress)
+    rng = gen.rng
+
+    with transaction.atomic():
+        department_objs = Department.objects.bulk_create([
+            Department(name=DEPARTMENT_NAMES[i] if i < len(DEPARTMENT_NAMES) else f"Department {i + 1}")
+            for i in range(departments)
+        ])
+        course_objs = Course.objects.bulk_create([
+            Course(
+                name=f"Diploma in {department.name} {n + 1}",
+                code=f"{department.name[:3].upper()}{n + 1:02}",
+                department=department,
+            )
+            for department in department_objs
+            for n in range(courses_per_department)
+        ])
+        subject_objs = Subject.objects.bulk_create([
+            Subject(
+                course=course,
+                name=f"{course.name.split(' in ')[1]} {SUBJECT_TOPICS[n % len(SUBJECT_TOPICS)]}",
+                code=f"{course.code}-{n + 1:02}",
+            )
+            for course in course_objs
+            for n in range(subjects_per_course)
+        ])
+        subjects_by_course = {}
+        for subject in subject_objs:
+            subjects_by_course.setdefault(subject.course_id, []).append(subject)
+
+        # Students are spread over courses unevenly, as real intakes are
+        weights = [rng.uniform(0.5, 1.5) for _course in course_objs]
+        course_of_student = rng.choices(course_objs, weights=weights, k=students)
+        per_course = {course.id: 0 for course in course_objs}
+        for course in course_of_student:
+            per_course[course.id] += 1
+        group_objs = ClassGroup.objects.bulk_create([
+            ClassGroup(
+                name=f"{course.code}-{chr(ord('A') + n % 26)}{n // 26 or ''}",
+                department_id=course.department_id,
+                course=course,
+                year=end_date.year,
+                classroom=f"Room {rng.randrange(1, 60)}",
+            )
+            for course in course_objs
+            for n in range(max(1, -(-per_course[course.id] // group_size)))
+        ])
+        groups_by_course = {}
+        for group in group_objs:
+            groups_by_course.setdefault(group.course_id, []).append(group)
+        gen.progress(f"{len(department_objs)} departments, {len(course_objs)} courses, {len(group_objs)} class groups")
+
+        gen.users(CustomUser.Role.ADMIN, 3, [])
+        lecturer_users = gen.users(
+            CustomUser.Role.LECTURER, len(group_objs), [group.department_id for group in group_objs]
+        )
+        lecturer_objs = Lecturer.objects.bulk_create([
+            Lecturer(user=user, department_id=group.department_id)
+            for user, group in zip(lecturer_users, group_objs)
+        ])
+        # Each group is taught by its own lecturer and the next one in the same course
+        lecturer_of_group = {group.id: lecturer for group, lecturer in zip(group_objs, lecturer_objs)}
+        group_lecturers, lecturer_subjects = [], set()
+        for course_id, groups in groups_by_course.items():
+            for i, group in enumerate(groups):
+                next_group = groups[(i + 1) % len(groups)]
+                for lecturer in {lecturer_of_group[group.id], lecturer_of_group[next_group.id]}:
+                    group_lecturers.append(ClassGroup.lecturers.through(classgroup_id=group.id, lecturer_id=lecturer.id))
+                    lecturer_subjects.update((lecturer.id, subject.id) for subject in subjects_by_course[course_id])
+        ClassGroup.lecturers.through.objects.bulk_create(group_lecturers)
+        Lecturer.subjects.through.objects.bulk_create([
+            Lecturer.subjects.through(lecturer_id=lecturer_id, subject_id=subject_id)
+            for lecturer_id, subject_id in sorted(lecturer_subjects)
+        ])
+
+        student_users = gen.users(
+            CustomUser.Role.STUDENT, students, [course.department_id for course in course_of_student]
+        )
+        filled = {course.id: 0 for course in course_objs}
+        student_groups = []
+        for course in course_of_student:
+            student_groups.append(groups_by_course[course.id][filled[course.id] // group_size])
+            filled[course.id] += 1
+        student_objs = Student.objects.bulk_create([
+            Student(
+                user=user,
+                class_group=group,
+                date_of_birth=date(end_date.year - rng.randint(18, 24), rng.randint(1, 12), rng.randint(1, 28)),
+                phone_number=f"01{rng.randrange(10 ** 8):08}",
+            )
+            for user, group in zip(student_users, student_groups)
+        ], batch_size=batch_size)
+        enrollment_objs = Enrollment.objects.bulk_create([
+            Enrollment(student=student, subject=subject, class_group=group)
+            for student, group in zip(student_objs, student_groups)
+            for subject in subjects_by_course[group.course_id]
+        ], batch_size=batch_size)
+    gen.progress(f"{len(lecturer_objs)} lecturers, {len(student_objs)} students, {len(enrollment_objs)} enrollments")
+
+    # Each student has a steady attendance habit; each subject a fixed timetable
+    habit = {student.id: rng.betavariate(8, 1.5) for student in student_objs}
+    meets_on = {
+        subject.id: set(rng.sample(range(5), min(meetings_per_week, 5))) for subject in subject_objs
+    }
+    school_days = _school_days(end_date, days)
+
+    def attendance_rows():
+        for day in school_days:
+            for enrollment in enrollment_objs:
+                if day.weekday() not in meets_on[enrollment.subject_id]:
+                    continue
+                present = habit[enrollment.student_id]
+                for session in ('morning', 'evening'):
+                    roll = rng.random()
+                    status = (
+                        'present' if roll < present
+                        else 'late' if roll < present + (1 - present) * 0.3
+                        else 'excused' if roll < present + (1 - present) * 0.4
+                        else 'absent'
+                    )
+                    yield enrollment.id, day, session, status
+
+    # Attendance is most of the rows; a plain executemany is several times faster than
+    # bulk_create, which SQLite's parameter limit cuts into ~200-row INSERTs
+    table = Attendance._meta.db_table
+    attendance = 0
+    for batch in _batched(attendance_rows(), gen.batch_size * 10):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (enrollment_id, date, session, status) VALUES (%s, %s, %s, %s)", batch
+            )
+        attendance += len(batch)
+    gen.progress(f"{attendance} attendance records over {len(school_days)} school days")
+
+    subject_names = {subject.id: subject.name for subject in subject_objs}
+    grades = gen.bulk(Grade, (
+        Grade(
+            enrollment_id=enrollment.id,
+            subject_name=subject_names[enrollment.subject_id],
+            grade=GRADES[min(len(GRADES) - 1, int((1 - habit[enrollment.student_id]) * 20 + rng.random() * 3))],
+        )
+        for enrollment in enrollment_objs
+    ))
+
+    # created_at is auto_now_add, so bulk_create stamps "now"; backdate them afterwards
+    messages = sorted(subject_names.values())
+    notifications = []
+    for user in student_users:
+        for _n in range(notifications_per_user):
+            age = rng.randrange(days)
+            notification = Notification(
+                lecturer=user,
+                message=rng.choice(NOTIFICATION_MESSAGES).format(subject=rng.choice(messages)),
+                is_read=age > 14 or rng.random() < 0.3,
+            )
+            notifications.append((notification, age))
+    for batch in _batched(notifications, gen.batch_size):
+        with transaction.atomic():
+            Notification.objects.bulk_create([notification for notification, _age in batch])
+            for notification, age in batch:
+                notification.created_at = timezone.make_aware(
+                    datetime.combine(end_date - timedelta(days=age), time(8 + age % 10))
+                )
+            Notification.objects.bulk_update([notification for notification, _age in batch], ['created_at'], batch_size=500)
+    gen.progress(f"{grades} grades, {len(notifications)} notifications")
+
+    rebuild_attendance_summaries()
+    rebuild_search_index()
+    counters.reconcile_counters()
+    reconcile_unread_counts()
+    gen.progress("Rebuilt attendance summaries, search index, counters and unread counts")
+
+    return GeneratedInstitution(
+        len(department_objs), len(course_objs), len(subject_objs), len(group_objs), len(lecturer_objs),
+        len(student_objs), len(enrollment_objs), attendance, grades, len(notifications),
+    )
@@ -0,0 +1,15 @@
+# core/templatetags/thumbnails.py
+from django import template
+
+from core.thumbnails import thumbnail_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail(image, pixels, css_class='', alt=''):
+    """
+    {% thumbnail user.profile_picture 48 "w-12 h-12 rounded-full" "Profile" %}: the
+    profile picture derivatives sized for 48 CSS pixels (see core.thumbnails).
+    """
+    return thumbnail_html(image, pixels, css_class, alt)
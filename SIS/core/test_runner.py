@@ -0,0 +1,19 @@
+# core/test_runner.py
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    The project's test runner (TEST_RUNNER): a view going over its @query_budget fails
+    the test that requested it instead of only being logged.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_budget_override = override_settings(QUERY_BUDGET_RAISE=True)
+        self._query_budget_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._query_budget_override.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,3 +1,573 @@
-from django.test import TestCase
+import io
+import sqlite3
+import tempfile
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.template.loader import get_template
+from django.test import LiveServerTestCase, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import CustomUser
+from .activity import ActivityTracker
+from .attendance import bulk_save_attendance
+from .benchmarks import (
+    SCENARIOS, TEMPLATE_PAGES, baseline_run, load_runs, record_run, run_benchmarks, run_template_benchmarks,
+    template_profiles,
+)
+from .counters import role_counter
+from .loadtest import FLOWS, plan_virtual_users, run_load_test
+from .models import (
+    Attendance, AttendanceSummary, ClassGroup, Counter, Course, Department, Enrollment, Lecturer, Student,
+    Subject,
+)
+from .query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, fingerprint, query_budget
+from .sqlite import query_plan, retry_on_locked
+from .synthetic import generate_institution
+from .template_warmup import warm_templates
+from .thumbnails import THUMBNAIL_SIZES, derivative_name, generate_derivatives
+from .views import derived_media
+
+
+class AttendanceTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Computing")
+        course = Course.objects.create(name="Computer Science", code="CS", department=department)
+        cls.subject = Subject.objects.create(course=course, name="Databases", code="DB101")
+        cls.class_group = ClassGroup.objects.create(name="CS-A", department=department, course=course)
+
+    def make_enrollments(self, count, offset=0):
+        enrollments = []
+        for i in range(offset, offset + count):
+            user = CustomUser.objects.create(
+                email=f"student{i}@example.com",
+                identity_card_number=f"IC-{i}",
+                full_name=f"Student {i}",
+                role=CustomUser.Role.STUDENT,
+            )
+            enrollments.append(Enrollment.objects.create(
+                student=Student.objects.get(user=user),
+                subject=self.subject,
+                class_group=self.class_group,
+            ))
+        return enrollments
+
+
+class BulkSaveAttendanceTests(AttendanceTestMixin, TestCase):
+    def test_reports_inserted_updated_unchanged(self):
+        enrollments = self.make_enrollments(3)
+        day = date(2025, 3, 3)
+        marks = {e.id: ('present', '') for e in enrollments}
+
+        result = bulk_save_attendance(marks, day, 'morning')
+        self.assertEqual(result, (3, 0, 0))
+
+        marks[enrollments[0].id] = ('absent', 'MC')
+        result = bulk_save_attendance(marks, day, 'morning')
+        self.assertEqual(result, (0, 1, 2))
+
+        self.assertEqual(Attendance.objects.filter(date=day, session='morning').count(), 3)
+        att = Attendance.objects.get(enrollment=enrollments[0], date=day, session='morning')
+        self.assertEqual((att.status, att.description), ('absent', 'MC'))
+
+    def test_sessions_are_kept_apart(self):
+        enrollments = self.make_enrollments(2)
+        day = date(2025, 3, 3)
+        marks = {e.id: ('present', '') for e in enrollments}
+        bulk_save_attendance(marks, day, 'morning')
+        result = bulk_save_attendance(marks, day, 'evening')
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual(Attendance.objects.filter(date=day).count(), 4)
+
+    def test_query_count_is_independent_of_class_size(self):
+        day = date(2025, 3, 3)
+        small = {e.id: ('present', '') for e in self.make_enrollments(2)}
+        large = {e.id: ('absent', '') for e in self.make_enrollments(60, offset=100)}
+
+        with self.assertNumQueries(9):
+            bulk_save_attendance(small, day, 'morning')
+        with self.assertNumQueries(9):
+            bulk_save_attendance(large, day, 'morning')
+
+
+class AttendanceSummaryTests(AttendanceTestMixin, TestCase):
+    def test_bulk_save_keeps_summary_current(self):
+        enrollment = self.make_enrollments(1)[0]
+        bulk_save_attendance({enrollment.id: ('present', '')}, date(2025, 3, 3), 'morning')
+        bulk_save_attendance({enrollment.id: ('late', '')}, date(2025, 3, 3), 'evening')
+        bulk_save_attendance({enrollment.id: ('absent', '')}, date(2025, 3, 4), 'morning')
+
+        summary = AttendanceSummary.objects.get(enrollment=enrollment)
+        self.assertEqual(
+            (summary.total, summary.present, summary.absent, summary.late, summary.excused),
+            (3, 1, 1, 1, 0),
+        )
+        self.assertEqual(summary.last_marked, date(2025, 3, 4))
+        self.assertEqual(summary.percentage, 33.33)
+
+    def test_single_row_writes_and_deletes_refresh_summary(self):
+        enrollment = self.make_enrollments(1)[0]
+        att, _ = Attendance.objects.update_or_create(
+            enrollment=enrollment, date=date(2025, 3, 3), session='morning',
+            defaults={'status': 'excused'},
+        )
+        self.assertEqual(AttendanceSummary.objects.get(enrollment=enrollment).excused, 1)
+
+        att.delete()
+        self.assertFalse(AttendanceSummary.objects.filter(enrollment=enrollment).exists())
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.attendance_percentage, 0)
+
+    def test_rebuild_command(self):
+        enrollments = self.make_enrollments(3)
+        bulk_save_attendance({e.id: ('present', '') for e in enrollments}, date(2025, 3, 3), 'morning')
+        AttendanceSummary.objects.all().update(total=0, present=0)
+
+        call_command('rebuild_attendance_summaries', stdout=StringIO())
+
+        self.assertEqual(AttendanceSummary.objects.count(), 3)
+        self.assertTrue(all(s.percentage == 100 for s in AttendanceSummary.objects.all()))
+
+    def test_deleting_enrollment_cascades_cleanly(self):
+        enrollment = self.make_enrollments(1)[0]
+        bulk_save_attendance({enrollment.id: ('present', '')}, date(2025, 3, 3), 'morning')
+        bulk_save_attendance({enrollment.id: ('present', '')}, date(2025, 3, 4), 'morning')
+        enrollment.delete()
+        self.assertFalse(AttendanceSummary.objects.exists())
+
+
+@override_settings(STUDENT_ACTIVITY_GRANULARITY=60, STUDENT_ACTIVITY_FLUSH_INTERVAL=30)
+class ActivityTrackerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            CustomUser.objects.create(
+                email=f"student{i}@example.com",
+                identity_card_number=f"IC-{i}",
+                full_name=f"Student {i}",
+                role=CustomUser.Role.STUDENT,
+            )
+            for i in range(3)
+        ]
+
+    def test_touches_are_coalesced_and_flushed_in_one_update(self):
+        tracker = ActivityTracker()
+        now = timezone.now()
+        with self.assertNumQueries(0):
+            for user in self.users:
+                self.assertTrue(tracker.touch(user.pk, now))
+            self.assertFalse(tracker.touch(self.users[0].pk, now + timedelta(seconds=10)))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(tracker.flush(), 3)
+        self.assertEqual(
+            set(Student.objects.values_list('latest_activity', flat=True)), {now}
+        )
+
+        # Already written within the granularity window: nothing to do
+        self.assertFalse(tracker.touch(self.users[1].pk, now + timedelta(seconds=30)))
+        self.assertTrue(tracker.touch(self.users[1].pk, now + timedelta(seconds=90)))
+
+    def test_flush_only_when_due(self):
+        tracker = ActivityTracker()
+        tracker.touch(self.users[0].pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(tracker.flush_if_due(), 0)
+        with override_settings(STUDENT_ACTIVITY_FLUSH_INTERVAL=0):
+            self.assertEqual(tracker.flush_if_due(), 1)
+        self.assertEqual(tracker.pending(), {})
+
+    def test_timer_flushes_touches_no_request_follows(self):
+        tracker = ActivityTracker()
+        flushed = threading.Event()
+        with override_settings(STUDENT_ACTIVITY_FLUSH_INTERVAL=0.01), \
+                mock.patch.object(tracker, 'flush', side_effect=lambda: flushed.set()) as flush, \
+                mock.patch('core.activity.connection'):
+            tracker.touch(self.users[0].pk)
+            tracker.touch(self.users[1].pk)  # joins the timer the first touch started
+            self.assertTrue(flushed.wait(2))
+        flush.assert_called_once_with()
+        self.assertIsNone(tracker._timer)
+
+
+class HotQueryIndexTests(TestCase):
+    """Each hot lookup must be answered from an index, never a full table scan."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = query_plan(queryset)
+        self.assertTrue(any(index_name in step for step in plan), plan)
+        self.assertFalse([step for step in plan if step.startswith('SCAN')], plan)
+
+    def test_attendance(self):
+        period = (date(2025, 1, 1), date(2025, 1, 31))
+        self.assertUsesIndex(
+            Attendance.objects.filter(enrollment_id__in=[1, 2], date__range=period),
+            'core_attendance_enrollment_id_date_session',
+        )
+        self.assertUsesIndex(Attendance.objects.filter(date=date.today()), 'core_attendance_date_idx')
+        self.assertUsesIndex(
+            Attendance.objects.filter(date__range=period).order_by('date', 'session'), 'core_attendance_date_idx'
+        )
+
+    def test_todays_attendance_count(self):
+        # dashboard.views.lecturer_dashboard_context
+        lecturer = Lecturer(pk=1)
+        queryset = Attendance.objects.filter(
+            enrollment__class_group__lecturers=lecturer, date=date.today()
+        ).values('enrollment__student').distinct()
+        self.assertFalse([step for step in query_plan(queryset) if step.startswith('SCAN')])
+
+    def test_enrollment(self):
+        self.assertUsesIndex(Enrollment.objects.filter(student_id=1), 'core_enrollment_student_id')
+        self.assertUsesIndex(
+            Enrollment.objects.filter(class_group_id=1, subject_id=2), 'core_enrollment_group_idx'
+        )
+        self.assertUsesIndex(
+            Enrollment.objects.filter(class_group_id=1).values_list('student_id', flat=True),
+            'COVERING INDEX core_enrollment_group_idx',
+        )
+
+
+def course_departments(request):
+    names = [course.department.name for course in Course.objects.all()]  # one query per course
+    return HttpResponse(', '.join(names))
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True, QUERY_BUDGET_REPEAT_THRESHOLD=3)
+class QueryBudgetMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Computing")
+        cls.courses = [
+            Course.objects.create(name=f"Course {i}", code=f"C{i}", department=cls.department) for i in range(4)
+        ]
+
+    def run_view(self, view):
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = QueryBudgetMiddleware(get_response)
+        return middleware(RequestFactory().get('/courses/'))
+
+    def budgeted(self, **budget):
+        return query_budget(**budget)(lambda request: course_departments(request))
+
+    def test_fingerprint_ignores_values(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 12 AND b IN (%s, %s, %s) AND c = 'x''y'"),
+            fingerprint("SELECT * FROM t WHERE a = 7 AND  b IN (%s, %s) AND c = 'z'"),
+        )
+
+    def test_reports_totals_and_logs_repeated_queries(self):
+        with self.assertLogs('core.query_budget', 'WARNING') as logs:
+            response = self.run_view(course_departments)
+        self.assertIn('desc="5 queries"', response['Server-Timing'])
+        self.assertIn('Possible N+1 on /courses/: 4 x SELECT', logs.output[0])
+
+    def test_budget_is_enforced(self):
+        with self.assertLogs('core.query_budget', 'WARNING'):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "5 queries (budget 2)"):
+                self.run_view(self.budgeted(queries=2))
+            with self.assertRaisesMessage(QueryBudgetExceeded, "(budget 1)"):
+                self.run_view(self.budgeted(repeats=1))
+
+        fixed = query_budget(queries=1, repeats=1)(
+            lambda request: HttpResponse(', '.join(Course.objects.values_list('department__name', flat=True)))
+        )
+        self.assertEqual(self.run_view(fixed).status_code, 200)
+
+        with override_settings(QUERY_BUDGET_RAISE=False), self.assertLogs('core.query_budget', 'WARNING') as logs:
+            self.run_view(self.budgeted(queries=2))
+        self.assertIn("GET /courses/ is over its query budget", logs.output[-1])
+
+    @override_settings(QUERY_BUDGET_ENABLED=False)
+    def test_disabled_by_setting(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryBudgetMiddleware(lambda request: HttpResponse())
+
+
+SMALL_INSTITUTION = dict(
+    students=30, days=14, departments=2, courses_per_department=1, subjects_per_course=2,
+    group_size=10, notifications_per_user=2, end_date=date(2025, 3, 14),
+)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SyntheticInstitutionTests(TestCase):
+    def setUp(self):
+        # Dashboards rendered here are cached under ids the next test reuses
+        self.addCleanup(cache.clear)
+
+    def snapshot(self):
+        return (
+            list(CustomUser.objects.order_by('email').values_list('email', 'full_name', 'role')),
+            list(
+                Attendance.objects.order_by('enrollment__student__user__email', 'enrollment__subject__code', 'date', 'session')
+                .values_list('enrollment__student__user__email', 'enrollment__subject__code', 'date', 'session', 'status')
+            ),
+        )
+
+    def wipe(self):
+        CustomUser.objects.all().delete()
+        Department.objects.all().delete()
+
+    def test_same_seed_same_institution(self):
+        result = generate_institution(seed=7, **SMALL_INSTITUTION)
+        self.assertEqual((result.students, result.enrollments), (30, 60))
+        self.assertEqual(AttendanceSummary.objects.count(), result.enrollments)
+        self.assertEqual(Attendance.objects.count(), result.attendance)
+        self.assertEqual(Counter.objects.get(name=role_counter(CustomUser.Role.STUDENT)).value, 30)
+        first = self.snapshot()
+
+        self.wipe()
+        generate_institution(seed=7, **SMALL_INSTITUTION)
+        self.assertEqual(self.snapshot(), first)
+
+        self.wipe()
+        generate_institution(seed=8, **SMALL_INSTITUTION)
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_benchmark_suite_runs_every_scenario(self):
+        generate_institution(seed=1, **SMALL_INSTITUTION)
+        results = run_benchmarks(repeat=1)
+        self.assertEqual([result.name for result in results], [scenario.name for scenario in SCENARIOS])
+        for result in results:
+            with self.subTest(result.name):
+                self.assertIsNone(result.error)
+                self.assertEqual(result.status, 200)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'results.jsonl'
+            dataset = {'students': 30}
+            record_run(results, dataset, path, commit='aaa1111')
+            record_run(results, dataset, path, commit='bbb2222')
+            runs = load_runs(path)
+            self.assertEqual(baseline_run(runs, dataset, exclude_commit='bbb2222')['commit'], 'aaa1111')
+            self.assertEqual(baseline_run(runs, dataset, commit='bbb')['commit'], 'bbb2222')
+            self.assertIsNone(baseline_run(runs, {'students': 50000}))
+
+    def test_template_benchmark_covers_every_profile(self):
+        generate_institution(seed=1, **SMALL_INSTITUTION)
+        results = run_template_benchmarks(repeat=1)
+        self.assertEqual(
+            [(result.profile, result.page) for result in results],
+            [(profile, template) for profile in template_profiles() for template, _scenario in TEMPLATE_PAGES],
+        )
+        for result in results:
+            with self.subTest(result.profile, page=result.page):
+                self.assertGreater(result.steady_ms, 0)
+                if result.profile.startswith('production'):
+                    self.assertEqual(result.queries_logged, 0)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoadTestTests(LiveServerTestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def test_every_role_runs_its_flows(self):
+        generate_institution(seed=1, **SMALL_INSTITUTION)
+        # One user at a time: the live server shares the test database's single in-memory connection
+        for role, counts in (
+            (CustomUser.Role.STUDENT, (1, 0, 0)),
+            (CustomUser.Role.LECTURER, (0, 1, 0)),
+            (CustomUser.Role.ADMIN, (0, 0, 1)),
+        ):
+            with self.subTest(role):
+                virtual_users = plan_virtual_users(self.live_server_url, *counts)
+                self.assertEqual(len(virtual_users), 1)
+                report = run_load_test(virtual_users, duration=0.5)
+                self.assertEqual(report.errors, {})
+                self.assertGreater(report.requests, 0)
+                flows = {stats.flow for stats in report.flows} - {'login'}
+                self.assertLessEqual(flows, {name for name, _weight, _flow in FLOWS[role]})
+
+
+class TemplateWarmupTests(TestCase):
+    def test_every_template_compiles(self):
+        result = warm_templates()
+        self.assertEqual(result.errors, [])
+        self.assertGreater(result.templates, 100)
+
+    def test_production_profile_serves_warmed_templates_from_memory(self):
+        from SIS import settings_production as production
+
+        with override_settings(TEMPLATES=production.TEMPLATES, DEBUG=production.DEBUG):
+            warm_templates()
+            with mock.patch('django.template.loaders.filesystem.Loader.get_contents') as get_contents:
+                get_template('dashboard/dashboard.html')
+                get_template('lecturer/attendance_history.html')
+            get_contents.assert_not_called()
+
+
+def png_upload(name='me.png', size=(300, 200)):
+    buffer = io.BytesIO()
+    Image.new('RGBA', size, (200, 30, 30, 128)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        self.user = CustomUser.objects.create(
+            email="pic@example.com", identity_card_number="IC-PIC", full_name="Pic Owner",
+            role=CustomUser.Role.LECTURER,
+        )
+
+    def upload(self):
+        with mock.patch('core.thumbnails._get_executor') as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.profile_picture = png_upload()
+                self.user.save()
+        return get_executor.return_value.submit
+
+    def test_new_upload_is_queued_once(self):
+        submit = self.upload()
+        submit.assert_called_once_with(mock.ANY, self.user.profile_picture.name)
+
+        with mock.patch('core.thumbnails._get_executor') as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                CustomUser.objects.get(pk=self.user.pk).save()
+        get_executor.return_value.submit.assert_not_called()
+
+    def test_derivatives_are_square_in_every_format(self):
+        self.upload()
+        name = self.user.profile_picture.name
+        written = generate_derivatives(name)
+        self.assertEqual(len(written), len(THUMBNAIL_SIZES) * 2)
+        for size in THUMBNAIL_SIZES:
+            for extension, image_format in (('webp', 'WEBP'), ('jpg', 'JPEG')):
+                with default_storage.open(derivative_name(name, size, extension)) as fh, Image.open(fh) as image:
+                    self.assertEqual((image.format, image.size), (image_format, (size, size)))
+
+    def test_tag_falls_back_to_the_original_until_derivatives_exist(self):
+        self.upload()
+        template = Template('{% load thumbnails %}{% thumbnail picture 48 "avatar" "Me" %}')
+        context = Context({'picture': self.user.profile_picture})
+        self.assertInHTML(
+            f'<img src="{self.user.profile_picture.url}" alt="Me" class="avatar" width="48" height="48" loading="lazy">',
+            template.render(context),
+        )
+
+        generate_derivatives(self.user.profile_picture.name)
+        html = template.render(context)
+        self.assertIn('<source type="image/webp" srcset="/media/profile_pics/derived/me.png-48.webp 1x, '
+                      '/media/profile_pics/derived/me.png-128.webp 2x">', html)
+        self.assertIn('src="/media/profile_pics/derived/me.png-48.jpg"', html)
+
+    def test_derivative_names_keep_the_source_extension(self):
+        self.assertNotEqual(
+            derivative_name('profile_pics/photo.png', 48, 'webp'),
+            derivative_name('profile_pics/photo.jpg', 48, 'webp'),
+        )
+
+    def test_derivatives_are_served_with_long_lived_cache_headers(self):
+        self.upload()
+        generate_derivatives(self.user.profile_picture.name)
+        # Routed only under DEBUG; production media comes from the web server
+        name = derivative_name(self.user.profile_picture.name, 48, 'webp')
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 404)
+        response = derived_media(RequestFactory().get(f'/media/{name}'), name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SQLiteConcurrencyTests(TransactionTestCase):
+    LECTURERS = 8
+    SAVES = 5
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = str(Path(tmp.name) / 'concurrency.sqlite3')
+
+    def file_database(self):
+        # The test database lives in memory; threads need a real file to contend on
+        connection.ensure_connection()
+        target = sqlite3.connect(self.path)
+        connection.connection.backup(target)
+        target.close()
+
+    def test_parallel_lecturers_save_attendance_without_lock_errors(self):
+        generate_institution(seed=1, **SMALL_INSTITUTION)
+        rosters = {}
+        for enrollment_id, class_group_id in Enrollment.objects.values_list('id', 'class_group_id'):
+            rosters.setdefault(class_group_id, []).append(enrollment_id)
+        rosters = list(rosters.values())
+        self.file_database()
+
+        wrapper_class, settings_dict = type(connections['default']), connections['default'].settings_dict
+        barrier = threading.Barrier(self.LECTURERS)
+        errors = []
+
+        def lecturer(index):
+            # A connection of this thread's own, to the file, with the project's OPTIONS
+            connections['default'] = wrapper_class({**settings_dict, 'NAME': self.path}, 'default')
+            roster = rosters[index % len(rosters)]
+            try:
+                barrier.wait()
+                for n in range(self.SAVES):
+                    bulk_save_attendance(
+                        {pk: ('present' if (pk + n) % 3 else 'absent', '') for pk in roster},
+                        # Each lecturer on days of their own, so no two threads write the same rows
+                        date(2025, 4, 1) + timedelta(days=index * self.SAVES + n), 'morning',
+                    )
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections['default'].close()
+
+        threads = [threading.Thread(target=lecturer, args=(i,)) for i in range(self.LECTURERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        with sqlite3.connect(self.path) as db:
+            self.assertEqual(db.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            saved = db.execute("SELECT COUNT(*) FROM core_attendance WHERE date >= '2025-04-01'").fetchone()[0]
+        expected = sum(len(rosters[i % len(rosters)]) for i in range(self.LECTURERS)) * self.SAVES
+        self.assertEqual(saved, expected)
+
+    def test_locked_writes_are_retried_outside_transactions_only(self):
+        calls = []
+
+        @retry_on_locked
+        def write(fail_times):
+            calls.append(1)
+            if len(calls) <= fail_times:
+                raise OperationalError('database is locked')
+            return 'saved'
+
+        with override_settings(SQLITE_RETRY_DELAY=0), self.assertLogs('core.sqlite', 'WARNING'):
+            self.assertEqual(write(2), 'saved')
+            self.assertEqual(len(calls), 3)
+
+            calls.clear()
+            with self.assertRaises(OperationalError):
+                write(10)
+            self.assertEqual(len(calls), 4)
+
+            calls.clear()
+            with self.assertRaises(OperationalError), transaction.atomic():
+                write(1)
+            self.assertEqual(len(calls), 1)
@@ -0,0 +1,136 @@
+# core/thumbnails.py
+import io
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.html import format_html
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Square edge lengths, in pixels, every profile picture is resized to
+THUMBNAIL_SIZES = (48, 128, 512)
+# extension -> (Pillow format, save options); WebP for browsers that take it, JPEG for the rest
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DERIVED_DIR = 'derived'
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'THUMBNAIL_WORKERS', 2),
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+def derivative_name(name, size, extension):
+    """
+    profile_pics/me.png -> profile_pics/derived/me.png-48.webp. The source extension
+    stays in the name: me.png and me.jpg are different uploads and need different
+    derivatives.
+    """
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, DERIVED_DIR, f"{filename}-{size}.{extension}")
+
+
+def pick_sizes(pixels):
+    """
+    The derivative sizes for an image shown `pixels` wide: the smallest that covers
+    it at 1x and at 2x density (the largest size when none does).
+    """
+    def covering(target):
+        return next((size for size in THUMBNAIL_SIZES if size >= target), THUMBNAIL_SIZES[-1])
+    return covering(pixels), covering(pixels * 2)
+
+
+def _flatten(image):
+    # JPEG has no alpha channel: put transparent pictures on white
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate_derivatives(name, storage=default_storage):
+    """
+    Write every size and format of the picture stored at `name`, cropped square around
+    the centre and turned upright from its EXIF orientation. Existing derivatives are
+    replaced. Returns the names written.
+    """
+    with storage.open(name, 'rb') as fh:
+        with Image.open(fh) as source:
+            source = _flatten(ImageOps.exif_transpose(source))
+
+    written = []
+    for size in THUMBNAIL_SIZES:
+        resized = ImageOps.fit(source, (size, size), Image.Resampling.LANCZOS)
+        for extension, (image_format, options) in THUMBNAIL_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, image_format, **options)
+            target = derivative_name(name, size, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            written.append(storage.save(target, ContentFile(buffer.getvalue())))
+    return written
+
+
+def _generate_in_thread(name):
+    try:
+        generate_derivatives(name)
+    except Exception:
+        # A broken upload keeps its original; the template tag falls back to it
+        logger.exception("Could not generate thumbnails for %s", name)
+
+
+def schedule_derivatives(name):
+    """Generate the picture's derivatives on the worker pool once the saving transaction commits."""
+    if name:
+        transaction.on_commit(lambda: _get_executor().submit(_generate_in_thread, name))
+
+
+# ---------- Rendering ----------
+
+def thumbnail_html(image, pixels, css_class='', alt=''):
+    """
+    A <picture> for an ImageField file shown `pixels` CSS pixels wide: WebP with a JPEG
+    fallback, each with 1x and 2x candidates. Until the derivatives exist (they're
+    written in the background after the upload) it's a plain <img> of the original.
+    """
+    if not image:
+        return ''
+    storage, name = image.storage, image.name
+    # The largest JPEG is written last, so once it's there they all are
+    if not storage.exists(derivative_name(name, THUMBNAIL_SIZES[-1], 'jpg')):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy">',
+            image.url, alt, css_class, pixels, pixels,
+        )
+    one_x, two_x = pick_sizes(pixels)
+
+    def srcset(extension):
+        candidates = [f"{storage.url(derivative_name(name, one_x, extension))} 1x"]
+        if two_x != one_x:
+            candidates.append(f"{storage.url(derivative_name(name, two_x, extension))} 2x")
+        return ', '.join(candidates)
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        srcset('webp'), storage.url(derivative_name(name, one_x, 'jpg')), srcset('jpg'),
+        alt, css_class, pixels, pixels,
+    )
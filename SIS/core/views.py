@@ -1,3 +1,16 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.views.static import serve
 
-# Create your views here.
+
+def derived_media(request, path):
+    """
+    Serve a profile picture derivative (core.thumbnails) with a long-lived, immutable
+    Cache-Control. Every upload gets its own file name, and so its own derivative
+    names, so a derivative URL never changes content.
+
+    Development only (routed under DEBUG, like the rest of MEDIA_URL): in production
+    the web server serves media and sets this header itself, see SIS.settings_production.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response['Cache-Control'] = f"public, max-age={getattr(settings, 'THUMBNAIL_CACHE_SECONDS', 31536000)}, immutable"
+    return response
@@ -1,3 +1,196 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from core.attendance import bulk_save_attendance
+from core.counters import reconcile_counters
+from core.fragments import data_versions, user_scope
+from core.models import ClassGroup, Course, Department, Enrollment, Grade, Lecturer, Student, Subject
+from .views import _admin_dashboard_context, _lecturer_dashboard_context, student_dashboard_context
+
+
+class LecturerDashboardContextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Computing")
+        user = CustomUser.objects.create(
+            email="lecturer@example.com",
+            identity_card_number="IC-LECT",
+            full_name="Lecturer One",
+            role=CustomUser.Role.LECTURER,
+        )
+        cls.lecturer = Lecturer.objects.get(user=user)
+        cls.class_groups = []
+        for code in ("CS", "IT"):
+            course = Course.objects.create(name=code, code=code, department=cls.department)
+            subject = Subject.objects.create(course=course, name=f"{code} Basics", code=f"{code}101")
+            class_group = ClassGroup.objects.create(name=f"{code}-A", department=cls.department, course=course)
+            class_group.lecturers.add(cls.lecturer)
+            cls.class_groups.append((class_group, subject))
+
+    def enroll(self, per_class, offset=0):
+        for class_group, subject in self.class_groups:
+            marks = {}
+            for i in range(offset, offset + per_class):
+                user = CustomUser.objects.create(
+                    email=f"{class_group.name}-{i}@example.com",
+                    identity_card_number=f"IC-{class_group.name}-{i}",
+                    full_name=f"Student {i}",
+                    role=CustomUser.Role.STUDENT,
+                )
+                enrollment = Enrollment.objects.create(
+                    student=Student.objects.get(user=user), subject=subject, class_group=class_group
+                )
+                marks[enrollment.id] = ('present' if i % 2 else 'absent', '')
+            bulk_save_attendance(marks, date.today(), 'morning')
+
+    def test_query_count_is_independent_of_roster_size(self):
+        self.enroll(2)
+        with self.assertNumQueries(3):
+            small = _lecturer_dashboard_context(self.lecturer)
+        self.enroll(30, offset=100)
+        with self.assertNumQueries(3):
+            large = _lecturer_dashboard_context(self.lecturer)
+
+        self.assertEqual(small['total_students'], 4)
+        self.assertEqual(large['total_students'], 64)
+        self.assertEqual(large['todays_attendance_count'], 64)
+        self.assertEqual([len(item['students_info']) for item in large['courses_data']], [32, 32])
+        self.assertEqual(large['average_attendance'], 50)
+
+
+class StudentDashboardContextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Computing")
+        cls.course = Course.objects.create(name="Computer Science", code="CS", department=department)
+        cls.class_group = ClassGroup.objects.create(name="CS-A", department=department, course=cls.course)
+        user = CustomUser.objects.create(
+            email="student@example.com",
+            identity_card_number="IC-STUD",
+            full_name="Student One",
+            role=CustomUser.Role.STUDENT,
+        )
+        cls.student = Student.objects.get(user=user)
+
+    def enroll(self, count, offset=0):
+        for i in range(offset, offset + count):
+            subject = Subject.objects.create(course=self.course, name=f"Subject {i:02}", code=f"S{i}")
+            enrollment = Enrollment.objects.create(student=self.student, subject=subject, class_group=self.class_group)
+            Grade.objects.create(enrollment=enrollment, subject_name=subject.name, grade="A")
+            bulk_save_attendance({enrollment.id: ('present', '')}, date.today(), 'morning')
+
+    def test_query_count_is_independent_of_subject_count(self):
+        self.enroll(2)
+        with self.assertNumQueries(3):
+            small = student_dashboard_context(self.student)
+        self.enroll(10, offset=2)
+        with self.assertNumQueries(3):
+            large = student_dashboard_context(self.student)
+
+        self.assertEqual(len(small['courses_data']), 2)
+        self.assertEqual(len(large['courses_data']), 12)
+        self.assertTrue(all(len(item['grades']) == 1 for item in large['courses_data']))
+        self.assertTrue(all(item['attendance_percentage'] == 100 for item in large['courses_data']))
+
+
+class AdminDashboardContextTests(TestCase):
+    def make_user(self, i, role):
+        return CustomUser.objects.create(
+            email=f"user{i}@example.com", identity_card_number=f"IC-{i}", full_name=f"User {i}", role=role
+        )
+
+    def test_counters_follow_signals_without_counting(self):
+        department = Department.objects.create(name="Computing")
+        self.make_user(1, CustomUser.Role.ADMIN)
+        reconcile_counters()
+
+        student = self.make_user(2, CustomUser.Role.STUDENT)
+        self.make_user(3, CustomUser.Role.STUDENT)
+        self.make_user(4, CustomUser.Role.LECTURER)
+        Course.objects.create(name="CS", code="CS", department=department)
+
+        student.role = CustomUser.Role.LECTURER
+        student.save()
+        CustomUser.objects.get(email="user3@example.com").delete()
+
+        with self.assertNumQueries(1):
+            context = _admin_dashboard_context()
+        self.assertEqual(context, {
+            'total_lecturers': 2,
+            'total_students': 0,
+            'total_courses': 1,
+            'total_users': 3,
+        })
+        self.assertEqual(reconcile_counters()['users:LECTURER'], 2)
+
+    def test_missing_counters_are_reconciled_on_first_read(self):
+        self.make_user(1, CustomUser.Role.STUDENT)
+        self.assertEqual(_admin_dashboard_context()['total_students'], 1)
+        self.make_user(2, CustomUser.Role.STUDENT)
+        self.assertEqual(_admin_dashboard_context()['total_students'], 2)
+
+
+class DashboardFragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Computing")
+        course = Course.objects.create(name="Computer Science", code="CS", department=department)
+        cls.subject = Subject.objects.create(course=course, name="Algorithms", code="CS201")
+        class_group = ClassGroup.objects.create(name="CS-A", department=department, course=course)
+        cls.lecturer_user = CustomUser.objects.create(
+            email="lecturer@example.com", identity_card_number="IC-LECT", full_name="Lecturer One",
+            role=CustomUser.Role.LECTURER,
+        )
+        class_group.lecturers.add(Lecturer.objects.get(user=cls.lecturer_user))
+        cls.student_user = CustomUser.objects.create(
+            email="student@example.com", identity_card_number="IC-STUD", full_name="Student One",
+            role=CustomUser.Role.STUDENT,
+        )
+        cls.enrollment = Enrollment.objects.create(
+            student=Student.objects.get(user=cls.student_user), subject=cls.subject, class_group=class_group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def fragment(self, user):
+        self.client.force_login(user)
+        return self.client.get(reverse('dashboard:main_dashboard')).context['dashboard_fragment']
+
+    def test_unchanged_dashboard_is_served_without_touching_core_tables(self):
+        first = self.fragment(self.student_user)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(reverse('dashboard:main_dashboard')).context['dashboard_fragment']
+        self.assertEqual(second, first)
+        self.assertFalse([query['sql'] for query in queries if 'core_' in query['sql']])
+
+    def test_grade_bumps_the_students_version(self):
+        self.assertNotIn("B+", self.fragment(self.student_user))
+        with self.captureOnCommitCallbacks(execute=True):
+            Grade.objects.create(enrollment=self.enrollment, subject_name=self.subject.name, grade="B+")
+        self.assertIn("B+", self.fragment(self.student_user))
+
+    def test_student_profile_edit_bumps_the_lecturers_version(self):
+        before = data_versions(user_scope(self.lecturer_user.pk))
+        student = CustomUser.objects.get(pk=self.student_user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            student.save(update_fields=['last_login'])
+        self.assertEqual(data_versions(user_scope(self.lecturer_user.pk)), before)
+        with self.captureOnCommitCallbacks(execute=True):
+            student.full_name = "Student Renamed"
+            student.save()
+        self.assertNotEqual(data_versions(user_scope(self.lecturer_user.pk)), before)
 
-# Create your tests here.
+    def test_attendance_bumps_the_lecturers_version(self):
+        before = self.fragment(self.lecturer_user)
+        self.assertEqual(self.fragment(self.lecturer_user), before)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_save_attendance({self.enrollment.id: ('present', '')}, date.today(), 'morning')
+        self.assertNotEqual(self.fragment(self.lecturer_user), before)
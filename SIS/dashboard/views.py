@@ -1,120 +1,165 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
 from django.contrib import messages
 from accounts.models import CustomUser
-from core.models import Course, Lecturer, Student, Enrollment, Attendance, Grade, DisciplinaryAction
-from notifications.models import Notification
-from django.utils import timezone
+from core import counters, fragments
+from core.activity import touch_student_activity
+from core.query_budget import query_budget
+from core.models import Course, Lecturer, Student, Enrollment, Attendance, DisciplinaryAction
 from datetime import date
 
+# ========== Dashboard Context Builders ==========
+
+def _admin_dashboard_context():
+    """
+    Institution totals from the cached counters (one indexed read, no COUNT(*) scans).
+    """
+    totals = counters.get_counters(
+        counters.role_counter(CustomUser.Role.LECTURER),
+        counters.role_counter(CustomUser.Role.STUDENT),
+        counters.COURSES,
+        counters.USERS,
+    )
+    return {
+        'total_lecturers': totals[counters.role_counter(CustomUser.Role.LECTURER)],
+        'total_students': totals[counters.role_counter(CustomUser.Role.STUDENT)],
+        'total_courses': totals[counters.COURSES],
+        'total_users': totals[counters.USERS],
+    }
+
+def _lecturer_dashboard_context(lecturer):
+    """
+    Lecturer dashboard data from a fixed number of queries: courses, one roster
+    query for every class group the lecturer teaches (percentages come from the
+    AttendanceSummary rollup) and today's attendance. The unread notification
+    badge comes from the notifications context processor.
+    """
+    courses = list(Course.objects.filter(classgroups__lecturers=lecturer).distinct().order_by('name'))
+    roster = (
+        Enrollment.objects.filter(class_group__lecturers=lecturer)
+        .select_related('student__user', 'class_group', 'attendance_summary')
+        .order_by('student__user__full_name', 'id')
+    )
+
+    students_by_course = {course.id: [] for course in courses}
+    attendance_values = []
+    for enrollment in roster:
+        attendance_percentage = enrollment.attendance_percentage
+        students_by_course[enrollment.class_group.course_id].append({
+            'student': enrollment.student,
+            'email': enrollment.student.user.email,
+            'full_name': enrollment.student.user.get_full_name(),
+            'date_enrolled': enrollment.date_enrolled,
+            'attendance_percentage': attendance_percentage,
+            'enrollment': enrollment,
+        })
+        attendance_values.append(attendance_percentage)
+
+    courses_data = [
+        {'course': course, 'students_info': students_by_course[course.id]}
+        for course in courses
+    ]
+    todays_attendance_count = Attendance.objects.filter(
+        enrollment__class_group__lecturers=lecturer,
+        date=date.today()
+    ).values('enrollment__student').distinct().count()
+
+    return {
+        'courses_data': courses_data,
+        'total_students': len(attendance_values),
+        'average_attendance': round(sum(attendance_values) / len(attendance_values), 2) if attendance_values else 0,
+        'todays_attendance_count': todays_attendance_count,
+    }
+
+def student_dashboard_context(student):
+    """
+    Student dashboard data: one enrollment query (subject, course and attendance
+    rollup joined in), one prefetched grade query and the disciplinary actions.
+    Shared with student.views.student_dashboard.
+    """
+    if student is None:
+        return {'courses_data': [], 'disciplinary_actions': []}
+
+    enrollments = (
+        Enrollment.objects.filter(student=student)
+        .select_related('subject__course', 'attendance_summary')
+        .prefetch_related('grade_set')
+        .order_by('subject__name', 'id')
+    )
+    courses_data = [
+        {
+            'course': enrollment.subject.course,
+            'subject': enrollment.subject,
+            'grades': list(enrollment.grade_set.all()),
+            'attendance_percentage': enrollment.attendance_percentage,
+        }
+        for enrollment in enrollments
+    ]
+    return {
+        'courses_data': courses_data,
+        'disciplinary_actions': list(DisciplinaryAction.objects.filter(student=student).order_by('-date')),
+    }
+
 # ========== Unified Dashboard ==========
 
-@login_required
-def unified_dashboard(request):
+DASHBOARD_PARTIALS = {
+    CustomUser.Role.ADMIN: "dashboard/partials/admin_part/admin_dashboard_content.html",
+    CustomUser.Role.LECTURER: "dashboard/partials/lecturer_part/lecturer_dashboard_content.html",
+    CustomUser.Role.STUDENT: "dashboard/partials/student_part/student_dashboard_content.html",
+}
+
+def _render_dashboard_fragment(request):
+    """
+    Build the role's context and render its partial; None when a lecturer has no
+    Lecturer profile to show.
+    """
     user = request.user
-    context = {}
-    
     if user.role == CustomUser.Role.ADMIN:
-        # Admin dashboard stats
-        context.update({
-            'total_lecturers': CustomUser.objects.filter(role=CustomUser.Role.LECTURER).count(),
-            'total_students': CustomUser.objects.filter(role=CustomUser.Role.STUDENT).count(),
-            'total_courses': Course.objects.count(),
-            'total_users': CustomUser.objects.count(),
-        })
+        context = _admin_dashboard_context()
     elif user.role == CustomUser.Role.LECTURER:
-        # Lecturer dashboard context
-        try:
-            lecturer = Lecturer.objects.get(user=user)
-        except Lecturer.DoesNotExist:
-            return redirect('accounts:login')  # Or show an error page
-        
-        courses = Course.objects.filter(lecturers=lecturer)
-        courses_data = []
-        attendance_values = []
-        total_students = 0
-        today = date.today()
-        todays_attendance_count = Attendance.objects.filter(
-            enrollment__course__in=courses,
-            date=today
-        ).values('enrollment__student').distinct().count()
-
-        for course in courses:
-            enrollments = Enrollment.objects.filter(course=course).select_related('student__user')
-            students_info = []
-            for enrollment in enrollments:
-                attendance_records = Attendance.objects.filter(enrollment=enrollment)
-                total_attendance = attendance_records.count()
-                present_attendance = attendance_records.filter(status='present').count()
-                attendance_percentage = (present_attendance / total_attendance * 100) if total_attendance > 0 else 0
-                students_info.append({
-                    'student': enrollment.student,
-                    'email': enrollment.student.user.email,
-                    'full_name': enrollment.student.user.get_full_name(),
-                    'date_enrolled': enrollment.date_enrolled,
-                    'attendance_percentage': round(attendance_percentage, 2),
-                    'enrollment': enrollment,
-                })
-                attendance_values.append(attendance_percentage)
-            total_students += len(students_info)
-            courses_data.append({
-                'course': course,
-                'students_info': students_info,
-            })
-
-        average_attendance = round(sum(attendance_values) / len(attendance_values), 2) if attendance_values else 0
-        notifications = Notification.objects.filter(lecturer=user, is_read=False)
-        notifications_unread_count = notifications.count()
-
-        context.update({
-            'courses_data': courses_data,
-            'notifications': notifications,
-            'notifications_unread_count': notifications_unread_count,
-            'total_students': total_students,
-            'average_attendance': average_attendance,
-            'todays_attendance_count': todays_attendance_count,
-        })
-    elif user.role == CustomUser.Role.STUDENT:
-        # Student dashboard context
-        try:
-            student = Student.objects.get(user=user)
-            student.latest_activity = timezone.now()
-            student.save(update_fields=['latest_activity'])
-        except Student.DoesNotExist:
-            student = None
-
-        enrollments = Enrollment.objects.filter(student__user=user).select_related('course')
-        courses_data = []
-
-        for enrollment in enrollments:
-            course = enrollment.course
-            grades = Grade.objects.filter(enrollment=enrollment)
-            attendance_records = Attendance.objects.filter(enrollment=enrollment)
-            total_attendance = attendance_records.count()
-            present_attendance = attendance_records.filter(status='present').count()
-            attendance_percentage = (present_attendance / total_attendance * 100) if total_attendance > 0 else 0
-
-            courses_data.append({
-                'course': course,
-                'grades': grades,
-                'attendance_percentage': round(attendance_percentage, 2),
-            })
-
-        # Get disciplinary actions for the student
-        if student:
-            disciplinary_actions = DisciplinaryAction.objects.filter(student=student).order_by('-date')
-        else:
-            disciplinary_actions = []
-
-        context.update({
-            'courses_data': courses_data,
-            'disciplinary_actions': disciplinary_actions,
-        })
-
+        lecturer = Lecturer.objects.filter(user=user).first()
+        if lecturer is None:
+            return None
+        context = _lecturer_dashboard_context(lecturer)
     else:
+        context = student_dashboard_context(Student.objects.filter(user=user).first())
+    return render_to_string(DASHBOARD_PARTIALS[user.role], context, request)
+
+def _dashboard_fragment(request):
+    """
+    The role partial, cached per user under the data versions it depends on: the
+    user's own (profile, enrollments, attendance, grades, disciplinary actions) plus
+    the institution's counters (admins) or courses and class groups (everyone else).
+    An unchanged dashboard is served without a query.
+    """
+    user = request.user
+    if user.role == CustomUser.Role.ADMIN:
+        scopes, vary = [fragments.user_scope(user.pk), fragments.TOTALS], ()
+    else:
+        # The lecturer part counts today's attendance
+        scopes, vary = [fragments.user_scope(user.pk), fragments.INSTITUTION], (date.today(),)
+    return fragments.cached_fragment(
+        f"dashboard:{user.pk}", scopes, lambda: _render_dashboard_fragment(request), vary,
+    )
+
+@login_required
+@query_budget(queries=8, repeats=1)
+def unified_dashboard(request):
+    user = request.user
+    if user.role not in DASHBOARD_PARTIALS:
         return redirect('accounts:login')
+    if user.role == CustomUser.Role.STUDENT:
+        touch_student_activity(user)
+
+    dashboard_fragment = _dashboard_fragment(request)
+    if dashboard_fragment is None:
+        return redirect('accounts:login')  # Lecturer without a profile
 
-    context["profile_url_name"] = "dashboard:profile"
+    context = {
+        "dashboard_fragment": dashboard_fragment,
+        "profile_url_name": "dashboard:profile",
+    }
     return render(request, "dashboard/dashboard.html", context)
 
 # ========== Unified Profile View ==========
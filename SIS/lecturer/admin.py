@@ -1,3 +1,11 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import AttendanceExportJob
+
+
+@admin.register(AttendanceExportJob)
+class AttendanceExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'requested_by', 'start_date', 'end_date', 'status', 'rows_written', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    filter_horizontal = ('courses',)
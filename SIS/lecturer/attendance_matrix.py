@@ -0,0 +1,95 @@
+# lecturer/attendance_matrix.py
+from core.models import Attendance
+
+SESSIONS = ('morning', 'evening')
+NOT_MARKED = 'not marked'
+
+# One byte per (enrollment, day, session) cell; 0 means nothing was recorded.
+STATUS_CODES = {status: code for code, (status, _label) in enumerate(Attendance.STATUS_CHOICES, start=1)}
+CODE_STATUSES = [NOT_MARKED] + [status for status, _label in Attendance.STATUS_CHOICES]
+CODE_LETTERS = '-' + ''.join(status[0].upper() for status, _label in Attendance.STATUS_CHOICES)
+
+
+class AttendanceMatrix:
+    """
+    Attendance statuses for a roster over a range of days, stored as a flat bytearray
+    indexed by (enrollment, day, session) instead of a dict per student per day.
+    """
+
+    def __init__(self, enrollments, days):
+        self.enrollments = list(enrollments)
+        self.days = list(days)
+        self.stride = len(self.days) * len(SESSIONS)
+        self.cells = bytearray(len(self.enrollments) * self.stride)
+        self._rows = {enrollment.id: i for i, enrollment in enumerate(self.enrollments)}
+        self._days = {day: i for i, day in enumerate(self.days)}
+
+    @classmethod
+    def for_enrollments(cls, enrollments, days):
+        """Build the matrix and fill it from a single attendance query over the period."""
+        matrix = cls(enrollments, days)
+        if matrix.enrollments and matrix.days:
+            matrix.fill(
+                Attendance.objects.filter(
+                    enrollment_id__in=list(matrix._rows),
+                    date__range=(matrix.days[0], matrix.days[-1]),
+                ).values_list('enrollment_id', 'date', 'session', 'status')
+            )
+        return matrix
+
+    def _offset(self, enrollment_id, day, session):
+        return self._rows[enrollment_id] * self.stride + self._days[day] * len(SESSIONS) + SESSIONS.index(session)
+
+    def fill(self, records):
+        """Load (enrollment_id, date, session, status) tuples, skipping anything outside the matrix."""
+        for enrollment_id, day, session, status in records:
+            if enrollment_id in self._rows and day in self._days and session in SESSIONS:
+                self.cells[self._offset(enrollment_id, day, session)] = STATUS_CODES.get(status, 0)
+
+    def get(self, enrollment_id, day, session):
+        return CODE_STATUSES[self.cells[self._offset(enrollment_id, day, session)]]
+
+    def __len__(self):
+        return len(self.enrollments)
+
+    def row_statuses(self, index):
+        """Decode one row into {'date', 'morning', 'evening'} dicts, one day at a time."""
+        cells = self.cells
+        offset = index * self.stride
+        for day in self.days:
+            yield {'date': day, 'morning': CODE_STATUSES[cells[offset]], 'evening': CODE_STATUSES[cells[offset + 1]]}
+            offset += 2
+
+    def row_codes(self, index):
+        """One letter per cell of the row, see CODE_LETTERS."""
+        start = index * self.stride
+        return ''.join(CODE_LETTERS[code] for code in self.cells[start:start + self.stride])
+
+    def __iter__(self):
+        # Rows are plain dicts (the fastest template lookup) built on demand, so only
+        # the row being rendered is ever decoded.
+        for index, enrollment in enumerate(self.enrollments):
+            yield {
+                'enrollment': enrollment,
+                'student': enrollment.student,
+                'statuses': self.row_statuses(index),
+            }
+
+    def as_json(self):
+        """
+        Compact JSON payload: each row carries one letter per (day, session) cell,
+        in day order with morning before evening.
+        """
+        return {
+            'days': [day.isoformat() for day in self.days],
+            'sessions': list(SESSIONS),
+            'legend': dict(zip(CODE_LETTERS, CODE_STATUSES)),
+            'rows': [
+                {
+                    'enrollment': enrollment.id,
+                    'student': enrollment.student.user.get_full_name(),
+                    'codes': self.row_codes(index),
+                }
+                for index, enrollment in enumerate(self.enrollments)
+            ],
+        }
@@ -0,0 +1,126 @@
+# lecturer/export_jobs.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.csv_export import EXPORT_CHUNK_SIZE, iter_csv
+from core.models import Attendance
+from core.storage import private_storage, random_name
+from .models import AttendanceExportJob
+
+EXPORT_HEADER = ['Date', 'Session', 'Course', 'Subject', 'Class', 'Student Name', 'Email', 'Status', 'Remarks']
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ATTENDANCE_EXPORT_WORKERS', 2),
+            thread_name_prefix='attendance-export',
+        )
+    return _executor
+
+
+def enqueue_export_job(job):
+    """
+    Hand the job to the in-process worker pool once the creating transaction commits.
+    With ATTENDANCE_EXPORT_IN_PROCESS = False jobs stay pending for
+    `manage.py process_export_jobs` to pick up in a separate worker process.
+    """
+    if getattr(settings, 'ATTENDANCE_EXPORT_IN_PROCESS', True):
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.pk))
+
+
+def _run_in_thread(job_id):
+    try:
+        run_export_job(job_id)
+    finally:
+        # Worker threads get their own connection; don't leave it open between jobs
+        connection.close()
+
+
+def _export_rows(job):
+    records = (
+        Attendance.objects.filter(
+            enrollment__class_group__course__in=job.courses.all(),
+            date__range=(job.start_date, job.end_date),
+        )
+        .order_by('date', 'session', 'enrollment__class_group__course__code', 'enrollment__student__user__full_name')
+        .values_list(
+            'date', 'session',
+            'enrollment__class_group__course__code', 'enrollment__subject__code', 'enrollment__class_group__name',
+            'enrollment__student__user__full_name', 'enrollment__student__user__email',
+            'status', 'description',
+        )
+    )
+    for day, session, course, subject, class_group, name, email, status, remarks in records.iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+        yield [day.isoformat(), session.capitalize(), course, subject, class_group, name, email,
+               status.capitalize(), remarks or '']
+
+
+def run_export_job(job_id):
+    """
+    Build the export for a pending job, writing the CSV chunk by chunk to a randomly named
+    file in private storage (only export_job_download serves it). Returns the job, or None
+    when another worker already claimed it.
+    """
+    claimed = AttendanceExportJob.objects.filter(
+        pk=job_id, status=AttendanceExportJob.Status.PENDING
+    ).update(status=AttendanceExportJob.Status.RUNNING, started_at=timezone.now())
+    if not claimed:
+        return None
+
+    job = AttendanceExportJob.objects.get(pk=job_id)
+    name = random_name('exports', 'csv')
+    path = private_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    rows_written = 0
+
+    def counted(rows):
+        nonlocal rows_written
+        for row in rows:
+            rows_written += 1
+            yield row
+
+    try:
+        with open(path, 'w', newline='', encoding='utf-8') as fh:
+            for chunk in iter_csv(EXPORT_HEADER, counted(_export_rows(job))):
+                fh.write(chunk)
+    except Exception as exc:
+        job.status = AttendanceExportJob.Status.FAILED
+        job.error = str(exc)
+    else:
+        job.status = AttendanceExportJob.Status.DONE
+        job.file.name = name
+    job.rows_written = rows_written
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'file', 'rows_written', 'finished_at'])
+    return job
+
+
+def download_name(job):
+    """The file name a finished export is downloaded under."""
+    return f"attendance_{job.start_date:%Y%m%d}_{job.end_date:%Y%m%d}.csv"
+
+
+def expire_export_jobs(days=None, now=None):
+    """
+    Delete jobs that finished more than `days` (default ATTENDANCE_EXPORT_RETENTION_DAYS)
+    ago, with their files. Returns the number of jobs deleted.
+    """
+    days = getattr(settings, 'ATTENDANCE_EXPORT_RETENTION_DAYS', 7) if days is None else days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    expired = AttendanceExportJob.objects.filter(finished_at__lt=cutoff)
+    for name in expired.exclude(file='').values_list('file', flat=True):
+        private_storage.delete(name)
+    _, deleted = expired.delete()
+    return deleted.get(AttendanceExportJob._meta.label, 0)
@@ -1,6 +1,6 @@
 from django import forms
 from accounts.models import CustomUser
-from core.models import Course, Student, Enrollment  # Import Enrollment for forms below
+from core.models import Course, Department, Student, Enrollment  # Import Enrollment for forms below
 
 class LecturerLoginForm(forms.Form):
     email = forms.EmailField(
@@ -179,3 +179,44 @@ class AttendanceHistoryFilterForm(forms.Form):
         super().__init__(*args, **kwargs)
         if courses is not None:
             self.fields['course'].queryset = courses
+
+class AttendanceExportJobForm(forms.Form):
+    courses = forms.ModelMultipleChoiceField(
+        queryset=Course.objects.none(), required=False, label="Courses",
+        widget=forms.SelectMultiple(attrs={'class': 'text-white bg-gray-800 rounded p-2'})
+    )
+    department = forms.ModelChoiceField(
+        queryset=Department.objects.all(), required=False, label="Whole department",
+        help_text="Adds every course you teach in this department.",
+        widget=forms.Select(attrs={'class': 'text-white bg-gray-800 rounded p-2'})
+    )
+    start_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'text-white bg-gray-800 rounded p-2'}),
+        label="From"
+    )
+    end_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'text-white bg-gray-800 rounded p-2'}),
+        label="To"
+    )
+
+    def __init__(self, *args, **kwargs):
+        courses = kwargs.pop('courses', None)
+        super().__init__(*args, **kwargs)
+        if courses is not None:
+            self.fields['courses'].queryset = courses
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise forms.ValidationError("The start date must be on or before the end date.")
+
+        selected = set(cleaned_data.get('courses') or [])
+        department = cleaned_data.get('department')
+        if department:
+            selected.update(self.fields['courses'].queryset.filter(department=department))
+        if not selected:
+            raise forms.ValidationError("Pick at least one course or a department you teach in.")
+        cleaned_data['selected_courses'] = sorted(selected, key=lambda course: course.code)
+        return cleaned_data
@@ -0,0 +1,93 @@
+import random
+import time
+import tracemalloc
+from datetime import date
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from lecturer.attendance_matrix import SESSIONS, AttendanceMatrix
+from lecturer.views import _period_days
+
+
+def _legacy_attendance_list(enrollments, days_range, records):
+    """The dict-per-student-per-day structure attendance_history used to build."""
+    attendance_map = {}
+    for enrollment_id, day, session, status in records:
+        attendance_map[(enrollment_id, day, session)] = status
+
+    attendance_list = []
+    for enrollment in enrollments:
+        status_by_day = []
+        for day in days_range:
+            morning_status = attendance_map.get((enrollment.id, day, "morning"), "not marked")
+            evening_status = attendance_map.get((enrollment.id, day, "evening"), "not marked")
+            status_by_day.append({'date': day, 'morning': morning_status, 'evening': evening_status})
+        attendance_list.append({
+            'student': enrollment.student,
+            'statuses': status_by_day,
+        })
+    return attendance_list
+
+
+def _matrix_attendance_list(enrollments, days_range, records):
+    matrix = AttendanceMatrix(enrollments, days_range)
+    matrix.fill(records)
+    return matrix
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare memory and render time of the attendance_history month view for the "
+        "legacy dict structure and AttendanceMatrix, on synthetic in-memory data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=300)
+        parser.add_argument('--period', choices=['day', 'week', 'month'], default='month')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        days_range = _period_days(date(2025, 3, 15), options['period'])
+        enrollments = [
+            SimpleNamespace(
+                id=i,
+                student=SimpleNamespace(user=SimpleNamespace(get_full_name=f"Student {i:05}")),
+            )
+            for i in range(1, options['students'] + 1)
+        ]
+        records = [
+            (enrollment.id, day, session, rng.choice(['present', 'present', 'present', 'absent', 'late']))
+            for enrollment in enrollments
+            for day in days_range
+            for session in SESSIONS
+            if rng.random() < 0.9
+        ]
+        template = get_template('lecturer/partials/attendance_history_table.html')
+
+        self.stdout.write(
+            f"{len(enrollments)} students x {len(days_range)} days x {len(SESSIONS)} sessions, "
+            f"{len(records)} attendance records"
+        )
+        for label, build in (('legacy dicts', _legacy_attendance_list), ('matrix', _matrix_attendance_list)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            attendance_list = build(enrollments, days_range, records)
+            build_time = time.perf_counter() - started
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            render_times = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                template.render({'attendance_list': attendance_list, 'days_range': days_range})
+                render_times.append(time.perf_counter() - started)
+
+            self.stdout.write(
+                f"{label:>13}: build {build_time * 1000:8.1f} ms, "
+                f"retained {retained / 1024:9.1f} KiB, peak {peak / 1024:9.1f} KiB, "
+                f"render {min(render_times) * 1000:8.1f} ms (best of {options['repeat']})"
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from lecturer.export_jobs import expire_export_jobs
+
+
+class Command(BaseCommand):
+    help = "Delete attendance export jobs past the retention period, with their files (run daily, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Override ATTENDANCE_EXPORT_RETENTION_DAYS.")
+
+    def handle(self, *args, **options):
+        deleted = expire_export_jobs(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} export jobs."))
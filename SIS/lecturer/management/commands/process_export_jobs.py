@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from lecturer.export_jobs import run_export_job
+from lecturer.models import AttendanceExportJob
+
+
+class Command(BaseCommand):
+    help = "Run pending attendance export jobs (use --watch to keep polling as a worker process)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help="Keep polling for new jobs.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --watch.")
+
+    def handle(self, *args, **options):
+        while True:
+            pending = AttendanceExportJob.objects.filter(
+                status=AttendanceExportJob.Status.PENDING
+            ).order_by('created_at').values_list('pk', flat=True)
+            for job_id in list(pending):
+                job = run_export_job(job_id)
+                if job is not None:
+                    self.stdout.write(f"Export job {job.pk}: {job.status}, {job.rows_written} rows")
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:47
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lecturer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendanceexportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=core.storage.PrivateStorage(), upload_to='exports/'),
+        ),
+    ]
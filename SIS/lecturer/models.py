@@ -0,0 +1,37 @@
+# lecturer/models.py
+from django.conf import settings
+from django.db import models
+
+from core.models import Course
+from core.storage import private_storage
+
+
+# ---------- Attendance Export Job ----------
+class AttendanceExportJob(models.Model):
+    """
+    A date-range, multi-course attendance export built by a background worker
+    (see lecturer.export_jobs) and downloaded once finished.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attendance_export_jobs')
+    courses = models.ManyToManyField(Course, related_name='attendance_export_jobs')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to='exports/', storage=private_storage, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Attendance export {self.start_date} to {self.end_date} [{self.status}]"
@@ -1,3 +1,239 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core.attendance import bulk_save_attendance
+from core.models import Attendance, ClassGroup, Course, Department, Enrollment, Lecturer, Student, Subject
+from .attendance_matrix import AttendanceMatrix
+from .export_jobs import expire_export_jobs, run_export_job
+from .forms import AttendanceExportJobForm
+from .models import AttendanceExportJob
+
+
+class LecturerRosterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Computing")
+        cls.course = Course.objects.create(name="Computer Science", code="CS", department=department)
+        cls.subject = Subject.objects.create(course=cls.course, name="Databases", code="DB101")
+        cls.class_group = ClassGroup.objects.create(name="CS-A", department=department, course=cls.course)
+        cls.lecturer_user = CustomUser.objects.create(
+            email="lecturer@example.com",
+            identity_card_number="IC-LECT",
+            full_name="Lecturer One",
+            role=CustomUser.Role.LECTURER,
+        )
+        cls.class_group.lecturers.add(Lecturer.objects.get(user=cls.lecturer_user))
+
+    def setUp(self):
+        self.client.force_login(self.lecturer_user)
+
+    def enroll(self, count, offset=0):
+        for i in range(offset, offset + count):
+            user = CustomUser.objects.create(
+                email=f"student{i}@example.com",
+                identity_card_number=f"IC-{i}",
+                full_name=f"Student {i}",
+                role=CustomUser.Role.STUDENT,
+            )
+            Enrollment.objects.create(
+                student=Student.objects.get(user=user), subject=self.subject, class_group=self.class_group
+            )
+
+
+class TakeAttendanceTests(LecturerRosterTestCase):
+    def post_roster(self, status):
+        data = {"date": "2025-03-03", "session": "morning", "save_attendance": "1"}
+        for enrollment_id in Enrollment.objects.values_list("id", flat=True):
+            data[f"status_{enrollment_id}"] = status
+            data[f"remarks_{enrollment_id}"] = ""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("lecturer:attendance_list"), data)
+        self.assertEqual(response.status_code, 302)
+        return len(ctx.captured_queries)
+
+    def test_save_query_count_is_constant(self):
+        self.enroll(3)
+        small = self.post_roster("present")
+        self.enroll(50, offset=100)
+        large = self.post_roster("absent")
+        self.assertEqual(small, large)
+        self.assertEqual(
+            Attendance.objects.filter(date=date(2025, 3, 3), session="morning", status="absent").count(), 53
+        )
+
+    def test_course_attendance_rejects_unknown_sessions_and_keeps_remarks(self):
+        self.enroll(1)
+        enrollment = Enrollment.objects.get()
+        bulk_save_attendance({enrollment.id: ("absent", "Sick note")}, date.today(), "morning")
+        url = reverse("lecturer:course_attendance", args=[self.course.id])
+
+        self.client.post(url, {"session": "midnight", f"status_{enrollment.id}": "present"})
+        self.assertFalse(Attendance.objects.filter(session="midnight").exists())
+        with self.assertRaises(ValueError):
+            bulk_save_attendance({enrollment.id: ("present", "")}, date.today(), "midnight")
+
+        # No remarks field posted: the status changes, the saved remarks stay
+        self.client.post(url, {"session": "morning", f"status_{enrollment.id}": "present"})
+        attendance = Attendance.objects.get(enrollment=enrollment, session="morning")
+        self.assertEqual((attendance.status, attendance.description), ("present", "Sick note"))
+
+
+class AttendanceMatrixTests(LecturerRosterTestCase):
+    def test_matrix_holds_one_byte_per_cell(self):
+        self.enroll(3)
+        enrollments = list(Enrollment.objects.select_related("student__user").order_by("id"))
+        days = [date(2025, 3, 3), date(2025, 3, 4)]
+        bulk_save_attendance({enrollments[0].id: ("present", "")}, days[0], "morning")
+        bulk_save_attendance({enrollments[2].id: ("late", "")}, days[1], "evening")
+
+        with self.assertNumQueries(1):
+            matrix = AttendanceMatrix.for_enrollments(enrollments, days)
+
+        self.assertEqual(len(matrix.cells), 3 * 2 * 2)
+        self.assertEqual(matrix.get(enrollments[0].id, days[0], "morning"), "present")
+        self.assertEqual(matrix.get(enrollments[1].id, days[0], "morning"), "not marked")
+        rows = list(matrix)
+        self.assertEqual(rows[2]["student"], enrollments[2].student)
+        self.assertEqual(
+            list(rows[2]["statuses"]),
+            [
+                {"date": days[0], "morning": "not marked", "evening": "not marked"},
+                {"date": days[1], "morning": "not marked", "evening": "late"},
+            ],
+        )
+        self.assertEqual(matrix.row_codes(0), "P---")
+
+    def test_json_endpoint(self):
+        self.enroll(2)
+        enrollment = Enrollment.objects.order_by("id").first()
+        bulk_save_attendance({enrollment.id: ("absent", "")}, date(2025, 3, 4), "evening")
+
+        response = self.client.get(
+            reverse("lecturer:attendance_history_json"),
+            {"course": self.course.id, "date": "2025-03-05", "period": "week"},
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["days"][0], "2025-03-03")
+        self.assertEqual(len(data["days"]), 7)
+        row = next(r for r in data["rows"] if r["enrollment"] == enrollment.id)
+        self.assertEqual(row["codes"], "---A" + "-" * 10)
+
+    def test_json_endpoint_only_serves_the_lecturers_courses(self):
+        other = Course.objects.create(name="Business", code="BUS", department=self.course.department)
+        response = self.client.get(reverse("lecturer:attendance_history_json"), {"course": other.id})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("lecturer:attendance_history_json"), {"course": "abc"})
+        self.assertEqual(response.status_code, 404)
+
+
+class ExportAttendanceTests(LecturerRosterTestCase):
+    def test_streams_both_sessions(self):
+        self.enroll(2)
+        enrollment = Enrollment.objects.order_by("id").first()
+        bulk_save_attendance({enrollment.id: ("present", "")}, date(2025, 3, 4), "morning")
+
+        response = self.client.get(
+            reverse("lecturer:export_attendance"), {"course": self.course.id, "date": "04-03-2025"}
+        )
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "Student Name,Email,Morning,Evening")
+        self.assertIn("Student 0,student0@example.com,Present,Not marked", lines)
+        self.assertEqual(len(lines), 3)
+
+    def test_lecturers_only(self):
+        url = reverse("lecturer:export_attendance")
+        params = {"course": self.course.id, "date": "04-03-2025"}
+        self.enroll(1)
+        self.client.logout()
+        self.assertEqual(self.client.get(url, params).status_code, 302)
+        self.client.force_login(CustomUser.objects.get(email="student0@example.com"))
+        self.assertEqual(self.client.get(url, params).status_code, 403)
+
+
+class ExportJobTests(LecturerRosterTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.private_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.private_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, PRIVATE_MEDIA_ROOT=self.private_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_queue_run_poll_and_download(self):
+        self.enroll(3)
+        marks = {e.id: ("present", "") for e in Enrollment.objects.all()}
+        bulk_save_attendance(marks, date(2025, 3, 3), "morning")
+        bulk_save_attendance(marks, date(2025, 3, 20), "evening")
+        bulk_save_attendance(marks, date(2025, 5, 1), "morning")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse("lecturer:export_jobs"), {
+                "department": self.course.department_id,
+                "start_date": "2025-03-01",
+                "end_date": "2025-03-31",
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(callbacks), 1)
+        job = AttendanceExportJob.objects.get()
+        self.assertEqual(list(job.courses.all()), [self.course])
+
+        status_url = reverse("lecturer:export_job_status", args=[job.pk])
+        self.assertEqual(self.client.get(status_url).json()["status"], "pending")
+
+        run_export_job(job.pk)
+        payload = self.client.get(status_url).json()
+        self.assertEqual(payload["status"], "done")
+        self.assertEqual(payload["rows_written"], 6)
+
+        response = self.client.get(payload["download_url"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertTrue(lines[1].startswith("2025-03-03,Morning,CS,DB101,CS-A,"))
+
+        # Randomly named, outside MEDIA_ROOT: only the view above serves it
+        job.refresh_from_db()
+        self.assertTrue(os.path.exists(os.path.join(self.private_root, job.file.name)))
+        self.assertEqual(os.listdir(self.media_root), [])
+        self.assertFalse(os.path.basename(job.file.name).startswith("attendance_"))
+        self.assertIn('filename="attendance_20250301_20250331.csv"', response["Content-Disposition"])
+
+    def test_expired_jobs_are_deleted_with_their_files(self):
+        job = AttendanceExportJob.objects.create(
+            requested_by=self.lecturer_user, start_date=date(2025, 3, 1), end_date=date(2025, 3, 31)
+        )
+        job.courses.add(self.course)
+        run_export_job(job.pk)
+        path = os.path.join(self.private_root, AttendanceExportJob.objects.get().file.name)
+
+        self.assertEqual(expire_export_jobs(days=7), 0)
+        self.assertEqual(expire_export_jobs(days=7, now=timezone.now() + timedelta(days=8)), 1)
+        self.assertFalse(AttendanceExportJob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_job_runs_only_once(self):
+        job = AttendanceExportJob.objects.create(
+            requested_by=self.lecturer_user, start_date=date(2025, 3, 1), end_date=date(2025, 3, 31)
+        )
+        job.courses.add(self.course)
+        self.assertIsNotNone(run_export_job(job.pk))
+        self.assertIsNone(run_export_job(job.pk))
+
+    def test_form_rejects_inverted_range(self):
+        form = AttendanceExportJobForm(
+            {"courses": [self.course.id], "start_date": "2025-03-31", "end_date": "2025-03-01"},
+            courses=Course.objects.all(),
+        )
+        self.assertFalse(form.is_valid())
@@ -16,6 +16,7 @@ urlpatterns = [
     path('attendance/mark/', views.mark_attendance, name='mark_attendance'),
     path('attendance/mark/<int:enrollment_id>/', views.mark_individual_attendance, name='mark_individual_attendance'),
     path('attendance/history/', views.attendance_history, name='attendance_history'),
+    path('attendance/history/json/', views.attendance_history_json, name='attendance_history_json'),
 
     # Course-specific actions
     path('courses/<int:course_id>/attendance/', views.course_attendance, name='course_attendance'),
@@ -32,4 +33,9 @@ urlpatterns = [
 
     # Export csv
     path('attendance/export/', views.export_attendance, name='export_attendance'),
+
+    # Background exports (date range, many courses)
+    path('attendance/exports/', views.export_jobs, name='export_jobs'),
+    path('attendance/exports/<int:job_id>/status/', views.export_job_status, name='export_job_status'),
+    path('attendance/exports/<int:job_id>/download/', views.export_job_download, name='export_job_download'),
 ]
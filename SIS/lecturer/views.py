@@ -1,24 +1,29 @@
-import csv
 from datetime import date, datetime, timedelta
 
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.contrib import messages
 from django.utils import timezone
 from django import forms
 from django.contrib.auth.decorators import login_required
 from django.utils.dateparse import parse_date
-from django.db.models import Q
+from django.db.models import OuterRef, Q, Subquery
 
 from core.models import (
     Lecturer, Course, Enrollment, Attendance,
     Student, StudentAchievement, DisciplinaryAction
 )
+from core.attendance import bulk_save_attendance
+from core.csv_export import EXPORT_CHUNK_SIZE, streaming_csv_response, wants_gzip
 from accounts.models import CustomUser
 from accounts.decorators import role_required
 from accounts.forms import LecturerProfileUpdateForm
 from notifications.models import Notification
-from .forms import AttendanceForm, MessageForm, AttendanceHistoryFilterForm
+from .forms import AttendanceForm, MessageForm, AttendanceHistoryFilterForm, AttendanceExportJobForm
+from .attendance_matrix import AttendanceMatrix
+from .export_jobs import download_name, enqueue_export_job
+from .models import AttendanceExportJob
 
 
 
@@ -32,7 +37,7 @@ def take_attendance(request):
     Take attendance for the lecturer's first assigned course (bulk, by date/session).
     """
     lecturer = get_object_or_404(Lecturer, user=request.user)
-    courses = Course.objects.filter(lecturers=lecturer)
+    courses = Course.objects.filter(classgroups__lecturers=lecturer).distinct()
     course = courses.first()
     if not course:
         messages.warning(request, "No course found for you.")
@@ -49,14 +54,17 @@ def take_attendance(request):
     except Exception:
         selected_date_obj = today
 
-    session_list = ["morning", "evening"]
+    session_list = [value for value, _label in Attendance.SESSION_CHOICES]
     selected_session = (
         request.POST.get("session")
         or request.GET.get("session")
         or session_list[0]
     )
+    if selected_session not in session_list:
+        messages.error(request, "Unknown attendance session.")
+        return redirect(request.path)
 
-    enrollments = Enrollment.objects.filter(course=course).select_related("student__user")
+    enrollments = Enrollment.objects.filter(class_group__course=course).select_related("student__user")
     attendance_qs = Attendance.objects.filter(
         enrollment__in=enrollments,
         date=selected_date_obj,
@@ -71,19 +79,18 @@ def take_attendance(request):
     statuses = ["present", "absent"]
 
     if request.method == "POST" and "save_attendance" in request.POST:
-        updated = 0
+        marks = {}
         for enrollment in enrollments:
             status = request.POST.get(f"status_{enrollment.id}")
-            remarks = request.POST.get(f"remarks_{enrollment.id}", "")
+            remarks = request.POST.get(f"remarks_{enrollment.id}")  # None keeps saved remarks
             if status in statuses:
-                Attendance.objects.update_or_create(
-                    enrollment=enrollment,
-                    date=selected_date_obj,
-                    session=selected_session,
-                    defaults={"status": status, "description": remarks},
-                )
-                updated += 1
-        messages.success(request, f"Attendance saved for {updated} students ({selected_session.capitalize()} session).")
+                marks[enrollment.id] = (status, remarks)
+        result = bulk_save_attendance(marks, selected_date_obj, selected_session)
+        messages.success(
+            request,
+            f"Attendance saved for {len(marks)} students ({selected_session.capitalize()} session): "
+            f"{result.inserted} new, {result.updated} updated, {result.unchanged} unchanged."
+        )
         return redirect(f"{request.path}?date={selected_date_obj}&session={selected_session}")
 
     context = {
@@ -116,7 +123,7 @@ def mark_attendance(request):
             messages.success(request, f"Attendance updated for {enrollment.student.user.get_full_name()} on {date_value}.")
         else:
             messages.error(request, "Please correct the errors in the attendance form.")
-    return redirect('lecturer:dashboard')
+    return redirect('dashboard:main_dashboard')
 
 @role_required(CustomUser.Role.LECTURER)
 def mark_individual_attendance(request, enrollment_id):
@@ -149,85 +156,81 @@ def mark_individual_attendance(request, enrollment_id):
 # ATTENDANCE HISTORY (PAST ATTENDANCE VIEWS)
 # ==============================================================
 
-@role_required(CustomUser.Role.LECTURER)
-def attendance_history(request):
+def _period_days(selected_date, period):
     """
-    View attendance records for a selected course and period.
-    Shows both 'morning' and 'evening' attendance for each student, for each day in the period.
+    Days covered by the 'day', 'week' or 'month' period around selected_date.
     """
-    lecturer = get_object_or_404(Lecturer, user=request.user)
-    courses = Course.objects.filter(lecturers=lecturer)
-
-    session_list = ["morning", "evening"]
-    period_list = ["day", "week", "month"]
+    if period == "week":
+        week_start = selected_date - timedelta(days=selected_date.weekday())
+        return [week_start + timedelta(days=i) for i in range(7)]
+    if period == "month":
+        month_start = selected_date.replace(day=1)
+        if selected_date.month == 12:
+            next_month = selected_date.replace(year=selected_date.year + 1, month=1, day=1)
+        else:
+            next_month = selected_date.replace(month=selected_date.month + 1, day=1)
+        return [month_start + timedelta(days=i) for i in range((next_month - month_start).days)]
+    return [selected_date]
 
+def _attendance_history_matrix(request, courses):
+    """
+    Resolve the course/date/period filters and load the attendance matrix for them.
+    Returns (selected_course, selected_date, selected_period, days_range, matrix).
+    """
     course_id = request.GET.get('course')
     date_str = request.GET.get('date')
     selected_period = request.GET.get('period', 'day')
 
     if not course_id and courses.exists():
         course_id = str(courses.first().id)
-    selected_date = parse_date(date_str) if date_str else date.today()
+    selected_date = (parse_date(date_str) if date_str else None) or date.today()
     selected_course = None
-    attendance_list = None
+    matrix = None
     days_range = []
 
+    if course_id:
+        # Only the lecturer's own courses: another course's roster is not theirs to see
+        try:
+            selected_course = courses.filter(id=course_id).first()
+        except ValueError:
+            selected_course = None
+
+    if selected_course:
+        enrollments = (
+            Enrollment.objects.filter(class_group__course=selected_course)
+            .select_related('student__user')
+            .order_by('student__user__full_name', 'id')
+        )
+        days_range = _period_days(selected_date, selected_period)
+        # Every (enrollment, day, session) cell for the period, from one query
+        matrix = AttendanceMatrix.for_enrollments(enrollments, days_range)
+
+    return selected_course, selected_date, selected_period, days_range, matrix
+
+@role_required(CustomUser.Role.LECTURER)
+def attendance_history(request):
+    """
+    View attendance records for a selected course and period.
+    Shows both 'morning' and 'evening' attendance for each student, for each day in the period.
+    """
+    lecturer = get_object_or_404(Lecturer, user=request.user)
+    courses = Course.objects.filter(classgroups__lecturers=lecturer).distinct()
+
+    session_list = ["morning", "evening"]
+    period_list = ["day", "week", "month"]
+
+    selected_course, selected_date, selected_period, days_range, attendance_list = (
+        _attendance_history_matrix(request, courses)
+    )
+
     form = AttendanceHistoryFilterForm(
         initial={
-            'course': course_id or '',
+            'course': selected_course.id if selected_course else '',
             'date': selected_date,
         },
         courses=courses
     )
 
-    if course_id:
-        try:
-            selected_course = Course.objects.get(id=course_id)
-        except Course.DoesNotExist:
-            selected_course = None
-
-    if selected_course:
-        enrollments = Enrollment.objects.filter(course=selected_course).select_related('student__user')
-
-        # Calculate days in period
-        if selected_period == "day":
-            days_range = [selected_date]
-        elif selected_period == "week":
-            week_start = selected_date - timedelta(days=selected_date.weekday())
-            days_range = [week_start + timedelta(days=i) for i in range(7)]
-        elif selected_period == "month":
-            month_start = selected_date.replace(day=1)
-            if selected_date.month == 12:
-                next_month = selected_date.replace(year=selected_date.year + 1, month=1, day=1)
-            else:
-                next_month = selected_date.replace(month=selected_date.month + 1, day=1)
-            days_range = [month_start + timedelta(days=i) for i in range((next_month - month_start).days)]
-
-        # Get ALL attendance records in this range (both sessions!)
-        att_filter = {
-            "enrollment__in": enrollments,
-            "date__range": [days_range[0], days_range[-1]],
-        }
-        attendance_records = Attendance.objects.filter(**att_filter).select_related('enrollment__student__user')
-
-        # Build a mapping: (enrollment_id, date, session) -> status
-        attendance_map = {}
-        for att in attendance_records:
-            attendance_map[(att.enrollment_id, att.date, att.session)] = att.status
-
-        attendance_list = []
-        for enrollment in enrollments:
-            status_by_day = []
-            for day in days_range:
-                # Always lookup both sessions for every day
-                morning_status = attendance_map.get((enrollment.id, day, "morning"), "not marked")
-                evening_status = attendance_map.get((enrollment.id, day, "evening"), "not marked")
-                status_by_day.append({'date': day, 'morning': morning_status, 'evening': evening_status})
-            attendance_list.append({
-                'student': enrollment.student,
-                'statuses': status_by_day,
-            })
-
     context = {
         'form': form,
         'attendance_list': attendance_list,
@@ -240,6 +243,27 @@ def attendance_history(request):
     }
     return render(request, 'lecturer/attendance_history.html', context)
 
+@role_required(CustomUser.Role.LECTURER)
+def attendance_history_json(request):
+    """
+    Same filters as attendance_history, returned as a compact JSON matrix.
+    """
+    lecturer = get_object_or_404(Lecturer, user=request.user)
+    courses = Course.objects.filter(classgroups__lecturers=lecturer).distinct()
+    selected_course, selected_date, selected_period, days_range, matrix = (
+        _attendance_history_matrix(request, courses)
+    )
+    if matrix is None:
+        return JsonResponse({'error': 'Course not found.'}, status=404)
+
+    data = matrix.as_json()
+    data.update({
+        'course': selected_course.id,
+        'date': selected_date.isoformat(),
+        'period': selected_period,
+    })
+    return JsonResponse(data)
+
 
 # ==============================================================
 # COURSE-SPECIFIC ATTENDANCE AND HISTORY
@@ -250,23 +274,26 @@ def course_attendance(request, course_id):
     """
     Bulk attendance page for a specific course.
     """
-    course = get_object_or_404(Course, id=course_id, lecturers__user=request.user)
-    enrollments = Enrollment.objects.filter(course=course).select_related('student__user')
+    course = get_object_or_404(
+        Course.objects.distinct(), id=course_id, classgroups__lecturers__user=request.user
+    )
+    enrollments = Enrollment.objects.filter(class_group__course=course).select_related('student__user')
     today = date.today()
 
     if request.method == "POST":
-        updated = 0
+        session = request.POST.get('session', 'morning')
+        if session not in dict(Attendance.SESSION_CHOICES):
+            messages.error(request, "Unknown attendance session.")
+            return redirect('lecturer:course_attendance', course_id=course.id)
+        marks = {}
         for enrollment in enrollments:
             status = request.POST.get(f'status_{enrollment.id}')
             if status in ['present', 'absent']:
-                Attendance.objects.update_or_create(
-                    enrollment=enrollment,
-                    date=today,
-                    defaults={'status': status}
-                )
-                updated += 1
-        if updated:
-            messages.success(request, f"Attendance recorded for {updated} students in {course.name}.")
+                # No remarks field posted: keep whatever remarks are already saved
+                marks[enrollment.id] = (status, request.POST.get(f'remarks_{enrollment.id}'))
+        if marks:
+            bulk_save_attendance(marks, today, session)
+            messages.success(request, f"Attendance recorded for {len(marks)} students in {course.name}.")
         else:
             messages.warning(request, "No attendance was marked.")
         return redirect('lecturer:course_attendance', course_id=course.id)
@@ -362,7 +389,7 @@ def update_student_activity(request, student_id):
 @role_required(CustomUser.Role.LECTURER)
 def send_message(request):
     """
-    Send notification to a student.
+    Send notification to a single student; whole groups go through notifications:broadcast.
     """
     if request.method == 'POST':
         message_form = MessageForm(request.POST)
@@ -375,14 +402,15 @@ def send_message(request):
                 messages.error(request, "Student not found.")
             else:
                 Notification.objects.create(
-                    lecturer=request.user,
-                    message=f"Message sent to {student_user.get_full_name()}: {message_text}"
+                    lecturer=student_user,
+                    message=f"{request.user.get_full_name()}: {message_text}"
                 )
                 messages.success(request, "Message sent successfully.")
         else:
             messages.error(request, "Please correct the errors in the message form.")
-    return redirect('lecturer:dashboard')
+    return redirect('dashboard:main_dashboard')
 
+@role_required(CustomUser.Role.LECTURER)
 def export_attendance(request):
     """
     Export attendance records to CSV for a specific course and date.
@@ -395,7 +423,7 @@ def export_attendance(request):
     except Lecturer.DoesNotExist:
         return HttpResponse("Not authorized", status=403)
 
-    course = Course.objects.filter(id=course_id, lecturers=lecturer).first()
+    course = Course.objects.filter(id=course_id, classgroups__lecturers=lecturer).first()
     if not course:
         return HttpResponse("Course not found or access denied", status=404)
 
@@ -404,29 +432,95 @@ def export_attendance(request):
     except (ValueError, TypeError):
         return HttpResponse("Invalid date format. Use dd-mm-yyyy.", status=400)
 
-    enrollments = Enrollment.objects.filter(course=course).select_related('student__user')
-    attendance_records = Attendance.objects.filter(
-        enrollment__in=enrollments, date=date_obj
-    ).select_related('enrollment__student__user')
+    # One status per session, resolved in the roster query itself so rows can stream
+    day_attendance = Attendance.objects.filter(enrollment=OuterRef('pk'), date=date_obj)
+    enrollments = (
+        Enrollment.objects.filter(class_group__course=course)
+        .select_related('student__user')
+        .annotate(
+            morning_status=Subquery(day_attendance.filter(session='morning').values('status')[:1]),
+            evening_status=Subquery(day_attendance.filter(session='evening').values('status')[:1]),
+        )
+        .order_by('student__user__full_name', 'id')
+    )
+
+    def rows():
+        for enrollment in enrollments.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            student = enrollment.student.user
+            yield [
+                student.get_full_name(),
+                student.email,
+                (enrollment.morning_status or 'not marked').capitalize(),
+                (enrollment.evening_status or 'not marked').capitalize(),
+            ]
+
+    return streaming_csv_response(
+        f"attendance_{course.code}_{date_obj.strftime('%d-%m-%Y')}.csv",
+        ['Student Name', 'Email', 'Morning', 'Evening'],
+        rows(),
+        gzip=wants_gzip(request),
+    )
+
 
-    response = HttpResponse(content_type='text/csv')
-    filename = f"attendance_{course.code}_{date_obj.strftime('%d-%m-%Y')}.csv"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+# ==============================================================
+# BACKGROUND ATTENDANCE EXPORTS (DATE RANGE, MANY COURSES)
+# ==============================================================
 
-    writer = csv.writer(response)
-    writer.writerow(['Student Name', 'Email', 'Status'])
+def _export_job_payload(job):
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'start_date': job.start_date.isoformat(),
+        'end_date': job.end_date.isoformat(),
+        'rows_written': job.rows_written,
+        'error': job.error,
+        'download_url': reverse('lecturer:export_job_download', args=[job.pk]) if job.status == AttendanceExportJob.Status.DONE else None,
+    }
 
-    attendance_map = {a.enrollment_id: a for a in attendance_records}
+@role_required(CustomUser.Role.LECTURER)
+def export_jobs(request):
+    """
+    Request a date-range export over several courses and list previous export jobs.
+    The file is built by a background worker; the page polls export_job_status.
+    """
+    lecturer = get_object_or_404(Lecturer, user=request.user)
+    courses = Course.objects.filter(classgroups__lecturers=lecturer).distinct().order_by('code')
 
-    for enrollment in enrollments:
-        student = enrollment.student.user
-        att = attendance_map.get(enrollment.id)
-        status = att.status if att else 'not marked'
-        writer.writerow([
-            student.get_full_name(),
-            student.email,
-            status.capitalize()
-        ])
-    return response
+    if request.method == 'POST':
+        form = AttendanceExportJobForm(request.POST, courses=courses)
+        if form.is_valid():
+            job = AttendanceExportJob.objects.create(
+                requested_by=request.user,
+                start_date=form.cleaned_data['start_date'],
+                end_date=form.cleaned_data['end_date'],
+            )
+            job.courses.set(form.cleaned_data['selected_courses'])
+            enqueue_export_job(job)
+            messages.success(request, "Export queued. It will be ready to download shortly.")
+            return redirect('lecturer:export_jobs')
+        messages.error(request, "Please correct the errors in the export form.")
+    else:
+        form = AttendanceExportJobForm(courses=courses)
+
+    jobs = AttendanceExportJob.objects.filter(requested_by=request.user).prefetch_related('courses')[:20]
+    return render(request, 'lecturer/export_jobs.html', {'form': form, 'jobs': jobs})
 
+@role_required(CustomUser.Role.LECTURER)
+def export_job_status(request, job_id):
+    """
+    Polling endpoint for an export job.
+    """
+    job = get_object_or_404(AttendanceExportJob, pk=job_id, requested_by=request.user)
+    return JsonResponse(_export_job_payload(job))
 
+@role_required(CustomUser.Role.LECTURER)
+def export_job_download(request, job_id):
+    """
+    Download a finished export.
+    """
+    job = get_object_or_404(
+        AttendanceExportJob, pk=job_id, requested_by=request.user, status=AttendanceExportJob.Status.DONE
+    )
+    if not job.file:
+        raise Http404("Export file is missing.")
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=download_name(job))
@@ -1,6 +1,13 @@
 # notifications/admin.py
 
 from django.contrib import admin
-from .models import Notification
+from .models import ArchivedNotification, Notification
 
 admin.site.register(Notification)
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('lecturer', 'created_at', 'archived_at')
+    search_fields = ('lecturer__email', 'message')
+    readonly_fields = ('id', 'lecturer', 'message', 'created_at', 'archived_at')
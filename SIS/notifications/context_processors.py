@@ -0,0 +1,21 @@
+# notifications/context_processors.py
+from django.conf import settings
+
+from .stream import stream_available
+from .unread import get_unread_count
+
+
+def unread_notifications(request):
+    """
+    The topbar badge count, read from the counter row loaded along with request.user,
+    so it costs no query at all, and how the badge keeps itself current: the event
+    stream under ASGI, polling under WSGI.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'notifications_unread_count': get_unread_count(user),
+        'notifications_stream': stream_available(request),
+        'notifications_poll_seconds': getattr(settings, 'NOTIFICATION_POLL_INTERVAL', 30),
+    }
@@ -0,0 +1,61 @@
+# notifications/fanout.py
+from collections import namedtuple
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from core.models import Enrollment, Student
+from .models import Notification
+from .stream import publish_notifications
+from .unread import increment_unread
+
+FANOUT_CHUNK_SIZE = 1000
+
+FanoutResult = namedtuple('FanoutResult', ['audience', 'recipients'])
+
+
+def audience_user_ids(class_group=None, subject=None, department=None, class_groups=None):
+    """
+    Distinct user ids of the students addressed by a class group, a subject or a
+    department, as a lazy values_list so it can be streamed or used as a subquery.
+    `class_groups` limits a subject's students to those enrolled through these groups.
+    """
+    if class_group is not None:
+        # Students placed in the group, plus anyone enrolled through it
+        return (
+            Student.objects.filter(class_group=class_group)
+            .values_list('user_id', flat=True)
+            .union(Enrollment.objects.filter(class_group=class_group).values_list('student__user_id', flat=True))
+        )
+    if subject is not None:
+        enrollments = Enrollment.objects.filter(subject=subject)
+        if class_groups is not None:
+            enrollments = enrollments.filter(class_group__in=class_groups)
+        return enrollments.values_list('student__user_id', flat=True).distinct()
+    if department is not None:
+        return get_user_model().objects.filter(
+            department=department, role=get_user_model().Role.STUDENT
+        ).values_list('id', flat=True)
+    raise ValueError("An audience needs a class group, subject or department.")
+
+
+def fan_out_notification(message, user_ids, audience='', chunk_size=FANOUT_CHUNK_SIZE):
+    """
+    Create one Notification per recipient with a bulk_create per chunk_size users, and
+    bump each chunk's unread counters together (notifications.unread.increment_unread).
+    Everything commits together, so recipients never see a partial broadcast. Returns a
+    FanoutResult.
+    """
+    # Read the ids up front (a few bytes each) rather than holding a cursor open across the inserts
+    ids = iter(list(user_ids))
+    recipients = 0
+    with transaction.atomic():
+        while chunk := list(islice(ids, chunk_size)):
+            notifications = Notification.objects.bulk_create(
+                [Notification(lecturer_id=user_id, message=message) for user_id in chunk]
+            )
+            publish_notifications(notifications)
+            increment_unread(chunk)
+            recipients += len(chunk)
+    return FanoutResult(audience, recipients)
@@ -0,0 +1,77 @@
+# notifications/forms.py
+from django import forms
+
+from accounts.models import CustomUser
+from core.models import ClassGroup, Department, Lecturer, Subject
+
+INPUT_CLASSES = 'w-full px-4 py-2 rounded-lg bg-white/10 text-white border border-white/20 focus:ring-2 focus:ring-blue-500 focus:outline-none transition'
+
+
+class BroadcastForm(forms.Form):
+    AUDIENCE_CHOICES = [
+        ('class_group', 'Class Group'),
+        ('subject', 'Subject'),
+        ('department', 'Department'),
+    ]
+
+    audience = forms.ChoiceField(choices=AUDIENCE_CHOICES, widget=forms.RadioSelect, initial='class_group')
+    class_group = forms.ModelChoiceField(
+        queryset=ClassGroup.objects.none(), required=False,
+        widget=forms.Select(attrs={'class': INPUT_CLASSES})
+    )
+    subject = forms.ModelChoiceField(
+        queryset=Subject.objects.none(), required=False,
+        widget=forms.Select(attrs={'class': INPUT_CLASSES})
+    )
+    department = forms.ModelChoiceField(
+        queryset=Department.objects.none(), required=False,
+        widget=forms.Select(attrs={'class': INPUT_CLASSES})
+    )
+    message = forms.CharField(
+        widget=forms.Textarea(attrs={'class': INPUT_CLASSES, 'rows': 4, 'placeholder': 'Type your message here...'})
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The class groups a lecturer's subject messages are limited to; None = no limit
+        self.class_groups = None
+        if user is not None and user.role == CustomUser.Role.LECTURER:
+            # Lecturers may only address their own groups, the students of those groups in
+            # a subject, and their department; without a Lecturer profile, no one
+            lecturer = Lecturer.objects.filter(user=user).first()
+            if lecturer is None:
+                self.class_groups = ClassGroup.objects.none()
+                for name in ('class_group', 'subject', 'department'):
+                    self.fields[name].queryset = self.fields[name].queryset.none()
+                return
+            self.class_groups = ClassGroup.objects.filter(lecturers=lecturer)
+            self.fields['class_group'].queryset = self.class_groups.select_related('course')
+            self.fields['subject'].queryset = Subject.objects.filter(
+                course__classgroups__in=self.class_groups
+            ).distinct()
+            self.fields['department'].queryset = Department.objects.filter(
+                pk__in=[pk for pk in (lecturer.department_id, user.department_id) if pk]
+            )
+        else:
+            self.fields['class_group'].queryset = ClassGroup.objects.select_related('course')
+            self.fields['subject'].queryset = Subject.objects.all()
+            self.fields['department'].queryset = Department.objects.all()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        audience = cleaned_data.get('audience')
+        if audience and not cleaned_data.get(audience):
+            self.add_error(audience, "Choose who should receive this message.")
+        return cleaned_data
+
+    def audience_target(self):
+        """The chosen class group, subject or department."""
+        return self.cleaned_data[self.cleaned_data['audience']]
+
+    def audience_filter(self):
+        """Keyword arguments for fanout.audience_user_ids()."""
+        audience = self.cleaned_data['audience']
+        kwargs = {audience: self.cleaned_data[audience]}
+        if audience == 'subject' and self.class_groups is not None:
+            kwargs['class_groups'] = self.class_groups
+        return kwargs
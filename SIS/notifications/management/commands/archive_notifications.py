@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from notifications.retention import ARCHIVE_BATCH_SIZE, archive_read_notifications
+
+
+class Command(BaseCommand):
+    help = "Move read notifications past the retention period into the archive table (run daily, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Override NOTIFICATION_RETENTION_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        archived = archive_read_notifications(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} notifications."))
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounts.models import CustomUser
+from core.models import Department
+from notifications.fanout import FANOUT_CHUNK_SIZE, audience_user_ids, fan_out_notification
+from notifications.models import Notification
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time notifying a whole department one Notification.objects.create() at a time against "
+        "fan_out_notification(), on synthetic students inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=5000)
+        parser.add_argument('--chunk-size', type=int, default=FANOUT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, options):
+        department = Department.objects.create(name='Fan-out Benchmark')
+        CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    email=f'fanout{i}@example.com',
+                    identity_card_number=f'FANOUT-{i:07d}',
+                    full_name=f'Fanout Student {i}',
+                    role=CustomUser.Role.STUDENT,
+                    department=department,
+                )
+                for i in range(options['recipients'])
+            ],
+            batch_size=2000,
+        )
+        self.stdout.write(f"{options['recipients']} recipients")
+
+        def one_by_one():
+            for user_id in audience_user_ids(department=department):
+                Notification.objects.create(lecturer_id=user_id, message='Per-row message')
+
+        def fanned_out():
+            fan_out_notification(
+                'Fan-out message', audience_user_ids(department=department), chunk_size=options['chunk_size']
+            )
+
+        for label, send in (('create() per row', one_by_one), ('fan_out_notification', fanned_out)):
+            queries = 0
+
+            def count_query(execute, *args):
+                nonlocal queries
+                queries += 1
+                return execute(*args)
+
+            with connection.execute_wrapper(count_query):
+                started = time.perf_counter()
+                send()
+                elapsed = time.perf_counter() - started
+            self.stdout.write(f"{label:>21}: {elapsed * 1000:9.1f} ms, {queries:6d} queries")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from notifications.unread import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's unread notification counter from the notifications table."
+
+    def handle(self, *args, **options):
+        fixed = reconcile_unread_counts()
+        self.stdout.write(self.style.SUCCESS(f"Corrected {fixed} unread counters."))
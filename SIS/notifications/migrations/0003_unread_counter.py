@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_unread_counts(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    UnreadCounter.objects.bulk_create(
+        [
+            UnreadCounter(user_id=user_id, count=count)
+            for user_id, count in CustomUser.objects.filter(unread_notifications__gt=0).values_list('pk', 'unread_notifications')
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_customuser_unread_notifications'),
+        ('notifications', '0002_retention_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(copy_unread_counts, migrations.RunPython.noop),
+    ]
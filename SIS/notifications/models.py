@@ -12,7 +12,46 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
 
     class Meta:
-        ordering = ['-created_at']
+        # No default ordering: callers order explicitly so unordered queries skip the sort
+        indexes = [
+            # The inbox: a user's unread first, newest first (also serves unread counts)
+            models.Index(fields=['lecturer', 'is_read', '-created_at', '-id'], name='notif_recipient_read_idx'),
+            # Retention sweeps only ever look at read rows
+            models.Index(fields=['created_at'], condition=models.Q(is_read=True), name='notif_read_created_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.lecturer.email}: {self.message[:50]}"
+
+
+class UnreadCounter(models.Model):
+    """
+    A user's unread notification count, moved only by the atomic UPDATEs in
+    notifications.unread. It has a row of its own so saving the user (a profile form,
+    a login) never writes back a stale count. A missing row means zero.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.count} unread"
+
+
+class ArchivedNotification(models.Model):
+    """
+    Read notifications moved out of the hot table by notifications.retention.
+    Keeps the original id so links to an archived notification still resolve.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    lecturer = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lecturer', '-created_at'], name='notif_archive_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived notification for {self.lecturer.email}: {self.message[:50]}"
@@ -0,0 +1,46 @@
+# notifications/retention.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedNotification, Notification
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archive_read_notifications(days=None, batch_size=ARCHIVE_BATCH_SIZE, now=None):
+    """
+    Move read notifications older than `days` (default NOTIFICATION_RETENTION_DAYS)
+    into ArchivedNotification, batch_size rows per transaction, so the hot table
+    only holds unread and recent rows. Returns the number archived.
+    """
+    days = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90) if days is None else days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    expired = (
+        Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+        .order_by('created_at')
+        .values_list('id', 'lecturer_id', 'message', 'created_at')
+    )
+    archived = 0
+    while True:
+        with transaction.atomic():
+            batch = list(expired[:batch_size])
+            if not batch:
+                return archived
+            ArchivedNotification.objects.bulk_create(
+                [
+                    ArchivedNotification(id=pk, lecturer_id=lecturer_id, message=message, created_at=created_at)
+                    for pk, lecturer_id, message, created_at in batch
+                ],
+                ignore_conflicts=True,
+            )
+            # Plain DELETE: the rows are read, so the unread-counter signals have nothing to do
+            # and going through the collector would only re-fetch them.
+            ids = [row[0] for row in batch]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {Notification._meta.db_table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids
+                )
+        archived += len(batch)
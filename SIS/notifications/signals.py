@@ -0,0 +1,35 @@
+# notifications/signals.py
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Notification
+from .stream import UNREAD_CHANGED, publish_after_commit, publish_notifications
+from .unread import adjust_unread
+
+
+@receiver(post_init, sender=Notification)
+def remember_read_state(sender, instance, **kwargs):
+    instance._was_read = instance.__dict__.get('is_read')
+
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, **kwargs):
+    """
+    Keep the recipient's unread counter current for single saves. QuerySet.update() and
+    bulk_create() bypass this; use notifications.unread for those.
+    """
+    if created:
+        delta = 0 if instance.is_read else 1
+    else:
+        delta = int(bool(instance._was_read)) - int(bool(instance.is_read))
+    adjust_unread(instance.lecturer_id, delta)
+    instance._was_read = instance.is_read
+    if created:
+        publish_notifications([instance])
+    elif delta:
+        publish_after_commit([(instance.lecturer_id, UNREAD_CHANGED)])
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.lecturer_id, -1)
+        publish_after_commit([(instance.lecturer_id, UNREAD_CHANGED)])
@@ -0,0 +1,85 @@
+# notifications/stream.py
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+
+from .broker import get_broker
+from .models import UnreadCounter
+
+
+UNREAD_CHANGED = {'type': 'unread'}
+
+
+def publish_after_commit(events):
+    """Push (user_id, event) pairs to live streams once the surrounding transaction commits."""
+    events = list(events)
+
+    def publish():
+        broker = get_broker()
+        for user_id, event in events:
+            broker.publish(user_id, event)
+
+    if events:
+        transaction.on_commit(publish)
+
+
+def notification_event(notification):
+    return {
+        'type': 'notification',
+        'id': notification.pk,
+        'message': notification.message,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def publish_notifications(notifications):
+    publish_after_commit((notification.lecturer_id, notification_event(notification)) for notification in notifications)
+
+
+def stream_available(request):
+    """
+    Whether this request can hold a stream open. Only under ASGI: a WSGI handler drains
+    a streaming response's async iterator into a list first, so an endless stream would
+    never be sent and would hold the worker thread for good.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _unread_count(user_id):
+    return await UnreadCounter.objects.filter(user_id=user_id).values_list('count', flat=True).afirst() or 0
+
+
+async def event_stream(user_id, keepalive=None):
+    """
+    Async generator of SSE frames for one user: the current unread count first, then
+    each burst of published events followed by one fresh count. Idle connections cost a queue
+    and a pending await, not a thread. Comment frames every `keepalive` seconds stop
+    proxies from closing quiet connections.
+    """
+    keepalive = keepalive or getattr(settings, 'NOTIFICATION_STREAM_KEEPALIVE', 25)
+    subscription = get_broker().subscribe(user_id)
+    try:
+        yield "retry: 5000\n\n"
+        yield format_sse('unread', {'count': await _unread_count(user_id)})
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            events = [event]
+            while not subscription.queue.empty():
+                events.append(subscription.queue.get_nowait())
+            for event in events:
+                if event.get('type') == 'notification':
+                    yield format_sse('notification', event)
+            yield format_sse('unread', {'count': await _unread_count(user_id)})
+    finally:
+        subscription.close()
@@ -1,3 +1,317 @@
-from django.test import TestCase
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.template import Context, RequestContext, Template
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.backends import EmailOrICBackend
+from accounts.models import CustomUser
+from core.models import ClassGroup, Course, Department, Enrollment, Lecturer, Student, Subject
+from core.sqlite import query_plan
+from .broker import LocalBroker
+from .fanout import audience_user_ids, fan_out_notification
+from .forms import BroadcastForm
+from .models import ArchivedNotification, Notification, UnreadCounter
+from .retention import archive_read_notifications
+from .stream import event_stream
+from .unread import get_unread_count, mark_all_read, mark_read, reconcile_unread_counts
+
+
+class UnreadCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(
+            email="lecturer@example.com",
+            identity_card_number="IC-LECT",
+            full_name="Lecturer One",
+            role=CustomUser.Role.LECTURER,
+        )
+
+    def unread(self):
+        return get_unread_count(CustomUser.objects.get(pk=self.user.pk))
+
+    def test_counter_follows_create_read_and_delete(self):
+        first = Notification.objects.create(lecturer=self.user, message="one")
+        second = Notification.objects.create(lecturer=self.user, message="two")
+        Notification.objects.create(lecturer=self.user, message="seen", is_read=True)
+        self.assertEqual(self.unread(), 2)
+
+        self.assertTrue(mark_read(first))
+        self.assertFalse(mark_read(Notification.objects.get(pk=first.pk)))  # a second click changes nothing
+        self.assertEqual(self.unread(), 1)
+
+        second.is_read = True
+        second.save()
+        second.is_read = False
+        second.save()
+        self.assertEqual(self.unread(), 1)
+
+        second.delete()
+        first.delete()
+        self.assertEqual(self.unread(), 0)
+
+    def test_full_user_save_keeps_concurrent_increments(self):
+        user = EmailOrICBackend().get_user(self.user.pk)  # e.g. request.user in a profile update
+        Notification.objects.create(lecturer=self.user, message="sent meanwhile")
+        user.phone_number = "012-3456789"
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertNotIn('notifications_unreadcounter', ' '.join(query['sql'] for query in queries))
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(CustomUser.objects.get(pk=self.user.pk).phone_number, "012-3456789")
+
+    def test_mark_all_read_and_reconcile(self):
+        for i in range(3):
+            Notification.objects.create(lecturer=self.user, message=f"n{i}")
+        self.assertEqual(mark_all_read(self.user), 3)
+        self.assertEqual(self.unread(), 0)
+
+        Notification.objects.bulk_create([Notification(lecturer=self.user, message="bulk")])  # bypasses signals
+        self.assertEqual(reconcile_unread_counts(), 1)
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(reconcile_unread_counts(), 0)
+
+    def test_mark_as_read_view(self):
+        notification = Notification.objects.create(lecturer=self.user, message="hello")
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('notifications:mark_as_read', args=[notification.pk]))
+        self.assertRedirects(response, reverse('notifications:list'), fetch_redirect_response=False)
+        self.assertEqual(self.unread(), 0)
+
+    def test_context_processor_needs_no_query(self):
+        Notification.objects.create(lecturer=self.user, message="hello")
+        request = RequestFactory().get('/')
+        request.user = EmailOrICBackend().get_user(self.user.pk)  # as the auth middleware loads it
+        template = Template("{{ notifications_unread_count }}")
+        with self.assertNumQueries(0):
+            rendered = template.render(RequestContext(request))
+        self.assertEqual(rendered, "1")
+        self.assertEqual(template.render(Context()), "")
+
+
+class FanoutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.computing = Department.objects.create(name="Computing")
+        cls.business = Department.objects.create(name="Business")
+        course = Course.objects.create(name="Computer Science", code="CS", department=cls.computing)
+        cls.subject = Subject.objects.create(course=course, name="Programming", code="CS101")
+        cls.group = ClassGroup.objects.create(name="CS-A", department=cls.computing, course=course)
+        cls.other_group = ClassGroup.objects.create(name="CS-B", department=cls.computing, course=course)
+
+        cls.students = []
+        for i in range(5):
+            user = CustomUser.objects.create(
+                email=f"student{i}@example.com",
+                identity_card_number=f"IC-{i}",
+                full_name=f"Student {i}",
+                role=CustomUser.Role.STUDENT,
+                department=cls.computing if i < 4 else cls.business,
+            )
+            cls.students.append(user)
+        # 0 and 1 enrolled through CS-A, 2 only placed in it, 3 in CS-B
+        for user in cls.students[:2]:
+            Enrollment.objects.create(student=user.student, subject=cls.subject, class_group=cls.group)
+        Student.objects.filter(user=cls.students[2]).update(class_group=cls.group)
+        Enrollment.objects.create(student=cls.students[3].student, subject=cls.subject, class_group=cls.other_group)
+
+        cls.lecturer = CustomUser.objects.create(
+            email="lecturer@example.com",
+            identity_card_number="IC-LECT",
+            full_name="Lecturer One",
+            role=CustomUser.Role.LECTURER,
+        )
+        cls.group.lecturers.add(Lecturer.objects.get(user=cls.lecturer))
+
+    def ids(self, users):
+        return sorted(user.pk for user in users)
+
+    def test_audiences(self):
+        self.assertEqual(sorted(audience_user_ids(class_group=self.group)), self.ids(self.students[:3]))
+        self.assertEqual(sorted(audience_user_ids(subject=self.subject)), self.ids(self.students[:2] + [self.students[3]]))
+        self.assertEqual(sorted(audience_user_ids(department=self.computing)), self.ids(self.students[:4]))
+
+    def test_fan_out_is_chunked_and_counts_unread(self):
+        # Per chunk of two: one INSERT, then one counter INSERT OR IGNORE and UPDATE, plus the
+        # audience read and a savepoint pair
+        with self.assertNumQueries(1 + 2 * 3 + 2):
+            result = fan_out_notification("Exam moved", audience_user_ids(department=self.computing), chunk_size=2)
+        self.assertEqual(result.recipients, 4)
+        self.assertEqual(Notification.objects.filter(message="Exam moved").count(), 4)
+        self.assertEqual(
+            [get_unread_count(user) for user in CustomUser.objects.filter(pk__in=self.ids(self.students)).order_by('pk')],
+            [1, 1, 1, 1, 0],
+        )
+
+    def test_broadcast_view_limits_lecturers_to_their_groups(self):
+        self.client.force_login(self.lecturer)
+        response = self.client.post(
+            reverse('notifications:broadcast'),
+            {'audience': 'class_group', 'class_group': self.other_group.pk, 'message': "Hi"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('class_group', response.context['form'].errors)
+
+        response = self.client.post(
+            reverse('notifications:broadcast'),
+            {'audience': 'class_group', 'class_group': self.group.pk, 'message': "Hi"},
+        )
+        self.assertRedirects(response, reverse('notifications:broadcast'), fetch_redirect_response=False)
+        self.assertEqual(Notification.objects.filter(message="Hi").count(), 3)
+
+        # A subject reaches only the lecturer's own groups' students, not CS-B's
+        self.client.post(
+            reverse('notifications:broadcast'),
+            {'audience': 'subject', 'subject': self.subject.pk, 'message': "Subject news"},
+        )
+        self.assertEqual(
+            sorted(Notification.objects.filter(message="Subject news").values_list('lecturer_id', flat=True)),
+            self.ids(self.students[:2]),
+        )
+
+        self.client.force_login(self.students[0])
+        self.assertEqual(self.client.get(reverse('notifications:broadcast')).status_code, 403)
+
+    def test_lecturer_without_profile_reaches_no_one(self):
+        Lecturer.objects.filter(user=self.lecturer).delete()
+        unassigned = ClassGroup.objects.create(name="CS-C", department=self.computing, course=self.subject.course)
+        form = BroadcastForm(user=CustomUser.objects.get(pk=self.lecturer.pk))
+        for name in ('class_group', 'subject', 'department'):
+            self.assertFalse(form.fields[name].queryset.exists(), name)
+        self.assertNotIn(unassigned, form.fields['class_group'].queryset)
+
+
+class NotificationStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(
+            email="student@example.com",
+            identity_card_number="IC-1",
+            full_name="Student One",
+            role=CustomUser.Role.STUDENT,
+        )
+
+    async def test_publish_from_another_thread_reaches_subscriber(self):
+        broker = LocalBroker()
+        subscription = broker.subscribe(self.user.pk)
+        thread = threading.Thread(target=broker.publish, args=(self.user.pk, {'type': 'unread'}))
+        thread.start()
+        self.assertEqual(await asyncio.wait_for(subscription.get(), 1), {'type': 'unread'})
+        thread.join()
+        subscription.close()
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_event_stream_frames(self):
+        broker = LocalBroker()
+        with mock.patch('notifications.stream.get_broker', return_value=broker):
+            stream = event_stream(self.user.pk, keepalive=0.05)
+            self.assertEqual(await anext(stream), "retry: 5000\n\n")
+            self.assertEqual(await anext(stream), 'event: unread\ndata: {"count": 0}\n\n')
+
+            await UnreadCounter.objects.acreate(user_id=self.user.pk, count=2)
+            broker.publish(self.user.pk, {'type': 'notification', 'id': 1, 'message': "one"})
+            broker.publish(self.user.pk, {'type': 'notification', 'id': 2, 'message': "two"})
+            frames = [await anext(stream) for _ in range(3)]
+            self.assertTrue(frames[0].startswith('event: notification\ndata: {"type": "notification", "id": 1'))
+            self.assertTrue(frames[1].startswith('event: notification\ndata: {"type": "notification", "id": 2'))
+            self.assertEqual(frames[2], 'event: unread\ndata: {"count": 2}\n\n')  # one count per burst
+
+            self.assertEqual(await anext(stream), ": keep-alive\n\n")
+            self.assertEqual(broker.subscriber_count(self.user.pk), 1)
+            await stream.aclose()
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_changes_are_published_after_commit(self):
+        broker = mock.Mock()
+        with mock.patch('notifications.stream.get_broker', return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                notification = Notification.objects.create(lecturer=self.user, message="hello")
+                broker.publish.assert_not_called()
+            user_id, event = broker.publish.call_args.args
+            self.assertEqual((user_id, event['type'], event['message']), (self.user.pk, 'notification', "hello"))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                mark_read(notification)
+            self.assertEqual(broker.publish.call_args.args, (self.user.pk, {'type': 'unread'}))
+
+    async def test_stream_endpoint(self):
+        response = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(response.status_code, 302)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(response.streaming)
+
+    def test_wsgi_requests_poll_instead_of_streaming(self):
+        UnreadCounter.objects.create(user=self.user, count=3)
+        self.client.force_login(self.user)
+        # 204 tells EventSource to stop; a stream here would never be sent and pin the thread
+        self.assertEqual(self.client.get(reverse('notifications:stream')).status_code, 204)
+        self.assertEqual(self.client.get(reverse('notifications:unread_count')).json(), {'count': 3})
+
+        page = self.client.get(reverse('dashboard:profile')).content.decode()
+        self.assertIn(reverse('notifications:unread_count'), page)
+        self.assertNotIn(reverse('notifications:stream'), page)
+
+
+class RetentionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(
+            email="lecturer@example.com",
+            identity_card_number="IC-LECT",
+            full_name="Lecturer One",
+            role=CustomUser.Role.LECTURER,
+        )
+
+    def make(self, message, days_old, is_read):
+        notification = Notification.objects.create(lecturer=self.user, message=message, is_read=is_read)
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        return notification
+
+    def test_archives_only_old_read_notifications(self):
+        old_read = [self.make(f"old {i}", 120, True) for i in range(5)]
+        old_unread = self.make("old unread", 120, False)
+        recent_read = self.make("recent", 5, True)
+
+        self.assertEqual(archive_read_notifications(days=90, batch_size=2), 5)
+        self.assertEqual(
+            set(Notification.objects.values_list('pk', flat=True)), {old_unread.pk, recent_read.pk}
+        )
+        archived = ArchivedNotification.objects.get(pk=old_read[0].pk)
+        self.assertEqual((archived.lecturer, archived.message), (self.user, "old 0"))
+        self.assertEqual(get_unread_count(self.user), 1)
+        self.assertEqual(archive_read_notifications(days=90), 0)
+
+    def test_inbox_and_sweep_use_their_indexes(self):
+        inbox = Notification.objects.filter(lecturer=self.user).order_by('is_read', '-created_at', '-id')[:20]
+        plan = ' '.join(query_plan(inbox))
+        self.assertIn('notif_recipient_read_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+        sweep = Notification.objects.filter(is_read=True, created_at__lt=timezone.now()).order_by('created_at')
+        self.assertIn('notif_read_created_idx', ' '.join(query_plan(sweep)))
+
+    def test_list_pages_unread_first(self):
+        for i in range(3):
+            self.make(f"read {i}", i, True)
+        for i in range(3):
+            self.make(f"unread {i}", i, False)
+        self.client.force_login(self.user)
+        with mock.patch('notifications.views.NOTIFICATIONS_PER_PAGE', 4):
+            response = self.client.get(reverse('notifications:list'))
+            messages = [n.message for n in response.context['notifications']]
+            self.assertEqual(messages, ["unread 0", "unread 1", "unread 2", "read 0"])
+            self.assertContains(response, "Mark as read", count=3)
+
+            response = self.client.get(
+                reverse('notifications:list') + '?' + response.context['page_links']['next']
+            )
+        self.assertEqual([n.message for n in response.context['notifications']], ["read 1", "read 2"])
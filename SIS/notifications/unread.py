@@ -0,0 +1,80 @@
+# notifications/unread.py
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Notification, UnreadCounter
+from .stream import UNREAD_CHANGED, publish_after_commit
+
+
+def get_unread_count(user):
+    """
+    The user's unread count. The auth backend joins the counter row into the query that
+    loads request.user, so for the signed-in user this costs no query.
+    """
+    try:
+        return user.unread_counter.count
+    except UnreadCounter.DoesNotExist:
+        return 0
+
+
+def increment_unread(user_ids):
+    """Atomically add one to each user's unread counter, creating missing rows at zero first."""
+    user_ids = list(user_ids)
+    if user_ids:
+        UnreadCounter.objects.bulk_create([UnreadCounter(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(count=F('count') + 1)
+
+
+def adjust_unread(user_id, delta):
+    """Atomically move a user's unread counter by delta, never below zero."""
+    if delta > 0:
+        UnreadCounter.objects.bulk_create([UnreadCounter(user_id=user_id)], ignore_conflicts=True)
+    if delta:
+        UnreadCounter.objects.filter(user_id=user_id).update(count=Greatest(F('count') + delta, Value(0)))
+
+
+def mark_read(notification):
+    """
+    Mark one notification read. The conditional UPDATE makes concurrent clicks on the
+    same notification decrement the counter only once.
+    """
+    with transaction.atomic():
+        changed = Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True)
+        if changed:
+            adjust_unread(notification.lecturer_id, -1)
+            publish_after_commit([(notification.lecturer_id, UNREAD_CHANGED)])
+    notification.is_read = True
+    notification._was_read = True
+    return bool(changed)
+
+
+def mark_all_read(user):
+    with transaction.atomic():
+        changed = Notification.objects.filter(lecturer=user, is_read=False).update(is_read=True)
+        UnreadCounter.objects.filter(user=user).update(count=0)
+        publish_after_commit([(user.pk, UNREAD_CHANGED)])
+    user.unread_counter = UnreadCounter(user=user, count=0)
+    return changed
+
+
+def reconcile_unread_counts():
+    """Recompute every user's counter from the notifications table; returns the number of users fixed."""
+    actual = Coalesce(
+        Subquery(
+            Notification.objects.filter(lecturer=OuterRef('user_id'), is_read=False)
+            .order_by()
+            .values('lecturer')
+            .annotate(total=Count('id'))
+            .values('total')
+        ),
+        0,
+    )
+    with transaction.atomic():
+        # Users with unread notifications but no counter yet get one at zero, fixed below
+        missing = (
+            Notification.objects.filter(is_read=False, lecturer__unread_counter__isnull=True)
+            .order_by().values_list('lecturer_id', flat=True).distinct()
+        )
+        UnreadCounter.objects.bulk_create([UnreadCounter(user_id=user_id) for user_id in missing], ignore_conflicts=True)
+        return UnreadCounter.objects.exclude(count=actual).update(count=actual)
@@ -8,4 +8,7 @@ app_name = 'notifications'
 urlpatterns = [
     path('', views.notification_list, name='list'),
     path('mark_as_read/<int:pk>/', views.mark_notification_as_read, name='mark_as_read'),
+    path('broadcast/', views.broadcast, name='broadcast'),
+    path('unread/', views.unread_count, name='unread_count'),
+    path('stream/', views.notification_stream, name='stream'),
 ]
@@ -1,14 +1,36 @@
 # notifications/views.py
 
 from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from accounts.decorators import role_required
+from accounts.models import CustomUser
+from core.pagination import keyset_paginate, page_querystrings
+from core.query_budget import query_budget
+from .fanout import audience_user_ids, fan_out_notification
+from .forms import BroadcastForm
 from .models import Notification
+from .stream import event_stream, stream_available
+from .unread import get_unread_count, mark_read
+
+NOTIFICATIONS_PER_PAGE = 20
+
 
 @login_required
+@query_budget(queries=4, repeats=1)
 def notification_list(request):
-    # Get all notifications for the current user, ordered by creation time (newest first)
-    notifications = request.user.notifications.order_by('-created_at')
-    return render(request, 'notifications/list.html', {'notifications': notifications})
+    # Unread first, then newest first: the order of notif_recipient_read_idx, so each
+    # keyset page is one index range scan
+    page = keyset_paginate(
+        request.user.notifications.all(), ('is_read', '-created_at', '-id'),
+        after=request.GET.get('after'), before=request.GET.get('before'), per_page=NOTIFICATIONS_PER_PAGE,
+    )
+    return render(request, 'notifications/list.html', {
+        'notifications': page,
+        'page': page,
+        'page_links': page_querystrings(request, page),
+    })
 
 @login_required
 def mark_notification_as_read(request, pk):
@@ -19,9 +41,52 @@ def mark_notification_as_read(request, pk):
     """
     notification = get_object_or_404(Notification, pk=pk, lecturer=request.user)
     if request.method == 'POST':
-        notification.is_read = True
-        notification.save()
+        mark_read(notification)
         # Redirect back to the notifications list or another appropriate page
         return redirect('notifications:list')  # Assuming you've named your URL pattern 'list'
     # If it's a GET request (e.g., displaying a confirmation form), render a template
     return render(request, 'notifications/confirm_mark_as_read.html', {'notification': notification})
+
+
+@role_required(CustomUser.Role.LECTURER, CustomUser.Role.ADMIN)
+def broadcast(request):
+    """
+    Lecturers and admins send one message to every student in a class group,
+    subject or department; the fan-out is a chunked bulk_create.
+    """
+    if request.method == 'POST':
+        form = BroadcastForm(request.POST, user=request.user)
+        if form.is_valid():
+            result = fan_out_notification(
+                form.cleaned_data['message'],
+                audience_user_ids(**form.audience_filter()),
+                audience=str(form.audience_target()),
+            )
+            messages.success(request, f"Message sent to {result.recipients} students in {result.audience}.")
+            return redirect('notifications:broadcast')
+    else:
+        form = BroadcastForm(user=request.user)
+    return render(request, 'notifications/broadcast.html', {'form': form})
+
+
+@login_required
+def unread_count(request):
+    """The topbar badge count, polled by pages served over WSGI (see notification_stream)."""
+    return JsonResponse({'count': get_unread_count(request.user)})
+
+
+@login_required
+async def notification_stream(request):
+    """
+    Server-sent events with new notifications and the unread count. Async, so under
+    ASGI an idle connection holds no thread; see notifications.stream.event_stream.
+    Under WSGI it answers 204, which tells EventSource not to reconnect; the topbar
+    polls unread_count there instead.
+    """
+    if not stream_available(request):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    response = StreamingHttpResponse(event_stream(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
@@ -1,12 +1,13 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_list_or_404, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from accounts.decorators import role_required
 from accounts.models import CustomUser
 from accounts.forms import StudentProfileUpdateForm
-from core.models import Enrollment, Grade, Attendance, Course, Student, DisciplinaryAction
+from core.activity import touch_student_activity
+from core.models import Enrollment, Attendance, Course, Student
+from dashboard.views import student_dashboard_context
 from django.utils.dateparse import parse_date
-from django.utils import timezone
 
 @role_required(CustomUser.Role.STUDENT)
 def student_dashboard(request):
@@ -14,43 +15,11 @@ def student_dashboard(request):
     Student dashboard showing enrolled courses, grades, attendance summary, and disciplinary actions.
     Also updates latest activity timestamp.
     """
-    # Update latest activity
-    try:
-        student = Student.objects.get(user=request.user)
-        student.latest_activity = timezone.now()
-        student.save(update_fields=['latest_activity'])
-    except Student.DoesNotExist:
-        pass
-
-    enrollments = Enrollment.objects.filter(student__user=request.user).select_related('course')
-    courses_data = []
-
-    for enrollment in enrollments:
-        course = enrollment.course
-        grades = Grade.objects.filter(enrollment=enrollment)
-        attendance_records = Attendance.objects.filter(enrollment=enrollment)
-        
-        total_attendance = attendance_records.count()
-        present_attendance = attendance_records.filter(status='present').count()
-        attendance_percentage = (present_attendance / total_attendance * 100) if total_attendance > 0 else 0
-
-        courses_data.append({
-            'course': course,
-            'grades': grades,
-            'attendance_percentage': round(attendance_percentage, 2),
-        })
-
-    # Get disciplinary actions for the student
-    try:
-        student = Student.objects.get(user=request.user)
-        disciplinary_actions = DisciplinaryAction.objects.filter(student=student).order_by('-date')
-    except Student.DoesNotExist:
-        disciplinary_actions = []
+    # Update latest activity (buffered, no write on this request)
+    touch_student_activity(request.user)
+    student = Student.objects.filter(user=request.user).first()
 
-    context = {
-        'courses_data': courses_data,
-        'disciplinary_actions': disciplinary_actions,
-    }
+    context = student_dashboard_context(student)
 
     return render(request, 'student/dashboard.html', context)
 
@@ -61,9 +30,10 @@ def attendance_detail(request, course_id):
     with optional date filtering and attendance summary.
     """
     course = get_object_or_404(Course, id=course_id)
-    enrollment = get_object_or_404(Enrollment, student__user=request.user, course=course)
+    # One enrollment per subject of the course
+    enrollments = get_list_or_404(Enrollment, student__user=request.user, class_group__course=course)
 
-    attendance_qs = Attendance.objects.filter(enrollment=enrollment).order_by('date')
+    attendance_qs = Attendance.objects.filter(enrollment__in=enrollments).order_by('date', 'session')
 
     # Date range filter from GET parameters
     start_date_str = request.GET.get('start_date')
@@ -100,12 +70,7 @@ def student_profile(request):
     Display the student profile page.
     Also updates latest activity timestamp.
     """
-    try:
-        student = Student.objects.get(user=request.user)
-        student.latest_activity = timezone.now()
-        student.save(update_fields=['latest_activity'])
-    except Student.DoesNotExist:
-        pass
+    touch_student_activity(request.user)
 
     user = request.user
     return render(request, 'student/profile.html', {'user': user})
@@ -123,7 +88,7 @@ def student_profile_update(request):
         if form.is_valid():
             form.save()
             messages.success(request, 'Your profile has been updated successfully.')
-            return redirect('student:profile_update')
+            return redirect('dashboard:profile_update')
         else:
             messages.error(request, 'Please correct the errors below.')
     else: